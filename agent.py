@@ -1,5 +1,12 @@
 import time
 
+from src.bitboard import (
+    BOARD_MASK, BOTTOM_MASK, Position, has_alignment, popcount, winning_cells,
+)
+from src.evaluation import ARENA_COLUMN_WEIGHTS, ARENA_WINDOW_WEIGHTS
+from src.minimax_agent import MinimaxAgent
+from src.opening_book import load_book
+
 
 class Agent:
     """Connect Four agent using Minimax with Alpha-Beta pruning."""
@@ -8,8 +15,17 @@ class Agent:
         self.env = env
         self.player_name = player_name
         self.time_limit = 2.5  # time limit with margin
-        self.max_depth = 5
+        self.max_depth = 42  # iterative deepening stops at the time limit
+        self.endgame_cells = 18  # solve exactly from this many empty cells
+        self.search_mode = "pvs"  # alphabeta, pvs or mtdf
         self.start_time = 0
+        self._engine = MinimaxAgent(
+            max_depth=self.max_depth,
+            time_limit=self.time_limit,
+            window_weights=ARENA_WINDOW_WEIGHTS,
+            column_weights=ARENA_COLUMN_WEIGHTS,
+        )
+        self._book = load_book()
 
     def choose_action(
         self,
@@ -22,7 +38,10 @@ class Agent:
     ):
         """Choose the best action using minimax strategy."""
         self.start_time = time.time()
-        board = observation
+        self._engine.reset_metrics()
+        position = Position.from_observation(observation)
+        me = position.player
+        opp = 1 - me
 
         # Ensure action_mask is valid
         if action_mask is None:
@@ -42,40 +61,46 @@ class Agent:
 
         # 1. Win immediately if possible
         for col in valid:
-            if self._is_winning_move(board, col, 0):
+            if self._is_winning_move(position, col, me):
                 return col
 
         # 2. Block opponent's winning move
         for col in valid:
-            if self._is_winning_move(board, col, 1):
+            if self._is_winning_move(position, col, opp):
                 return col
 
-        # 3. Check for double threat (create two winning opportunities)
+        # 3. Play from the opening book
+        if self._book is not None:
+            move = self._book.lookup(position)
+            if move in valid:
+                return move
+
+        # 4. Check for double threat (create two winning opportunities)
         for col in valid:
-            if self._creates_double_threat(board, col, 0):
+            if self._creates_double_threat(position, col, me):
                 return col
 
-        # 4. Block opponent's double threat
+        # 5. Block opponent's double threat
         for col in valid:
-            if self._creates_double_threat(board, col, 1):
+            if self._creates_double_threat(position, col, opp):
                 return col
 
-        # 5. Avoid moves that give opponent a winning move on top
+        # 6. Avoid moves that give opponent a winning move on top
         safe_moves = []
         for col in valid:
-            row = self._get_row(board, col)
-            if row is not None and row > 0:
+            if position.heights[col] < 5:
                 # Check if opponent can win by playing on top
-                if not self._is_winning_move(board, col, 1, row - 1):
+                above = position.move_bit(col) << 1
+                if not has_alignment(position.bits[opp] | above):
                     safe_moves.append(col)
-            elif row == 0:
+            elif position.heights[col] == 5:
                 safe_moves.append(col)
 
         if not safe_moves:
             safe_moves = valid
 
-        # 6. Use minimax for remaining decisions
-        result = self._search(board, safe_moves)
+        # 7. Use minimax for remaining decisions
+        result = self._search(position, safe_moves)
 
         # Final safety check: ensure returned action is valid
         if action_mask[result] != 1:
@@ -86,86 +111,47 @@ class Agent:
 
         return result
 
-    def _is_winning_move(self, board, col, player, forced_row=None):
-        """Check if playing in col wins the game."""
-        if forced_row is not None:
-            row = forced_row
-        else:
-            row = self._get_row(board, col)
-
-        if row is None:
-            return False
-
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+    def search_metrics(self):
+        """Search work of the last choose_action (see MinimaxAgent.search_metrics)."""
+        return self._engine.search_metrics()
 
-        for dr, dc in directions:
-            count = 1
-            # forward
-            r, c = row + dr, col + dc
-            while 0 <= r < 6 and 0 <= c < 7 and board[r, c, player] == 1:
-                count += 1
-                r += dr
-                c += dc
-            # backward
-            r, c = row - dr, col - dc
-            while 0 <= r < 6 and 0 <= c < 7 and board[r, c, player] == 1:
-                count += 1
-                r -= dr
-                c -= dc
+    def reset(self):
+        """Forget the tables kept from previous moves and zero the search counters."""
+        self._engine.reset()
+        self._engine.reset_metrics()
 
-            if count >= 4:
-                return True
-        return False
+    def _is_winning_move(self, position, col, player):
+        """Check if playing in col wins the game."""
+        if not position.can_play(col):
+            return False
+        return position.is_winning_move(col, player)
 
-    def _creates_double_threat(self, board, col, player):
+    def _creates_double_threat(self, position, col, player):
         """Check if move creates two or more winning opportunities."""
-        row = self._get_row(board, col)
-        if row is None:
+        if not position.can_play(col):
             return False
 
         # Simulate placing the piece
-        board[row, col, player] = 1
-        threats = 0
+        bits = position.bits[player] | position.move_bit(col)
+        mask = position.mask | position.move_bit(col)
+        playable = (mask + BOTTOM_MASK) & BOARD_MASK
 
-        # Check all columns for potential winning moves
-        for c in range(7):
-            r = self._get_row(board, c)
-            if r is not None:
-                if self._is_winning_move(board, c, player):
-                    threats += 1
-
-        # Undo the move
-        board[row, col, player] = 0
+        # Count columns with a winning move on top of them
+        threats = popcount(winning_cells(bits, mask) & playable)
 
         return threats >= 2
 
-    def _search(self, board, valid):
+    def _search(self, position, valid):
         """Minimax search with move ordering."""
         if not valid:
             return 0  # Should not happen
 
-        best = valid[0]  # Default to first valid move
-        best_score = -99999
-
-        # Prefer center columns (better strategic position)
-        order = [3, 2, 4, 1, 5, 0, 6]
-        sorted_valid = sorted(valid, key=lambda x: order.index(x) if x in order else 7)
-
-        for col in sorted_valid:
-            if time.time() - self.start_time > self.time_limit:
-                break
-
-            row = self._get_row(board, col)
-            if row is None:
-                continue
-
-            board[row, col, 0] = 1
-            score = -self._minimax(board, self.max_depth - 1, -99999, 99999, 1)
-            board[row, col, 0] = 0
-
-            if score > best_score:
-                best_score = score
-                best = col
+        # Share the transposition-table search of MinimaxAgent
+        self._engine.max_depth = self.max_depth
+        self._engine.time_limit = self.time_limit
+        self._engine.endgame_cells = self.endgame_cells
+        self._engine.search_mode = self.search_mode
+        best = self._engine.search(position, valid, self.start_time)
 
         # Ensure we return a valid move
         if best not in valid:
@@ -173,149 +159,3 @@ class Agent:
 
         return best
 
-    def _minimax(self, board, depth, alpha, beta, player):
-        """Minimax with alpha-beta pruning."""
-        if time.time() - self.start_time > self.time_limit:
-            return 0
-
-        # Check for winner
-        if self._has_won(board, 0):
-            return 10000 + depth
-        if self._has_won(board, 1):
-            return -10000 - depth
-
-        valid = [c for c in range(7) if board[0, c, 0] == 0 and board[0, c, 1] == 0]
-
-        if not valid or depth <= 0:
-            return self._evaluate(board)
-
-        # Move ordering for better pruning
-        order = [3, 2, 4, 1, 5, 0, 6]
-        sorted_valid = sorted(valid, key=lambda x: order.index(x) if x in order else 7)
-
-        best = -99999
-        for col in sorted_valid:
-            row = self._get_row(board, col)
-            if row is None:
-                continue
-
-            board[row, col, player] = 1
-            score = -self._minimax(board, depth - 1, -beta, -alpha, 1 - player)
-            board[row, col, player] = 0
-
-            best = max(best, score)
-            alpha = max(alpha, score)
-
-            if alpha >= beta:
-                break
-
-        return best
-
-    def _evaluate(self, board):
-        """Evaluate board position."""
-        score = 0
-
-        # Center column bonus (strong strategic position)
-        center_weight = [0, 1, 2, 3, 2, 1, 0]
-        for row in range(6):
-            for col in range(7):
-                if board[row, col, 0] == 1:
-                    score += center_weight[col]
-                elif board[row, col, 1] == 1:
-                    score -= center_weight[col]
-
-        # Count potential alignments
-        score += self._count_alignments(board, 0)
-        score -= self._count_alignments(board, 1)
-
-        return score
-
-    def _count_alignments(self, board, player):
-        """Count alignment scores for potential wins."""
-        score = 0
-        opp = 1 - player
-
-        # All directions: horizontal, vertical, diagonal, anti-diagonal
-        directions = [
-            (0, 1, 6, 4),   # horizontal
-            (1, 0, 3, 7),   # vertical
-            (1, 1, 3, 4),   # diagonal
-            (1, -1, 3, 4),  # anti-diagonal (start from col 3)
-        ]
-
-        # Horizontal
-        for row in range(6):
-            for col in range(4):
-                window = [board[row, col + i, player] for i in range(4)]
-                opp_window = [board[row, col + i, opp] for i in range(4)]
-                score += self._score_window(window, opp_window)
-
-        # Vertical
-        for row in range(3):
-            for col in range(7):
-                window = [board[row + i, col, player] for i in range(4)]
-                opp_window = [board[row + i, col, opp] for i in range(4)]
-                score += self._score_window(window, opp_window)
-
-        # Diagonal
-        for row in range(3):
-            for col in range(4):
-                window = [board[row + i, col + i, player] for i in range(4)]
-                opp_window = [board[row + i, col + i, opp] for i in range(4)]
-                score += self._score_window(window, opp_window)
-
-        # Anti-diagonal
-        for row in range(3):
-            for col in range(3, 7):
-                window = [board[row + i, col - i, player] for i in range(4)]
-                opp_window = [board[row + i, col - i, opp] for i in range(4)]
-                score += self._score_window(window, opp_window)
-
-        return score
-
-    def _score_window(self, window, opp_window):
-        """Score a window of 4 positions."""
-        mine = sum(window)
-        theirs = sum(opp_window)
-
-        if theirs > 0:
-            return 0  # blocked, no potential
-
-        if mine == 3:
-            return 50
-        elif mine == 2:
-            return 10
-        elif mine == 1:
-            return 1
-        return 0
-
-    def _has_won(self, board, player):
-        """Check if player has won."""
-        # Horizontal
-        for row in range(6):
-            for col in range(4):
-                if all(board[row, col + i, player] == 1 for i in range(4)):
-                    return True
-        # Vertical
-        for row in range(3):
-            for col in range(7):
-                if all(board[row + i, col, player] == 1 for i in range(4)):
-                    return True
-        # Diagonal
-        for row in range(3):
-            for col in range(4):
-                if all(board[row + i, col + i, player] == 1 for i in range(4)):
-                    return True
-        # Anti-diagonal
-        for row in range(3):
-            for col in range(3, 7):
-                if all(board[row + i, col - i, player] == 1 for i in range(4)):
-                    return True
-        return False
-
-    def _get_row(self, board, col):
-        """Find the row where piece will land."""
-        for row in range(5, -1, -1):
-            if board[row, col, 0] == 0 and board[row, col, 1] == 0:
-                return row
-        return None
@@ -1,13 +1,15 @@
 import sys
+import json
 import argparse
 from pettingzoo.classic import connect_four_v3
 
 from src.random_agent import RandomAgent
 from src.rule_based_agent import RuleBasedAgent
 from src.utils import print_board
+from src.instrumentation import format_summary
 
 
-def create_agent(agent_type, player_id):
+def create_agent(agent_type, player_id, workers=1):
     """Create an agent based on type."""
     if agent_type == "random":
         return RandomAgent(name="RandomAgent", player_id=player_id)
@@ -18,7 +20,10 @@ def create_agent(agent_type, player_id):
         return MinimaxAgent(name="MinimaxAgent", player_id=player_id)
     elif agent_type == "mcts":
         from src.mcts_agent import MCTSAgent
-        return MCTSAgent(name="MCTSAgent", player_id=player_id)
+        return MCTSAgent(name="MCTSAgent", player_id=player_id, workers=workers)
+    elif agent_type == "arena":
+        from src.arena_agent import ArenaAgent
+        return ArenaAgent(name="ArenaAgent", player_id=player_id)
     elif agent_type == "human":
         return None
     else:
@@ -97,11 +102,17 @@ def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="Connect Four")
     parser.add_argument("--player1", type=str, default="rule",
-                        choices=["random", "rule", "minimax", "mcts", "human"])
+                        choices=["random", "rule", "minimax", "mcts", "arena", "human"])
     parser.add_argument("--player2", type=str, default="random",
-                        choices=["random", "rule", "minimax", "mcts", "human"])
+                        choices=["random", "rule", "minimax", "mcts", "arena", "human"])
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes searching each MCTS move")
+    parser.add_argument("--stats", action="store_true",
+                        help="print per-move time and search statistics")
+    parser.add_argument("--stats-json", type=str, default=None,
+                        help="write the per-move statistics to this file")
 
     args = parser.parse_args()
 
@@ -109,8 +120,12 @@ def main():
     print("Connect Four")
     print("=" * 40)
 
-    agent1 = create_agent(args.player1, "player_0")
-    agent2 = create_agent(args.player2, "player_1")
+    agent1 = create_agent(args.player1, "player_0", args.workers)
+    agent2 = create_agent(args.player2, "player_1", args.workers)
+    agents = [a for a in (agent1, agent2) if a is not None]
+    if args.stats or args.stats_json:
+        for agent in agents:
+            agent.enable_stats()
 
     if args.games == 1:
         run_game(agent1, agent2, verbose=not args.quiet)
@@ -120,6 +135,14 @@ def main():
             run_game(agent1, agent2, verbose=False)
         print(f"\n{args.games} games completed!")
 
+    if args.stats:
+        print()
+        for agent in agents:
+            print(format_summary(f"{agent.name} ({agent.player_id})", agent.stats))
+    if args.stats_json:
+        with open(args.stats_json, "w") as f:
+            json.dump({agent.player_id: agent.stats.summary() for agent in agents}, f, indent=2)
+
 
 if __name__ == "__main__":
     main()
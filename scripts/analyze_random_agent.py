@@ -1,67 +1,44 @@
 import sys
 import os
 import time
+import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import numpy as np
-from pettingzoo.classic import connect_four_v3
-from src.random_agent import RandomAgent
+from src.simulator import random_policy, simulate
 
-
-def run_game(agent1, agent2):
-    """Run a game."""
-    env = connect_four_v3.env()
-    env.reset()
-
-    agents = {"player_0": agent1, "player_1": agent2}
-    moves = 0
-
-    for name in env.agent_iter():
-        obs, reward, done, trunc, _ = env.last()
-
-        if done or trunc:
-            if reward == 1:
-                winner = name
-            elif reward == -1:
-                winner = "player_1" if name == "player_0" else "player_0"
-            else:
-                winner = "draw"
-            env.step(None)
-            break
-
-        agent = agents[name]
-        action = agent.select_action(obs["observation"], obs["action_mask"])
-        env.step(action)
-        moves += 1
-
-    env.close()
-    return winner, moves
+# games simulated at once
+BATCH = 100000
 
 
 def main():
     """Main analysis."""
+    parser = argparse.ArgumentParser(description="Random agents analysis")
+    parser.add_argument("--games", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
     print("=" * 50)
     print("Random Agents Analysis")
     print("=" * 50)
 
-    num_games = 100
-    agent1 = RandomAgent(name="Random1")
-    agent2 = RandomAgent(name="Random2")
+    num_games = args.games
+    rng = np.random.default_rng(args.seed)
 
     stats = {"player_0": 0, "player_1": 0, "draw": 0}
     all_moves = []
 
     start = time.time()
 
-    for i in range(num_games):
-        winner, moves = run_game(agent1, agent2)
-        stats[winner] += 1
-        all_moves.append(moves)
-
-        if (i + 1) % 20 == 0:
-            print(f"{i + 1}/{num_games} games...")
+    for done in range(0, num_games, BATCH):
+        result = simulate(min(BATCH, num_games - done), (random_policy, random_policy), rng)
+        for key, value in result.counts().items():
+            stats[key] += value
+        all_moves.append(result.lengths)
+        print(f"{done + len(result)}/{num_games} games...")
 
     elapsed = time.time() - start
+    all_moves = np.concatenate(all_moves)
 
     # Results
     print(f"\n[Results over {num_games} games]")
@@ -75,7 +52,8 @@ def main():
 
     print(f"\n[Time]")
     print(f"Total: {elapsed:.2f}s")
-    print(f"Per game: {elapsed/num_games*1000:.2f}ms")
+    print(f"Per game: {elapsed/num_games*1000:.4f}ms")
+    print(f"Games per minute: {num_games / elapsed * 60:.0f}")
 
     print("\nAnalysis complete!")
 
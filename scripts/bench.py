@@ -0,0 +1,376 @@
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import platform
+from functools import lru_cache
+import numpy as np
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agent import Agent
+from src.bitboard import Position, has_alignment, has_alignment_batch
+from src.evaluation import Evaluator
+from src.mcts_agent import MCTSAgent
+from src.minimax_agent import MinimaxAgent
+from src.perft import perft, perft_board
+from src.random_agent import RandomAgent
+from src.rule_based_agent import RuleBasedAgent
+from src.simulator import simulate
+from src.tournament import run_game
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                "data", "bench_baseline.json")
+
+
+@lru_cache(maxsize=None)
+def sample_positions(count, plies, seed=0):
+    """Positions reached by random moves, none of them won or lost yet.
+
+    The same seed always gives the same positions, so every run of a
+    benchmark does the same work. They are built once and shared, so
+    callers must leave them as they found them.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        pos = Position()
+        for _ in range(plies):
+            moves = [c for c in pos.legal_moves() if not pos.is_winning_move(c)]
+            if not moves:
+                break
+            pos.play(rng.choice(moves))
+        else:
+            # keep positions where the side to move has no immediate tactic
+            if not any(pos.is_winning_move(c) for c in pos.legal_moves()):
+                positions.append(pos)
+    return positions
+
+
+# Each benchmark returns (work, seconds), work being the units counted by
+# its rate: checks, positions, moves, leaves, nodes, iterations or games.
+
+def bench_win_detection():
+    """has_alignment on single bitboards."""
+    bits = [p.bits[i] for p in sample_positions(500, 20, seed=1) for i in (0, 1)] * 20
+    start = time.perf_counter()
+    for b in bits:
+        has_alignment(b)
+    return len(bits), time.perf_counter() - start
+
+
+def bench_win_detection_batch():
+    """has_alignment_batch on an array of bitboards."""
+    bits = np.array([p.bits[i] for p in sample_positions(500, 20, seed=1) for i in (0, 1)] * 200,
+                    dtype=np.uint64)
+    start = time.perf_counter()
+    has_alignment_batch(bits)
+    return len(bits), time.perf_counter() - start
+
+
+def bench_evaluation():
+    """Evaluator.evaluate_bits on an array of positions."""
+    positions = sample_positions(500, 16, seed=2)
+    mine = np.array([p.bits[p.player] for p in positions] * 20, dtype=np.uint64)
+    theirs = np.array([p.bits[1 - p.player] for p in positions] * 20, dtype=np.uint64)
+    evaluator = Evaluator()
+    start = time.perf_counter()
+    evaluator.evaluate_bits(mine, theirs)
+    return len(mine), time.perf_counter() - start
+
+
+def bench_incremental_evaluation():
+    """Evaluator.play/undo over every legal move of positions."""
+    positions = sample_positions(500, 16, seed=2)
+    evaluator = Evaluator()
+    moves = 0
+    start = time.perf_counter()
+    for pos in positions:
+        evaluator.reset(pos)
+        for col in pos.legal_moves():
+            evaluator.play(pos, col)
+            evaluator.score(pos.player)
+            evaluator.undo(pos)
+            moves += 1
+    return moves, time.perf_counter() - start
+
+
+def bench_move_generation():
+    """legal_moves, play and undo over every legal move of positions."""
+    positions = sample_positions(500, 16, seed=3) * 10
+    moves = 0
+    start = time.perf_counter()
+    for pos in positions:
+        for col in pos.legal_moves():
+            pos.play(col)
+            pos.undo()
+            moves += 1
+    return moves, time.perf_counter() - start
+
+
+def bench_perft(depth=7):
+    """Perft from the empty board on the bitboard."""
+    start = time.perf_counter()
+    leaves = perft(Position(), depth)
+    return leaves, time.perf_counter() - start
+
+
+def bench_perft_numpy(depth=6):
+    """Perft from the empty board with the NumPy board helpers of BaseAgent."""
+    board = Position().to_board(player=0)
+    start = time.perf_counter()
+    leaves = perft_board(board, depth)
+    return leaves, time.perf_counter() - start
+
+
+def bench_minimax_nodes(depth=6):
+    """MinimaxAgent search to a fixed depth on middle game positions."""
+    agent = MinimaxAgent(max_depth=depth, time_limit=float("inf"), endgame_cells=0)
+    nodes = 0
+    seconds = 0.0
+    for pos in sample_positions(8, 10, seed=4):
+        agent.reset()
+        agent.nodes = 0
+        start = time.perf_counter()
+        agent._start_time = time.time()
+        agent._search(pos, pos.legal_moves())
+        seconds += time.perf_counter() - start
+        nodes += agent.nodes
+    return nodes, seconds
+
+
+# MinimaxAgent options compared by --nodes
+SEARCH_CONFIGS = {
+    "static ordering": {"dynamic_ordering": False, "search_mode": "alphabeta"},
+    "alphabeta": {"search_mode": "alphabeta"},
+    "pvs": {"search_mode": "pvs"},
+    "mtdf": {"search_mode": "mtdf"},
+}
+
+
+def fixed_depth_nodes(depth, **options):
+    """Nodes MinimaxAgent searches to depth on each middle game position."""
+    counts = []
+    for pos in sample_positions(8, 10, seed=4):
+        agent = MinimaxAgent(max_depth=depth, time_limit=float("inf"), endgame_cells=0, **options)
+        agent._start_time = time.time()
+        agent._search(pos, pos.legal_moves())
+        counts.append(agent.nodes)
+    return counts
+
+
+def report_nodes(depth):
+    """Print the nodes of each search configuration on the benchmark positions."""
+    print(f"Nodes to depth {depth}")
+    reference = None
+    for name, options in SEARCH_CONFIGS.items():
+        counts = fixed_depth_nodes(depth, **options)
+        total = sum(counts)
+        reference = reference or total
+        print(f"  {name:<24}{total:>12,} {total / reference:>6.2f}x  "
+              f"{' '.join(map(str, counts))}")
+
+
+def bench_agent_nodes(depth=6):
+    """The ML-Arena Agent search to a fixed depth on middle game positions."""
+    agent = Agent(None)
+    agent.max_depth = depth
+    agent.time_limit = float("inf")
+    agent.endgame_cells = 0
+    nodes = 0
+    seconds = 0.0
+    for pos in sample_positions(8, 10, seed=4):
+        agent.reset()
+        start = time.perf_counter()
+        agent.start_time = time.time()
+        agent._search(pos, pos.legal_moves())
+        seconds += time.perf_counter() - start
+        nodes += agent.search_metrics()["nodes"]
+    return nodes, seconds
+
+
+def bench_mcts_iterations(iterations=2000):
+    """MCTSAgent with a fixed number of iterations on middle game positions."""
+    agent = MCTSAgent(max_iter=iterations, time_limit=float("inf"), seed=0,
+                      reuse_tree=False, endgame_cells=0)
+    mask = np.ones(7, dtype=np.int8)
+    done = 0
+    seconds = 0.0
+    for pos in sample_positions(4, 10, seed=5):
+        agent.reset()
+        observation = pos.to_observation()
+        start = time.perf_counter()
+        agent.select_action(observation, mask)
+        seconds += time.perf_counter() - start
+        done += agent.last_iterations
+    return done, seconds
+
+
+def bench_games():
+    """Full PettingZoo games between RuleBasedAgent and a seeded RandomAgent."""
+    rule = RuleBasedAgent()
+    rand = RandomAgent()
+    games = 50
+    start = time.perf_counter()
+    for game in range(games):
+        rand.set_seed(game)
+        if game % 2:
+            run_game(rule, rand)
+        else:
+            run_game(rand, rule)
+    return games, time.perf_counter() - start
+
+
+def bench_batch_games():
+    """Random games played by the vectorized simulator."""
+    games = 20000
+    start = time.perf_counter()
+    simulate(games, rng=0)
+    return games, time.perf_counter() - start
+
+
+# name: (function, unit, tolerance), the tolerance being the slowdown
+# against the baseline accepted before reporting a regression. Benchmarks
+# through NumPy temporaries or PettingZoo vary more from run to run and
+# get a wider one; the batched win check, bound by memory, varies most.
+BENCHMARKS = {
+    "win_detection": (bench_win_detection, "checks/s", 0.2),
+    "win_detection_batch": (bench_win_detection_batch, "checks/s", 0.4),
+    "evaluation_batch": (bench_evaluation, "positions/s", 0.3),
+    "evaluation_incremental": (bench_incremental_evaluation, "moves/s", 0.2),
+    "move_generation": (bench_move_generation, "moves/s", 0.2),
+    "perft": (bench_perft, "leaves/s", 0.2),
+    "perft_numpy": (bench_perft_numpy, "leaves/s", 0.2),
+    "minimax_nodes": (bench_minimax_nodes, "nodes/s", 0.25),
+    "agent_nodes": (bench_agent_nodes, "nodes/s", 0.25),
+    "mcts_iterations": (bench_mcts_iterations, "iterations/s", 0.25),
+    "games": (bench_games, "games/s", 0.3),
+    "batch_games": (bench_batch_games, "games/s", 0.3),
+}
+
+# shortest time of one measure: workloads are run again until it is reached
+MIN_SECONDS = 0.5
+
+
+def measure(function, min_seconds=MIN_SECONDS):
+    """Run a benchmark until it has taken min_seconds. Returns (work, seconds)."""
+    work = 0
+    seconds = 0.0
+    while seconds < min_seconds:
+        done, spent = function()
+        work += done
+        seconds += spent
+    return work, seconds
+
+
+def run(names, repeat=5, min_seconds=MIN_SECONDS):
+    """Run benchmarks, keeping the median rate of `repeat` measures of each.
+
+    Returns {name: {"rate", "unit", "work", "seconds"}}.
+    """
+    results = {}
+    for name in names:
+        function, unit, _ = BENCHMARKS[name]
+        samples = sorted((measure(function, min_seconds) for _ in range(repeat)),
+                         key=lambda m: m[0] / m[1])
+        work, seconds = samples[len(samples) // 2]
+        results[name] = {"rate": work / seconds, "unit": unit, "work": work, "seconds": seconds}
+        print(f"  {name:<24}{work / seconds:>14,.0f} {unit}")
+    return results
+
+
+def compare(results, baseline, tolerance=None):
+    """Rates more than their tolerance (a fraction) below the baseline.
+
+    `tolerance` replaces the tolerance of every benchmark when given.
+    Returns {name: (rate, baseline rate)} of the regressions and prints
+    the ratio of every benchmark found in the baseline.
+    """
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"  {name:<24}{'new':>14}")
+            continue
+        reference = baseline[name]["rate"]
+        ratio = result["rate"] / reference
+        allowed = BENCHMARKS[name][2] if tolerance is None else tolerance
+        flag = ""
+        if ratio < 1 - allowed:
+            regressions[name] = (result["rate"], reference)
+            flag = "  REGRESSION"
+        print(f"  {name:<24}{ratio:>13.2f}x  (-{allowed:.0%} allowed){flag}")
+    return regressions
+
+
+def main(argv=None):
+    """Run the benchmark suite. Exits with 1 if a benchmark regressed.
+
+    The baseline holds absolute rates measured on one machine: after
+    moving to another machine or Python/NumPy version, store a new one
+    with --update-baseline before comparing.
+    """
+    parser = argparse.ArgumentParser(description="Connect Four benchmarks")
+    parser.add_argument("names", nargs="*",
+                        help=f"benchmarks to run, all by default: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=5, help="measures per benchmark, median kept")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS,
+                        help="shortest time of one measure")
+    parser.add_argument("--output", type=str, default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", type=str, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=None,
+                        help="allowed slowdown against the baseline, as a fraction, "
+                             "for every benchmark instead of their own")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store the results as the new baseline instead of comparing")
+    parser.add_argument("--nodes", type=int, default=None, metavar="DEPTH",
+                        help="only print the nodes each search configuration needs to this depth")
+    args = parser.parse_args(argv)
+
+    if args.nodes is not None:
+        report_nodes(args.nodes)
+        return 0
+
+    names = args.names or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark: {', '.join(unknown)}")
+    print("Benchmarks")
+    results = run(names, args.repeat, args.min_seconds)
+    report = {
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "benchmarks": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        stored = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f)["benchmarks"]
+        stored.update(results)
+        report["benchmarks"] = stored
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}, run with --update-baseline")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)["benchmarks"]
+    print(f"\nAgainst {args.baseline}")
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import sys
+import os
+import time
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bitboard import Position
+from src.corpus import DEFAULT_CORPUS, PHASES, CorpusEntry, write_corpus
+from src.solver import Solver, SolverTimeout
+
+
+def random_position(rng, stones):
+    """Quiet position after random moves, or None.
+
+    Each move is drawn among those that neither win nor let the opponent
+    win at once (when there are any), and the position is dropped if the
+    player to move can win or must block: such positions are solved by
+    any agent checking immediate wins and would only inflate accuracies.
+    """
+    pos = Position()
+    for _ in range(stones):
+        moves = [c for c in pos.legal_moves() if not pos.is_winning_move(c)]
+        if not moves:
+            return None
+        safe = []
+        for col in moves:
+            pos.play(col)
+            if not any(pos.is_winning_move(c) for c in pos.legal_moves()):
+                safe.append(col)
+            pos.undo()
+        pos.play(rng.choice(safe or moves))
+    for col in pos.legal_moves():
+        if pos.is_winning_move(col) or pos.is_winning_move(col, 1 - pos.player):
+            return None
+    return pos
+
+
+def build_phase(solver, rng, phase, count, budget, seen):
+    """Solve random positions of a phase until count of them are labelled.
+
+    Positions the solver cannot finish within `budget` seconds are left
+    out, so the hardest openings are under-represented.
+    """
+    low, high = PHASES[phase]
+    entries = []
+    tried = 0
+    start = time.time()
+    while len(entries) < count:
+        pos = random_position(rng, rng.randint(low, high))
+        if pos is None:
+            continue
+        key = pos.canonical_key()[0]
+        if key in seen:
+            continue
+        seen.add(key)
+        tried += 1
+        try:
+            best, score = solver.best_moves(pos, time.time() + budget)
+        except SolverTimeout:
+            continue
+        entries.append(CorpusEntry(phase, pos.history, score, best))
+        if len(entries) % 100 == 0:
+            print(f"  {phase}: {len(entries)}/{count} "
+                  f"({tried} tried, {time.time() - start:.0f}s)", flush=True)
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the reference position corpus")
+    parser.add_argument("--opening", type=int, default=500)
+    parser.add_argument("--middle", type=int, default=1500)
+    parser.add_argument("--endgame", type=int, default=2000)
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="seconds allowed to solve one position")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=str, default=DEFAULT_CORPUS)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    solver = Solver()
+    seen = set()
+    entries = []
+    for phase in ("endgame", "middle", "opening"):
+        count = getattr(args, phase)
+        print(f"Solving {count} {phase} positions...")
+        entries += build_phase(solver, rng, phase, count, args.budget, seen)
+
+    entries.sort(key=lambda e: (list(PHASES).index(e.phase), len(e.moves), e.moves))
+    write_corpus(args.output, entries)
+    print(f"{len(entries)} positions written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
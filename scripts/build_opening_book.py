@@ -0,0 +1,92 @@
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.bitboard import CENTER_ORDER, Position
+from src.evaluation import ARENA_COLUMN_WEIGHTS, ARENA_WINDOW_WEIGHTS
+from src.minimax_agent import MinimaxAgent
+from src.opening_book import DEFAULT_BOOK, OpeningBook, write_book
+from src.solver import Solver, SolverTimeout
+
+
+def book_positions(max_ply):
+    """All positions up to max_ply, one per mirror pair, in ply order."""
+    positions = {}
+    frontier = [Position()]
+    for ply in range(max_ply + 1):
+        following = []
+        for pos in frontier:
+            key, mirrored = pos.canonical_key()
+            if key in positions:
+                continue
+            positions[key] = pos
+            if ply == max_ply:
+                continue
+            for col in pos.legal_moves():
+                if pos.is_winning_move(col):
+                    continue
+                child = pos.copy()
+                child.play(col)
+                following.append(child)
+        frontier = following
+    return positions
+
+
+def best_move(solver, engine, position, solve_time):
+    """Book move of a position; returns (move, solved).
+
+    The exact solver is tried first for solve_time seconds. When it does
+    not finish, the move comes from a fixed-depth search of the engine.
+    """
+    try:
+        moves, _ = solver.best_moves(position, time.time() + solve_time)
+        return next(c for c in CENTER_ORDER if c in moves), True
+    except SolverTimeout:
+        return engine.search(position, position.legal_moves()), False
+
+
+def main():
+    """Build the opening book."""
+    parser = argparse.ArgumentParser(description="Build the opening book")
+    parser.add_argument("--plies", type=int, default=4, help="deepest ply in the book")
+    parser.add_argument("--depth", type=int, default=11,
+                        help="search depth when the solver does not finish; "
+                             "keep it above what the agent reaches in play")
+    parser.add_argument("--solve-time", type=float, default=1.0,
+                        help="seconds given to the exact solver per position")
+    parser.add_argument("--output", type=str, default=DEFAULT_BOOK)
+    args = parser.parse_args()
+
+    positions = book_positions(args.plies)
+    print(f"{len(positions)} positions up to ply {args.plies}")
+
+    solver = Solver()
+    engine = MinimaxAgent(max_depth=args.depth, time_limit=float("inf"),
+                          window_weights=ARENA_WINDOW_WEIGHTS,
+                          column_weights=ARENA_COLUMN_WEIGHTS)
+    moves = {}
+    solved = 0
+    start = time.time()
+    for i, (key, pos) in enumerate(positions.items(), 1):
+        # search the canonical orientation so the move matches the key
+        if pos.key() != key:
+            pos = Position.from_moves([6 - col for col in pos.history])
+        moves[key], exact = best_move(solver, engine, pos, args.solve_time)
+        solved += exact
+        if i % 50 == 0 or i == len(positions):
+            print(f"  {i}/{len(positions)}  {solved} solved  {time.time() - start:.0f}s",
+                  flush=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_book(args.output, moves, args.plies, depth=args.depth,
+               solve_time=args.solve_time, solved=solved)
+    book = OpeningBook(args.output)
+    print(f"Wrote {len(book)} positions to {args.output} "
+          f"({os.path.getsize(args.output)} bytes, {book.solved} solved, "
+          f"depth {book.depth} otherwise)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from src.bitboard import Position
+from src.mcts_agent import MCTSAgent
+
+POSITIONS = {
+    "empty": [],
+    "opening": [3, 3, 2, 4],
+    "middle": [3, 3, 3, 2, 4, 4, 2, 5, 1, 0],
+}
+
+
+def tree_samples(root, position):
+    """Visits of each tree node, grouped by position. Returns {key: [visits]}."""
+    samples = {}
+
+    def walk(node):
+        samples.setdefault(position.key(), []).append(node.visits)
+        for action, child in node.children.items():
+            position.play(action)
+            walk(child)
+            position.undo()
+
+    walk(root)
+    return samples
+
+
+def run(moves, iterations, transpositions):
+    """Search a position for a fixed number of iterations. Returns (time, {key: [visits]})."""
+    position = Position.from_moves(moves)
+    agent = MCTSAgent(time_limit=1e9, max_iter=iterations, seed=0,
+                      transpositions=transpositions, reuse_tree=True)
+
+    start = time.time()
+    agent._mcts(position, position.legal_moves())
+    elapsed = time.time() - start
+
+    if transpositions:
+        samples = {key: [node.visits] for key, node in agent._graph.nodes.items()}
+    else:
+        samples = tree_samples(agent._root, position.copy())
+    return elapsed, samples
+
+
+def main():
+    """Compare the MCTS tree with the transposition graph."""
+    print("=" * 50)
+    print("MCTS Transpositions Benchmark")
+    print("=" * 50)
+
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    for name, moves in POSITIONS.items():
+        print(f"\n[{name}] {iterations} iterations")
+        tree_time, tree = run(moves, iterations, False)
+        graph_time, graph = run(moves, iterations, True)
+
+        tree_nodes = sum(len(v) for v in tree.values())
+        print(f"  tree : {tree_nodes:6d} nodes, {len(tree):6d} positions, "
+              f"{iterations / tree_time:7.0f} it/s")
+        print(f"  graph: {len(graph):6d} nodes, {len(graph):6d} positions, "
+              f"{iterations / graph_time:7.0f} it/s")
+
+        # positions the tree holds several times: each copy only learns from
+        # its own visits, while the graph pools them
+        repeated = [key for key, v in tree.items() if len(v) > 1 and key in graph]
+        if not repeated:
+            print("  No transpositions reached")
+            continue
+        tree_samples_mean = np.mean([np.mean(tree[key]) for key in repeated])
+        graph_samples_mean = np.mean([graph[key][0] for key in repeated])
+        print(f"  Transposed positions: {len(repeated)}")
+        print(f"  Samples per position: tree {tree_samples_mean:.2f}, "
+              f"graph {graph_samples_mean:.2f} (x{graph_samples_mean / tree_samples_mean:.2f})")
+
+    print("\nBenchmark complete!")
+
+
+if __name__ == "__main__":
+    main()
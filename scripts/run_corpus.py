@@ -0,0 +1,129 @@
+import sys
+import os
+import json
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.arena_agent import ArenaAgent
+from src.base_agent import BaseAgent
+from src.corpus import DEFAULT_CORPUS, PHASES, load_corpus
+from src.instrumentation import AgentStats
+from src.mcts_agent import MCTSAgent
+from src.minimax_agent import MinimaxAgent
+from src.random_agent import RandomAgent
+from src.rule_based_agent import RuleBasedAgent
+from src.solver import Solver
+
+
+class SolverAgent(BaseAgent):
+    """Plays the first best move found by the exact Solver."""
+
+    def __init__(self, name="Solver"):
+        super().__init__(name=name)
+        self.solver = Solver()
+
+    def select_action(self, observation, action_mask):
+        position = self._observation_to_position(observation)
+        return self.solver.best_moves(position)[0][0]
+
+    def search_metrics(self):
+        return {"nodes": self.solver.positions}
+
+    def reset(self):
+        self.solver.tt.clear()
+
+
+def corpus_agents(time_limit, max_depth, max_iter):
+    """Agents by name. Search agents stop at max_depth/max_iter or the time limit."""
+    return {
+        "random": lambda: RandomAgent(seed=0),
+        "rule": lambda: RuleBasedAgent(),
+        "minimax": lambda: MinimaxAgent(max_depth=max_depth, time_limit=time_limit),
+        "mcts": lambda: MCTSAgent(max_iter=max_iter, time_limit=time_limit, seed=0),
+        "agent": lambda: ArenaAgent(time_limit=time_limit, max_depth=max_depth),
+        "solver": lambda: SolverAgent(),
+    }
+
+
+def evaluate(agent, entries):
+    """Play the position of every entry once with a fresh agent state.
+
+    Returns {phase: {"positions", "correct", "stats"}}, a move being
+    correct when it is one of the entry's best moves; stats is the
+    AgentStats of the moves (seconds and search work).
+    """
+    agent.enable_stats()
+    results = {}
+    for entry in entries:
+        agent.reset()
+        observation, mask = entry.observation()
+        move = int(agent.select_action(observation, mask))
+        result = results.setdefault(entry.phase, {"positions": 0, "correct": 0,
+                                                  "stats": AgentStats()})
+        result["positions"] += 1
+        result["correct"] += move in entry.best
+        result["stats"].record(agent.last_metrics)
+    return results
+
+
+def summary(results):
+    """JSON-friendly results: accuracy, time and work per phase."""
+    report = {}
+    for phase, result in results.items():
+        stats = result["stats"].summary()
+        work = next((stats[k] for k in ("nodes", "iterations") if k in stats), None)
+        report[phase] = {
+            "positions": result["positions"],
+            "accuracy": result["correct"] / result["positions"],
+            "seconds_mean": stats["seconds"]["mean"],
+            "seconds_p95": stats["seconds"]["p95"],
+            "work_mean": work["mean"] if work else 0.0,
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score agents on the reference corpus")
+    parser.add_argument("agents", nargs="*", default=["rule", "minimax", "mcts"],
+                        help="random, rule, minimax, mcts, agent or solver")
+    parser.add_argument("--corpus", type=str, default=DEFAULT_CORPUS)
+    parser.add_argument("--phase", action="append", choices=list(PHASES),
+                        help="only these phases (repeatable)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="first positions of each phase only")
+    parser.add_argument("--time-limit", type=float, default=1.0)
+    parser.add_argument("--max-depth", type=int, default=42)
+    parser.add_argument("--max-iter", type=int, default=100000)
+    parser.add_argument("--json", type=str, default=None, help="write the results to this file")
+    args = parser.parse_args()
+
+    entries = load_corpus(args.corpus, args.phase)
+    if args.limit is not None:
+        counts = {}
+        kept = []
+        for entry in entries:
+            counts[entry.phase] = counts.get(entry.phase, 0) + 1
+            if counts[entry.phase] <= args.limit:
+                kept.append(entry)
+        entries = kept
+
+    factories = corpus_agents(args.time_limit, args.max_depth, args.max_iter)
+    report = {}
+    print(f"{len(entries)} positions from {args.corpus}")
+    print(f"\n{'agent':<10}{'phase':<10}{'positions':>10}{'accuracy':>10}"
+          f"{'mean s':>10}{'p95 s':>10}{'work':>12}")
+    for name in args.agents:
+        if name not in factories:
+            parser.error(f"unknown agent: {name}")
+        report[name] = summary(evaluate(factories[name](), entries))
+        for phase, r in report[name].items():
+            print(f"{name:<10}{phase:<10}{r['positions']:>10}{r['accuracy']:>10.1%}"
+                  f"{r['seconds_mean']:>10.4f}{r['seconds_p95']:>10.4f}{r['work_mean']:>12.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
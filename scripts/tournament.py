@@ -1,118 +1,120 @@
 import sys
 import os
+import json
 import time
+import argparse
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-import numpy as np
-from pettingzoo.classic import connect_four_v3
 from src.random_agent import RandomAgent
 from src.rule_based_agent import RuleBasedAgent
-
-
-def run_game(agent1, agent2):
-    """Run a game."""
-    env = connect_four_v3.env()
-    env.reset()
-
-    agents = {"player_0": agent1, "player_1": agent2}
-
-    for name in env.agent_iter():
-        obs, reward, done, trunc, _ = env.last()
-
-        if done or trunc:
-            if reward == 1:
-                winner = name
-            elif reward == -1:
-                winner = "player_1" if name == "player_0" else "player_0"
-            else:
-                winner = "draw"
-            env.step(None)
-            break
-
-        agent = agents[name]
-        action = agent.select_action(obs["observation"], obs["action_mask"])
-        env.step(action)
-
-    env.close()
-    return winner
-
-
-def run_match(agent1, agent2, num_games=50):
-    """Run multiple games between 2 agents."""
-    stats = {"agent1": 0, "agent2": 0, "draw": 0}
-
-    for i in range(num_games):
-        # alternate first player
-        if i % 2 == 0:
-            first, second = agent1, agent2
-            is_first = True
-        else:
-            first, second = agent2, agent1
-            is_first = False
-
-        winner = run_game(first, second)
-
-        if winner == "player_0":
-            if is_first:
-                stats["agent1"] += 1
-            else:
-                stats["agent2"] += 1
-        elif winner == "player_1":
-            if is_first:
-                stats["agent2"] += 1
-            else:
-                stats["agent1"] += 1
-        else:
-            stats["draw"] += 1
-
-    return stats
-
-
-def main():
-    """Main tournament."""
-    print("=" * 50)
-    print("Connect Four Tournament")
-    print("=" * 50)
-
-    # create agents
-    agents = {
-        "RandomAgent": RandomAgent(),
-        "RuleBasedAgent": RuleBasedAgent(),
+from src.ratings import SPRT, elo_ratings, pairing_elo
+from src.instrumentation import format_summary
+from src.tournament import move_stats, read_log, run_tournament
+
+# relative time per move, to schedule the longest pairings first
+AGENT_COST = {
+    "RandomAgent": 0.01,
+    "RuleBasedAgent": 0.01,
+    "MinimaxAgent": 1.0,
+    "MCTSAgent": 1.0,
+    "ArenaAgent": 1.0,
+}
+
+
+def agent_specs(fixed_budget=False):
+    """Tournament agents as {name: (class, kwargs)}.
+
+    With fixed_budget, the search agents stop after a fixed depth or
+    number of iterations instead of a time limit, so their games do not
+    depend on the machine load.
+    """
+    specs = {
+        "RandomAgent": (RandomAgent, {}),
+        "RuleBasedAgent": (RuleBasedAgent, {}),
     }
 
     # import advanced agents if available
     try:
         from src.minimax_agent import MinimaxAgent
-        agents["MinimaxAgent"] = MinimaxAgent()
+        kwargs = {"max_depth": 6, "time_limit": float("inf")} if fixed_budget else {}
+        specs["MinimaxAgent"] = (MinimaxAgent, kwargs)
     except ImportError:
         pass
 
     try:
         from src.mcts_agent import MCTSAgent
-        agents["MCTSAgent"] = MCTSAgent()
+        kwargs = {"max_iter": 2000, "time_limit": float("inf")} if fixed_budget else {}
+        specs["MCTSAgent"] = (MCTSAgent, kwargs)
     except ImportError:
         pass
 
-    names = list(agents.keys())
-    print(f"\nAgents: {', '.join(names)}")
+    try:
+        from src.arena_agent import ArenaAgent
+        kwargs = {"max_depth": 6, "time_limit": float("inf")} if fixed_budget else {}
+        specs["ArenaAgent"] = (ArenaAgent, kwargs)
+    except ImportError:
+        pass
 
-    # run matches
-    results = {}
-    for i, name1 in enumerate(names):
-        for name2 in names[i+1:]:
-            print(f"\n{name1} vs {name2}...")
+    return specs
 
-            agent1 = agents[name1]
-            agent2 = agents[name2]
-            agent1.reset()
-            agent2.reset()
 
-            stats = run_match(agent1, agent2, num_games=50)
-            results[(name1, name2)] = stats
+def main():
+    """Main tournament."""
+    parser = argparse.ArgumentParser(description="Connect Four tournament")
+    parser.add_argument("--games", type=int, default=50,
+                        help="games per pairing (the cap with --sprt)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixed-budget", action="store_true",
+                        help="depth/iteration limits instead of time limits")
+    parser.add_argument("--log", type=str, default="tournament.jsonl",
+                        help="game log, resumed if it was written by the same tournament")
+    parser.add_argument("--fresh", action="store_true", help="discard the existing log")
+    parser.add_argument("--sprt", action="store_true",
+                        help="stop a pairing once the SPRT decides it")
+    parser.add_argument("--sprt-elo", type=float, default=50,
+                        help="SPRT indifference margin in Elo")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--min-games", type=int, default=10)
+    parser.add_argument("--stats", action="store_true",
+                        help="record per-move search metrics and print their histograms")
+    parser.add_argument("--stats-json", type=str, default=None,
+                        help="write the per-agent move statistics to this file")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Connect Four Tournament")
+    print("=" * 50)
 
-            print(f"  {name1}: {stats['agent1']} wins")
-            print(f"  {name2}: {stats['agent2']} wins")
-            print(f"  Draws: {stats['draw']}")
+    specs = agent_specs(args.fixed_budget)
+    names = list(specs)
+    print(f"\nAgents: {', '.join(names)}")
+    print(f"{args.games} games per pairing on {args.workers} workers")
+    if args.fresh and os.path.exists(args.log):
+        os.remove(args.log)
+    print(f"Log: {args.log}")
+    sprt = None
+    if args.sprt:
+        sprt = SPRT(args.sprt_elo, args.alpha, args.beta, args.min_games)
+        print(f"SPRT: +/-{args.sprt_elo:g} Elo, alpha={args.alpha}, beta={args.beta}")
+
+    start = time.time()
+    try:
+        results = run_tournament(specs, games=args.games, workers=args.workers,
+                                 seed=args.seed, cost=AGENT_COST, log=args.log, sprt=sprt,
+                                 stats=args.stats)
+    except ValueError as error:
+        parser.error(f"{error}; use another --log or --fresh")
+    elapsed = time.time() - start
+
+    for (name1, name2), stats in results.items():
+        elo, low, high = pairing_elo(stats["agent1"], stats["agent2"], stats["draw"])
+        print(f"\n{name1} vs {name2}...")
+        print(f"  {name1}: {stats['agent1']} wins")
+        print(f"  {name2}: {stats['agent2']} wins")
+        print(f"  Draws: {stats['draw']}")
+        print(f"  Elo difference: {elo:+.0f} [{low:+.0f}, {high:+.0f}]")
 
     # ranking
     print("\n" + "=" * 50)
@@ -124,11 +126,25 @@ def main():
         total[n1] += stats["agent1"]
         total[n2] += stats["agent2"]
 
-    ranking = sorted(total.items(), key=lambda x: x[1], reverse=True)
-    for i, (name, wins) in enumerate(ranking, 1):
-        print(f"{i}. {name}: {wins} wins")
-
-    print("\nTournament complete!")
+    ratings = elo_ratings(results)
+    ranking = sorted(ratings.items(), key=lambda x: x[1][0], reverse=True)
+    for i, (name, (elo, margin)) in enumerate(ranking, 1):
+        print(f"{i}. {name}: {elo:+.0f} +/- {margin:.0f} Elo ({total[name]} wins)")
+
+    if args.stats or args.stats_json:
+        stats = move_stats(read_log(args.log))
+        if args.stats:
+            print("\n" + "=" * 50)
+            print("Move Statistics")
+            print("=" * 50)
+            for name in names:
+                if name in stats:
+                    print(format_summary(name, stats[name]))
+        if args.stats_json:
+            with open(args.stats_json, "w") as f:
+                json.dump({name: s.summary() for name, s in stats.items()}, f, indent=2)
+
+    print(f"\nTournament complete in {elapsed:.1f}s!")
 
 
 if __name__ == "__main__":
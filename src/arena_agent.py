@@ -0,0 +1,28 @@
+from agent import Agent
+from .base_agent import BaseAgent
+
+
+class ArenaAgent(BaseAgent):
+    """The ML-Arena Agent of agent.py behind the BaseAgent interface.
+
+    Lets the submitted agent play in main.py, tournaments and the corpus
+    runner, and have its choose_action timed by enable_stats.
+    """
+
+    def __init__(self, name="ArenaAgent", player_id=None, time_limit=2.5, max_depth=42):
+        super().__init__(name=name, player_id=player_id)
+        self.agent = Agent(None, player_name=player_id)
+        self.agent.time_limit = time_limit
+        self.agent.max_depth = max_depth
+
+    def select_action(self, observation, action_mask):
+        """Select an action with Agent.choose_action."""
+        return self.agent.choose_action(observation, action_mask=action_mask)
+
+    def search_metrics(self):
+        """Search work of the last move."""
+        return self.agent.search_metrics()
+
+    def reset(self):
+        """Reset the agent."""
+        self.agent.reset()
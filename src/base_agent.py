@@ -1,5 +1,8 @@
+import time
 from abc import ABC, abstractmethod
 import numpy as np
+from .bitboard import Position
+from .instrumentation import AgentStats, with_rates
 
 
 class BaseAgent(ABC):
@@ -8,12 +11,45 @@ class BaseAgent(ABC):
     def __init__(self, name="BaseAgent", player_id=None):
         self.name = name
         self.player_id = player_id
+        self.stats = None
+        self.last_metrics = None
 
     @abstractmethod
     def select_action(self, observation, action_mask):
         """Select an action. Must be implemented in subclasses."""
         pass
 
+    def enable_stats(self):
+        """Record the wall time and search work of every select_action call.
+
+        The metrics of the last call are kept in `last_metrics` and counted
+        in the `stats` histograms. Recording wraps select_action on this
+        instance only, so agents without stats pay nothing.
+        """
+        self.stats = AgentStats()
+        select = type(self).select_action
+
+        def select_action(observation, action_mask):
+            start = time.perf_counter()
+            action = select(self, observation, action_mask)
+            metrics = {"seconds": time.perf_counter() - start}
+            metrics.update(self.search_metrics())
+            self.last_metrics = with_rates(metrics)
+            self.stats.record(self.last_metrics)
+            return action
+
+        self.select_action = select_action
+
+    def disable_stats(self):
+        """Stop recording."""
+        self.__dict__.pop("select_action", None)
+        self.stats = None
+        self.last_metrics = None
+
+    def search_metrics(self):
+        """Work done by the last select_action call, e.g. {"nodes": n}."""
+        return {}
+
     def _get_valid_actions(self, action_mask):
         """Return list of valid actions."""
         return [i for i, v in enumerate(action_mask) if v == 1]
@@ -25,6 +61,10 @@ class BaseAgent(ABC):
         board[observation[:, :, 1] == 1] = 2  # opponent pieces
         return board
 
+    def _observation_to_position(self, observation):
+        """Convert observation to a bitboard position."""
+        return Position.from_observation(observation)
+
     def _get_next_row(self, board, col):
         """Find the row where a piece will land."""
         for row in range(5, -1, -1):
@@ -55,18 +95,14 @@ class BaseAgent(ABC):
                 return True
         return False
 
-    def _find_winning_move(self, board, action_mask, player):
-        """Find a winning move if available."""
+    def _find_winning_move(self, position, action_mask, player):
+        """Find a winning move if available (player 1 = me, 2 = opponent)."""
         valid = self._get_valid_actions(action_mask)
+        p = position.player if player == 1 else 1 - position.player
 
         for col in valid:
-            row = self._get_next_row(board, col)
-            if row != -1:
-                board[row, col] = player
-                if self._check_win_from_position(board, row, col, player):
-                    board[row, col] = 0
-                    return col
-                board[row, col] = 0
+            if position.can_play(col) and position.is_winning_move(col, p):
+                return col
         return -1
 
     def reset(self):
@@ -0,0 +1,335 @@
+"""Bitboard representation of a Connect Four position.
+
+Each player's stones are kept in one integer bitmask. Bits are laid out
+column by column, 7 bits per column (6 cells plus a sentinel bit on top),
+bit 0 being the bottom cell of column 0:
+
+     6 13 20 27 34 41 48   <- sentinel row
+     5 12 19 26 33 40 47
+     4 11 18 25 32 39 46
+     3 10 17 24 31 38 45
+     2  9 16 23 30 37 44
+     1  8 15 22 29 36 43
+     0  7 14 21 28 35 42
+"""
+
+import numpy as np
+
+WIDTH = 7
+HEIGHT = 6
+H1 = HEIGHT + 1
+
+CENTER_ORDER = [3, 2, 4, 1, 5, 0, 6]
+
+BOTTOM_MASK = sum(1 << (col * H1) for col in range(WIDTH))
+BOARD_MASK = BOTTOM_MASK * ((1 << HEIGHT) - 1)
+
+
+def bottom_mask(col):
+    """Bit of the lowest cell of a column."""
+    return 1 << (col * H1)
+
+
+def top_mask(col):
+    """Bit of the highest cell of a column."""
+    return 1 << (HEIGHT - 1 + col * H1)
+
+
+def column_mask(col):
+    """Bits of all the cells of a column."""
+    return ((1 << HEIGHT) - 1) << (col * H1)
+
+
+def cell_bit(row, col):
+    """Bit of a cell given in observation coordinates (row 0 is the top)."""
+    return 1 << (col * H1 + HEIGHT - 1 - row)
+
+
+def _window_cells():
+    """List the 69 windows of 4 cells, as (row, col) tuples."""
+    windows = []
+    # horizontal
+    for row in range(HEIGHT):
+        for col in range(WIDTH - 3):
+            windows.append(tuple((row, col + i) for i in range(4)))
+    # vertical
+    for row in range(HEIGHT - 3):
+        for col in range(WIDTH):
+            windows.append(tuple((row + i, col) for i in range(4)))
+    # diagonal
+    for row in range(HEIGHT - 3):
+        for col in range(WIDTH - 3):
+            windows.append(tuple((row + i, col + i) for i in range(4)))
+    # anti-diagonal
+    for row in range(HEIGHT - 3):
+        for col in range(3, WIDTH):
+            windows.append(tuple((row + i, col - i) for i in range(4)))
+    return windows
+
+
+WINDOW_CELLS = _window_cells()
+WINDOWS = [sum(cell_bit(r, c) for r, c in cells) for cells in WINDOW_CELLS]
+
+
+def has_alignment(bits):
+    """Check if a bitmask contains 4 aligned stones."""
+    # horizontal
+    m = bits & (bits >> H1)
+    if m & (m >> (2 * H1)):
+        return True
+    # diagonal
+    m = bits & (bits >> HEIGHT)
+    if m & (m >> (2 * HEIGHT)):
+        return True
+    # anti-diagonal
+    m = bits & (bits >> (H1 + 1))
+    if m & (m >> (2 * (H1 + 1))):
+        return True
+    # vertical
+    m = bits & (bits >> 1)
+    if m & (m >> 2):
+        return True
+    return False
+
+
+def has_alignment_batch(bits):
+    """Vectorized has_alignment over an array of bitmasks."""
+    bits = np.asarray(bits, dtype=np.uint64)
+    found = np.zeros(bits.shape, dtype=bool)
+    for shift in (H1, HEIGHT, H1 + 1, 1):
+        m = bits & (bits >> np.uint64(shift))
+        found |= (m & (m >> np.uint64(2 * shift))) != 0
+    return found
+
+
+def winning_cells(bits, mask):
+    """Bitmask of the empty cells that would complete 4 in a row for bits.
+
+    Works on Python integers and on NumPy uint64 arrays alike.
+    """
+    # vertical
+    r = (bits << 1) & (bits << 2) & (bits << 3)
+
+    for shift in (H1, HEIGHT, H1 + 1):
+        # pair of stones on each side
+        p = (bits << shift) & (bits << (2 * shift))
+        r |= p & (bits << (3 * shift))
+        r |= p & (bits >> shift)
+        p = (bits >> shift) & (bits >> (2 * shift))
+        r |= p & (bits << shift)
+        r |= p & (bits >> (3 * shift))
+
+    return r & (BOARD_MASK ^ mask)
+
+
+# bit of each cell of a 6x7 board, in observation coordinates
+CELL_BITS = np.array(
+    [[1 << (col * H1 + HEIGHT - 1 - row) for col in range(WIDTH)] for row in range(HEIGHT)],
+    dtype=np.uint64,
+)
+
+
+def boards_to_bits(boards, player):
+    """Bitmasks of the stones of player on one or more 6x7 boards."""
+    boards = np.asarray(boards)
+    return np.where(boards == player, CELL_BITS, np.uint64(0)).sum(axis=(-2, -1), dtype=np.uint64)
+
+
+def mirror(bits):
+    """Bitboard (or position key) of the left-right mirrored board."""
+    column = (1 << H1) - 1
+    result = 0
+    for col in range(WIDTH):
+        result |= ((bits >> (col * H1)) & column) << ((WIDTH - 1 - col) * H1)
+    return result
+
+
+def popcount(bits):
+    """Number of set bits."""
+    return bin(bits).count("1")
+
+
+class Position:
+    """Connect Four position stored as two bitmasks and column heights.
+
+    Players are indexed 0 (first to move) and 1. `bits[p]` holds the stones
+    of player p and `heights[c]` the number of stones in column c.
+    """
+
+    __slots__ = ("bits", "heights", "moves", "history")
+
+    def __init__(self):
+        self.bits = [0, 0]
+        self.heights = [0] * WIDTH
+        self.moves = 0
+        self.history = []
+
+    @classmethod
+    def from_moves(cls, moves):
+        """Build a position by playing a sequence of columns."""
+        pos = cls()
+        for col in moves:
+            if not pos.can_play(col):
+                raise ValueError(f"Column {col} is full")
+            pos.play(col)
+        return pos
+
+    @classmethod
+    def from_observation(cls, observation):
+        """Build a position from a PettingZoo observation (6, 7, 2).
+
+        Channel 0 holds the stones of the player to move, channel 1 those of
+        the opponent.
+        """
+        mine = 0
+        theirs = 0
+        for row in range(HEIGHT):
+            for col in range(WIDTH):
+                if observation[row, col, 0] == 1:
+                    mine |= cell_bit(row, col)
+                elif observation[row, col, 1] == 1:
+                    theirs |= cell_bit(row, col)
+        return cls._from_bits(mine, theirs)
+
+    @classmethod
+    def from_board(cls, board, player=1):
+        """Build a position from a 6x7 board (0 empty, 1 or 2).
+
+        `player` is the value of the stones of the player to move.
+        """
+        mine = 0
+        theirs = 0
+        for row in range(HEIGHT):
+            for col in range(WIDTH):
+                if board[row, col] == player:
+                    mine |= cell_bit(row, col)
+                elif board[row, col] != 0:
+                    theirs |= cell_bit(row, col)
+        return cls._from_bits(mine, theirs)
+
+    @classmethod
+    def _from_bits(cls, mine, theirs):
+        """Build a position from the stones of the player to move and the opponent."""
+        pos = cls()
+        pos.moves = popcount(mine | theirs)
+        # the player to move is player 0 when both have the same number of stones
+        if pos.moves % 2 == 0:
+            pos.bits = [mine, theirs]
+        else:
+            pos.bits = [theirs, mine]
+        mask = mine | theirs
+        for col in range(WIDTH):
+            pos.heights[col] = popcount(mask & column_mask(col))
+        return pos
+
+    @property
+    def player(self):
+        """Index of the player to move."""
+        return self.moves & 1
+
+    @property
+    def mask(self):
+        """Bitmask of all stones."""
+        return self.bits[0] | self.bits[1]
+
+    def copy(self):
+        """Return an independent copy."""
+        pos = Position.__new__(Position)
+        pos.bits = self.bits[:]
+        pos.heights = self.heights[:]
+        pos.moves = self.moves
+        pos.history = self.history[:]
+        return pos
+
+    def can_play(self, col):
+        """Check if a column is not full."""
+        return self.heights[col] < HEIGHT
+
+    def legal_moves(self):
+        """Return the list of playable columns."""
+        return [col for col in range(WIDTH) if self.heights[col] < HEIGHT]
+
+    def legal_mask(self):
+        """Bitmask of the cells where a stone can be dropped."""
+        return (self.mask + BOTTOM_MASK) & BOARD_MASK
+
+    def move_bit(self, col):
+        """Bit of the cell where a stone dropped in col lands."""
+        return 1 << (col * H1 + self.heights[col])
+
+    def play(self, col):
+        """Drop a stone of the player to move in col."""
+        self.bits[self.moves & 1] |= 1 << (col * H1 + self.heights[col])
+        self.heights[col] += 1
+        self.moves += 1
+        self.history.append(col)
+
+    def undo(self):
+        """Take back the last move."""
+        col = self.history.pop()
+        self.moves -= 1
+        self.heights[col] -= 1
+        self.bits[self.moves & 1] ^= 1 << (col * H1 + self.heights[col])
+
+    def is_winning_move(self, col, player=None):
+        """Check if dropping a stone of player in col makes 4 in a row."""
+        if player is None:
+            player = self.moves & 1
+        return has_alignment(self.bits[player] | (1 << (col * H1 + self.heights[col])))
+
+    def has_won(self, player):
+        """Check if a player has 4 in a row."""
+        return has_alignment(self.bits[player])
+
+    def winner(self):
+        """Return the index of the winning player, or -1."""
+        if has_alignment(self.bits[0]):
+            return 0
+        if has_alignment(self.bits[1]):
+            return 1
+        return -1
+
+    def is_full(self):
+        """Check if the board is full."""
+        return self.moves == WIDTH * HEIGHT
+
+    def key(self):
+        """Unique integer key of the position."""
+        return self.bits[self.moves & 1] + self.mask
+
+    def canonical_key(self):
+        """Smallest of the keys of the position and of its mirror image.
+
+        Returns (key, mirrored), mirrored telling whether the key is the
+        mirror image's, in which case column c maps to WIDTH - 1 - c.
+        """
+        key = self.key()
+        other = mirror(key)
+        if other < key:
+            return other, True
+        return key, False
+
+    def to_board(self, player=None):
+        """Convert to a 6x7 board with 1 for player and 2 for the other."""
+        if player is None:
+            player = self.moves & 1
+        board = np.zeros((HEIGHT, WIDTH), dtype=np.int8)
+        for row in range(HEIGHT):
+            for col in range(WIDTH):
+                bit = cell_bit(row, col)
+                if self.bits[player] & bit:
+                    board[row, col] = 1
+                elif self.bits[1 - player] & bit:
+                    board[row, col] = 2
+        return board
+
+    def to_observation(self):
+        """Convert to a PettingZoo observation for the player to move."""
+        board = self.to_board()
+        obs = np.zeros((HEIGHT, WIDTH, 2), dtype=np.int8)
+        obs[:, :, 0] = board == 1
+        obs[:, :, 1] = board == 2
+        return obs
+
+    def __repr__(self):
+        return f"Position(moves={''.join(str(c) for c in self.history)!r})"
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+from .bitboard import WIDTH, Position
+
+# first line of a corpus file
+FORMAT = "# c4corpus 1"
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "data", "corpus_v1.txt")
+
+# stones on the board of the positions of each phase
+PHASES = {
+    "opening": (8, 14),
+    "middle": (15, 28),
+    "endgame": (29, 38),
+}
+
+
+def phase_of(stones):
+    """Phase of a position with that many stones, None outside every phase."""
+    for phase, (low, high) in PHASES.items():
+        if low <= stones <= high:
+            return phase
+    return None
+
+
+class CorpusEntry:
+    """A position of the corpus with its exact solution.
+
+    `moves` are the columns (0-6) played from the empty board, `score` the
+    Solver score for the player to move (22 minus the winner's stones,
+    negative when losing, 0 for a draw) and `best` the columns reaching it.
+    """
+
+    __slots__ = ("phase", "moves", "score", "best")
+
+    def __init__(self, phase, moves, score, best):
+        self.phase = phase
+        self.moves = list(moves)
+        self.score = score
+        self.best = list(best)
+
+    @property
+    def value(self):
+        """Game value for the player to move: 1 win, 0 draw, -1 loss."""
+        return (self.score > 0) - (self.score < 0)
+
+    def position(self):
+        return Position.from_moves(self.moves)
+
+    def observation(self):
+        """PettingZoo observation and action mask of the position."""
+        pos = self.position()
+        mask = np.array([1 if pos.can_play(c) else 0 for c in range(WIDTH)], dtype=np.int8)
+        return pos.to_observation(), mask
+
+    def to_line(self):
+        moves = "".join(map(str, self.moves))
+        return f"{self.phase} {moves} {self.score:+d} {''.join(map(str, self.best))}"
+
+    @classmethod
+    def from_line(cls, line):
+        phase, moves, score, best = line.split()
+        return cls(phase, map(int, moves), int(score), map(int, best))
+
+    def __repr__(self):
+        return f"CorpusEntry({self.to_line()!r})"
+
+
+def write_corpus(path, entries):
+    """Write entries as text, one position per line after the format line."""
+    with open(path, "w") as f:
+        f.write(FORMAT + "\n")
+        f.write("# phase moves score best\n")
+        for entry in entries:
+            f.write(entry.to_line() + "\n")
+
+
+def load_corpus(path=DEFAULT_CORPUS, phases=None):
+    """Entries of a corpus file, only those of `phases` if given."""
+    with open(path) as f:
+        if f.readline().strip() != FORMAT:
+            raise ValueError(f"Not a corpus file of format {FORMAT!r}: {path}")
+        entries = []
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            entry = CorpusEntry.from_line(line)
+            if phases is None or entry.phase in phases:
+                entries.append(entry)
+    return entries
+
+
+def as_moves(entries):
+    """Move sequences of entries."""
+    return [entry.moves for entry in entries]
+
+
+def as_observations(entries):
+    """Observations (n, 6, 7, 2) and action masks (n, 7) of entries."""
+    observations, masks = zip(*(entry.observation() for entry in entries))
+    return np.array(observations), np.array(masks)
+
+
+def as_bitboards(entries):
+    """Stones of the player to move and of the opponent, as uint64 arrays."""
+    positions = [entry.position() for entry in entries]
+    mine = np.array([p.bits[p.player] for p in positions], dtype=np.uint64)
+    theirs = np.array([p.bits[1 - p.player] for p in positions], dtype=np.uint64)
+    return mine, theirs
@@ -0,0 +1,139 @@
+import time
+from .bitboard import BOARD_MASK, BOTTOM_MASK, CENTER_ORDER, HEIGHT, WIDTH, winning_cells
+from .solver import COLUMN_MASKS, move_score, non_losing_moves
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+
+class EndgameTimeout(Exception):
+    """Raised when a solve runs past its deadline."""
+
+
+class EndgameSolver:
+    """Exact win/draw/loss solver working on raw bitboards.
+
+    The value of a position (1, 0 or -1 for the player to move) is found
+    with two null-window searches: one asks whether it is a win, the other
+    whether it is at least a draw. The negamax prunes moves that let the
+    opponent win at once, answers forced blocks and double threats without
+    searching, tries the moves creating the most threats first, and keeps
+    bounds in a TranspositionTable.
+
+    `positions` counts the positions searched by the last solve.
+    """
+
+    def __init__(self, tt_size=1 << 18):
+        self.tt = TranspositionTable(tt_size)
+        self.positions = 0
+        self.deadline = None
+
+    def solve(self, position, deadline=None):
+        """Value of a position for the player to move: WIN, DRAW or LOSS."""
+        self.positions = 0
+        self.deadline = deadline
+        current = position.bits[position.player]
+        return self._solve(current, position.mask, position.moves)
+
+    def best_move(self, position, moves=None, deadline=None):
+        """Best move among moves (all legal moves by default). Returns (move, value).
+
+        Raises EndgameTimeout if the deadline (a time.time() value) passes.
+        """
+        self.positions = 0
+        self.deadline = deadline
+        if moves is None:
+            moves = position.legal_moves()
+        current = position.bits[position.player]
+        mask = position.mask
+        playable = (mask + BOTTOM_MASK) & BOARD_MASK
+        wins = winning_cells(current, mask) & playable
+        for col in moves:
+            if wins & COLUMN_MASKS[col]:
+                return col, WIN
+
+        best, best_value = moves[0], LOSS - 1
+        for col in sorted(moves, key=CENTER_ORDER.index):
+            move = playable & COLUMN_MASKS[col]
+            value = -self._solve(current ^ mask, mask | move, position.moves + 1)
+            if value > best_value:
+                best, best_value = col, value
+                if value == WIN:
+                    break
+        return best, best_value
+
+    def _solve(self, current, mask, moves):
+        """Narrow the value with null-window searches."""
+        if self._negamax(current, mask, moves, DRAW, WIN) >= WIN:
+            return WIN
+        if self._negamax(current, mask, moves, LOSS, DRAW) >= DRAW:
+            return DRAW
+        return LOSS
+
+    def _negamax(self, current, mask, moves, alpha, beta):
+        """Negamax value for the player owning current, searched in [alpha, beta]."""
+        self.positions += 1
+        if (self.deadline is not None and self.positions & 1023 == 0
+                and time.time() > self.deadline):
+            raise EndgameTimeout()
+
+        playable = (mask + BOTTOM_MASK) & BOARD_MASK
+        if winning_cells(current, mask) & playable:
+            return WIN
+        # the last empty cell cannot lose
+        if moves >= WIDTH * HEIGHT - 1:
+            return DRAW
+
+        playable = non_losing_moves(current, mask)
+        if not playable:
+            return LOSS
+
+        key = current + mask
+        alpha_orig = alpha
+        tt_move = -1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            value, _, flag, tt_move = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value
+
+        # moves creating the most threats first, then center columns
+        candidates = []
+        for i, col in enumerate(CENTER_ORDER):
+            move = playable & COLUMN_MASKS[col]
+            if move:
+                score = move_score(current, mask, move)
+                if col == tt_move:
+                    score += 100
+                candidates.append((-score, i, col, move))
+        candidates.sort()
+
+        opponent = current ^ mask
+        best = LOSS
+        best_move = candidates[0][2]
+        for _, _, col, move in candidates:
+            value = -self._negamax(opponent, mask | move, moves + 1, -beta, -alpha)
+            if value > best:
+                best = value
+                best_move = col
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, 0, best, flag, best_move)
+        return best
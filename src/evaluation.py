@@ -0,0 +1,178 @@
+import numpy as np
+from .bitboard import H1, HEIGHT, WIDTH, WINDOW_CELLS, WINDOWS
+
+# utils.evaluate_position weights: center column bonus only
+CENTER_WINDOW_WEIGHTS = (0, 0, 0)
+CENTER_COLUMN_WEIGHTS = (0, 0, 0, 3, 0, 0, 0)
+
+# MinimaxAgent weights: 2 and 3 stones in an open window, center column bonus
+MINIMAX_WINDOW_WEIGHTS = (0, 2, 5)
+MINIMAX_COLUMN_WEIGHTS = (0, 0, 0, 3, 0, 0, 0)
+
+# agent.py weights: 1, 2 and 3 stones in an open window, center-graded columns
+ARENA_WINDOW_WEIGHTS = (1, 10, 50)
+ARENA_COLUMN_WEIGHTS = (0, 1, 2, 3, 2, 1, 0)
+
+
+def _cell_windows():
+    """Indices of the windows containing each bit of the bitboard."""
+    windows = [[] for _ in range(WIDTH * H1)]
+    for w, cells in enumerate(WINDOW_CELLS):
+        for row, col in cells:
+            windows[col * H1 + HEIGHT - 1 - row].append(w)
+    return windows
+
+
+CELL_WINDOWS = _cell_windows()
+
+# the 69 windows as flat 6x7 board indices
+WINDOW_INDEX = np.array([[row * WIDTH + col for row, col in cells] for cells in WINDOW_CELLS])
+
+# bit index and column of the 42 cells, in flat board order
+CELL_BITS = np.array(
+    [col * H1 + HEIGHT - 1 - row for row in range(HEIGHT) for col in range(WIDTH)],
+    dtype=np.uint64,
+)
+CELL_COLUMNS = np.array([col for row in range(HEIGHT) for col in range(WIDTH)])
+
+# a window's pattern is sum(cell * 3**i), cell being 0 empty, 1 mine, 2 theirs
+PATTERN_POWERS = np.array([1, 3, 9, 27])
+
+
+class Evaluator:
+    """Window heuristic kept up to date through make/unmake.
+
+    A window holding only one player's stones is worth
+    `window_weights[n - 1]` to that player (n = 1, 2 or 3 stones), and each
+    stone is worth the weight of its column. The evaluator stores, for each
+    of the 69 windows, a code 5 * (player 0 stones) + (player 1 stones) and
+    the running total from player 0's view, so a move only touches the
+    (at most 13) windows through its cell and reading the score is O(1).
+
+    Full evaluations gather each window's 3^4 occupancy pattern and look it
+    up in a precomputed table, for one board or an array of boards at once.
+    """
+
+    def __init__(self, window_weights=MINIMAX_WINDOW_WEIGHTS,
+                 column_weights=MINIMAX_COLUMN_WEIGHTS):
+        self.window_weights = tuple(window_weights)
+        self.column_weights = tuple(column_weights)
+
+        # value of a window code, from player 0's view
+        self.values = [0] * 25
+        for mine in range(5):
+            for theirs in range(5 - mine):
+                self.values[5 * mine + theirs] = self.window_value(mine, theirs)
+
+        # value of each of the 3^4 window patterns, for the player owning 1s
+        self.pattern_values = np.zeros(81, dtype=np.int64)
+        for pattern in range(81):
+            cells = [pattern // 3 ** i % 3 for i in range(4)]
+            self.pattern_values[pattern] = self.window_value(cells.count(1), cells.count(2))
+
+        self.cell_values = [self.column_weights[b // H1] for b in range(WIDTH * H1)]
+        self.board_cell_values = np.array(self.column_weights, dtype=np.int64)[CELL_COLUMNS]
+        self.codes = [0] * len(WINDOWS)
+        self.total = 0
+
+    def window_value(self, mine, theirs):
+        """Value of a window holding mine and theirs stones."""
+        weights = (0,) + self.window_weights + (0,)
+        if theirs == 0:
+            return weights[mine]
+        if mine == 0:
+            return -weights[theirs]
+        return 0
+
+    def reset(self, position):
+        """Recompute the window codes and total for a position."""
+        self.codes = [0] * len(WINDOWS)
+        self.total = 0
+        for player, step in ((0, 5), (1, 1)):
+            bits = position.bits[player]
+            sign = 1 if player == 0 else -1
+            for b in range(WIDTH * H1):
+                if bits >> b & 1:
+                    for w in CELL_WINDOWS[b]:
+                        self.codes[w] += step
+                    self.total += sign * self.cell_values[b]
+        self.total += sum(self.values[code] for code in self.codes)
+
+    def add(self, player, cell):
+        """Update for a stone of player dropped on bit index cell."""
+        codes = self.codes
+        values = self.values
+        step = 5 if player == 0 else 1
+        total = self.total
+        for w in CELL_WINDOWS[cell]:
+            code = codes[w]
+            codes[w] = code + step
+            total += values[code + step] - values[code]
+        if player == 0:
+            self.total = total + self.cell_values[cell]
+        else:
+            self.total = total - self.cell_values[cell]
+
+    def remove(self, player, cell):
+        """Update for a stone of player taken back from bit index cell."""
+        codes = self.codes
+        values = self.values
+        step = 5 if player == 0 else 1
+        total = self.total
+        for w in CELL_WINDOWS[cell]:
+            code = codes[w]
+            codes[w] = code - step
+            total += values[code - step] - values[code]
+        if player == 0:
+            self.total = total - self.cell_values[cell]
+        else:
+            self.total = total + self.cell_values[cell]
+
+    def play(self, position, col):
+        """Play a move on position and update the evaluation."""
+        self.add(position.player, col * H1 + position.heights[col])
+        position.play(col)
+
+    def undo(self, position):
+        """Take back the last move of position and update the evaluation."""
+        col = position.history[-1]
+        position.undo()
+        self.remove(position.player, col * H1 + position.heights[col])
+
+    def score(self, player):
+        """Current score for player (0 or 1)."""
+        return self.total if player == 0 else -self.total
+
+    def evaluate(self, position):
+        """Score a position from scratch for the player to move."""
+        mine = position.bits[position.player]
+        theirs = position.bits[1 - position.player]
+        return int(self.evaluate_bits(mine, theirs))
+
+    def evaluate_bits(self, mine, theirs):
+        """Score bitboards (ints or uint64 arrays) for the owner of mine.
+
+        Each window is gathered into a 3^4 pattern and scored with one
+        table lookup.
+        """
+        mine = np.asarray(mine, dtype=np.uint64)[..., None]
+        theirs = np.asarray(theirs, dtype=np.uint64)[..., None]
+        one = np.uint64(1)
+
+        cells = ((mine >> CELL_BITS) & one).astype(np.int64)
+        cells += 2 * ((theirs >> CELL_BITS) & one).astype(np.int64)
+        return self._score_cells(cells)
+
+    def evaluate_boards(self, boards, player=1):
+        """Score one or more 6x7 boards (0 empty, 1 or 2) for player."""
+        boards = np.asarray(boards)
+        flat = boards.reshape(boards.shape[:-2] + (HEIGHT * WIDTH,))
+        cells = (flat == player).astype(np.int64) + 2 * ((flat != player) & (flat != 0))
+        return self._score_cells(cells)
+
+    def _score_cells(self, cells):
+        """Score flat boards coded 0 empty, 1 mine, 2 theirs."""
+        patterns = cells[..., WINDOW_INDEX] @ PATTERN_POWERS
+        score = self.pattern_values[patterns].sum(axis=-1)
+        score += ((cells == 1).astype(np.int64) - (cells == 2)) @ self.board_cell_values
+        return score
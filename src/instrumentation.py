@@ -0,0 +1,115 @@
+import math
+
+
+class Histogram:
+    """Streaming histogram with log-spaced buckets.
+
+    Values are counted in buckets `growth` times wider than the previous
+    one, so percentiles are within that relative error (2% by default)
+    while the memory only depends on the range of the values.
+    """
+
+    def __init__(self, growth=1.02, smallest=1e-6):
+        self.growth = growth
+        self.smallest = smallest
+        self._log_growth = math.log(growth)
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def _bucket(self, value):
+        if value <= 0:
+            return -1
+        if value <= self.smallest:
+            return 0
+        return math.ceil(math.log(value / self.smallest) / self._log_growth)
+
+    def add(self, value):
+        """Count one value."""
+        bucket = self._bucket(value)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """Add the values counted by another histogram with the same buckets."""
+        for bucket, n in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the q-th percentile (0-100)."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                if bucket < 0:
+                    return 0.0
+                return min(self.smallest * self.growth ** bucket, self.max)
+        return self.max
+
+    def summary(self):
+        """Count, mean, p50, p95, p99 and max."""
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class AgentStats:
+    """One histogram per metric of an agent's moves."""
+
+    def __init__(self):
+        self.metrics = {}
+
+    def record(self, metrics):
+        """Count the metrics of one move: {name: value}."""
+        for name, value in metrics.items():
+            histogram = self.metrics.get(name)
+            if histogram is None:
+                histogram = self.metrics[name] = Histogram()
+            histogram.add(value)
+
+    def merge(self, other):
+        """Add the moves counted by another AgentStats."""
+        for name, histogram in other.metrics.items():
+            self.metrics.setdefault(name, Histogram()).merge(histogram)
+
+    def summary(self):
+        """{metric: histogram summary}."""
+        return {name: h.summary() for name, h in self.metrics.items()}
+
+
+def with_rates(metrics):
+    """Add the per-second rate of the work counters of a move's metrics."""
+    seconds = metrics.get("seconds", 0.0)
+    if seconds > 0:
+        for name in ("nodes", "iterations"):
+            if metrics.get(name):
+                metrics[f"{name}_per_second"] = metrics[name] / seconds
+    return metrics
+
+
+def format_summary(name, stats):
+    """Text table of an AgentStats summary."""
+    lines = [f"{name}:", f"  {'metric':<24}{'count':>8}{'p50':>12}{'p95':>12}"
+                         f"{'p99':>12}{'max':>12}"]
+    for metric, s in sorted(stats.summary().items()):
+        lines.append(f"  {metric:<24}{s['count']:>8}{s['p50']:>12.4g}{s['p95']:>12.4g}"
+                     f"{s['p99']:>12.4g}{s['max']:>12.4g}")
+    return "\n".join(lines)
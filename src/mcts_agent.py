@@ -3,12 +3,17 @@ import time
 import random
 import numpy as np
 from .base_agent import BaseAgent
+from .bitboard import HEIGHT, WIDTH
+from .endgame import EndgameSolver, EndgameTimeout
+from .mcts_parallel import RootParallelPool, merge_visits
+from .mcts_tree import DAG_NODE_BYTES, MAX_TREE_BYTES, NODE_BYTES, ArrayTree, PositionGraph
+from .rollout import batch_rollouts
 
 
 class MCTSNode:
     """Node in the MCTS tree."""
 
-    def __init__(self, parent=None, action=None, player=1, valid_actions=None):
+    def __init__(self, parent=None, action=None, player=0, valid_actions=None):
         self.parent = parent
         self.action = action
         self.children = {}
@@ -36,16 +41,70 @@ class MCTSNode:
 
 
 class MCTSAgent(BaseAgent):
-    """Agent using Monte Carlo Tree Search."""
+    """Agent using Monte Carlo Tree Search.
 
-    def __init__(self, name="MCTSAgent", player_id=None, time_limit=2.5, max_iter=100000):
+    With `rollout_batch` > 1, each iteration plays that many vectorized
+    playouts from the new leaf and backs up their average result.
+
+    With `reuse_tree`, the tree is kept between calls and the next search
+    starts from the node of the new position when it is found in it.
+
+    `tree` selects the tree storage: "object" (one MCTSNode per node) or
+    "array" (an ArrayTree of at most `max_nodes` nodes).
+
+    With `transpositions`, nodes are instead keyed by position in a
+    PositionGraph of at most `max_graph_nodes` entries, so every move order
+    reaching a position shares its statistics.
+
+    With `workers` > 1, the root is searched in that many processes at
+    once (this one included), each with its own seed, and the move with
+    the most root visits summed over all searches is played. The worker
+    processes are started on the first search and kept until `close()`.
+
+    Once at most `endgame_cells` cells are empty, the exact EndgameSolver
+    chooses the move instead, within half the time limit.
+    """
+
+    def __init__(self, name="MCTSAgent", player_id=None, time_limit=2.5, max_iter=100000,
+                 rollout_batch=1, seed=None, reuse_tree=True, tree="object",
+                 max_nodes=MAX_TREE_BYTES // NODE_BYTES, transpositions=False,
+                 max_graph_nodes=MAX_TREE_BYTES // DAG_NODE_BYTES, workers=1,
+                 endgame_cells=18):
+        if tree not in ("object", "array"):
+            raise ValueError(f"Unknown tree storage: {tree}")
         super().__init__(name=name, player_id=player_id)
         self.time_limit = time_limit
         self.max_iter = max_iter
+        self.rollout_batch = rollout_batch
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed)
+        self.reuse_tree = reuse_tree
+        self.tree = tree
+        self.max_nodes = max_nodes
+        self.transpositions = transpositions
+        self.max_graph_nodes = max_graph_nodes
+        self._graph = None
+        self.workers = workers
+        self._pool = None
+        self.endgame_cells = endgame_cells
+        self.solver = EndgameSolver()
+        self.last_proved = 0
+        self.last_iterations = 0
+        self.last_simulations = 0
+        self.last_reused_visits = 0
+        self.last_nodes = 0
+        self.last_tree_bytes = 0
+        self.last_root_visits = {}
+        self._root = None
+        self._root_position = None
 
     def select_action(self, observation, action_mask):
         """Select an action using MCTS."""
         valid = self._get_valid_actions(action_mask)
+        self.last_iterations = 0
+        self.last_simulations = 0
+        self.last_proved = 0
 
         if not valid:
             raise ValueError("No valid action available")
@@ -53,188 +112,450 @@ class MCTSAgent(BaseAgent):
         if len(valid) == 1:
             return valid[0]
 
-        board = self._observation_to_board(observation)
+        position = self._observation_to_position(observation)
 
         # immediate win?
-        win = self._find_winning_move(board, action_mask, player=1)
+        win = self._find_winning_move(position, action_mask, player=1)
         if win != -1:
             return win
 
         # block opponent?
-        block = self._find_winning_move(board, action_mask, player=2)
+        block = self._find_winning_move(position, action_mask, player=2)
         if block != -1:
             return block
 
-        return self._mcts(board, valid)
+        # exact solve near the end of the game
+        if WIDTH * HEIGHT - position.moves <= self.endgame_cells:
+            deadline = time.time() + self.time_limit / 2
+            try:
+                move, _ = self.solver.best_move(position, valid, deadline)
+                return move
+            except EndgameTimeout:
+                # search with the half of the time left
+                return self._mcts(position, valid, self.time_limit / 2)
+            finally:
+                self.last_proved = self.solver.positions
+
+        return self._mcts(position, valid)
+
+    def _mcts(self, position, valid, time_limit=None):
+        """Execute MCTS search for time_limit seconds (self.time_limit by default)."""
+        if time_limit is None:
+            time_limit = self.time_limit
+        if self.workers > 1:
+            return self._mcts_parallel(position, valid, time_limit)
+        if self.transpositions:
+            return self._mcts_dag(position, valid, time_limit)
+        if self.tree == "array":
+            return self._mcts_array(position, valid, time_limit)
+        return self._mcts_object(position, valid, time_limit)
+
+    def _mcts_parallel(self, position, valid, time_limit):
+        """Search the root in every worker and here, then merge the root visits."""
+        if self._pool is None:
+            self._pool = RootParallelPool(self._worker_options(), self._worker_seeds())
+        self._pool.start_search(position, valid, time_limit)
+
+        if self.transpositions:
+            self._mcts_dag(position, valid, time_limit)
+        elif self.tree == "array":
+            self._mcts_array(position, valid, time_limit)
+        else:
+            self._mcts_object(position, valid, time_limit)
+
+        results = [(self.last_root_visits, self.last_iterations, self.last_simulations)]
+        results += self._pool.results()
+        self.last_iterations = sum(r[1] for r in results)
+        self.last_simulations = sum(r[2] for r in results)
+        merged = merge_visits(r[0] for r in results)
+        self.last_root_visits = merged
+
+        if merged:
+            return max(merged, key=merged.__getitem__)
+        return valid[len(valid) // 2]
 
-    def _mcts(self, board, valid):
-        """Execute MCTS search."""
-        root = MCTSNode(player=1, valid_actions=valid)
+    def _worker_options(self):
+        """MCTSAgent arguments of the worker processes.
+
+        The search time is not among them: it is sent with each search.
+        """
+        return {
+            "max_iter": self.max_iter,
+            "rollout_batch": self.rollout_batch,
+            "reuse_tree": self.reuse_tree,
+            "tree": self.tree,
+            "max_nodes": self.max_nodes,
+            "transpositions": self.transpositions,
+            "max_graph_nodes": self.max_graph_nodes,
+        }
+
+    def _worker_seeds(self):
+        """One seed per worker, derived from this agent's seed."""
+        if self.seed is None:
+            return [None] * (self.workers - 1)
+        return [self.seed + i for i in range(1, self.workers)]
+
+    def _mcts_object(self, position, valid, time_limit):
+        """Execute MCTS search on a tree of MCTSNode."""
+        root = self._reuse_root(position)
+        if root is None:
+            root = MCTSNode(player=position.player, valid_actions=valid)
+        self.last_reused_visits = root.visits
         start = time.time()
         iterations = 0
+        simulations = 0
 
-        while time.time() - start < self.time_limit and iterations < self.max_iter:
-            sim_board = board.copy()
+        while time.time() - start < time_limit and iterations < self.max_iter:
+            sim = position.copy()
 
             # selection
-            node = self._select(root, sim_board)
+            node = self._select(root, sim)
 
             # expansion
-            if not self._is_terminal(sim_board) and not node.is_fully_expanded():
-                node = self._expand(node, sim_board)
+            if not self._is_terminal(sim) and not node.is_fully_expanded():
+                node = self._expand(node, sim)
 
             # simulation
-            result = self._simulate(sim_board, node.player)
+            reward, playouts = self._rollout(sim)
 
             # backpropagation
-            self._backprop(node, result)
+            self._backprop(node, reward)
 
             iterations += 1
+            simulations += playouts
+
+        self.last_iterations = iterations
+        self.last_simulations = simulations
+
+        self.last_root_visits = {a: child.visits for a, child in root.children.items()}
+
+        if self.reuse_tree:
+            self._root = root
+            self._root_position = position.copy()
 
         if root.children:
             return root.best_action()
         return valid[len(valid) // 2]
 
-    def _select(self, node, board):
+    def _mcts_array(self, position, valid, time_limit):
+        """Execute MCTS search on an ArrayTree (the root is node 0)."""
+        start = time.time()
+        tree = self._reuse_array_tree(position)
+        if tree is None:
+            tree = ArrayTree(self.max_nodes)
+            tree.add_root(position.player)
+        self.last_reused_visits = tree.visits[0]
+        iterations = 0
+        simulations = 0
+
+        while time.time() - start < time_limit and iterations < self.max_iter:
+            sim = position.copy()
+
+            # selection
+            node = self._select_array(tree, sim)
+
+            # expansion: a leaf is expanded once it has been sampled
+            if (tree.num_children[node] == 0 and (tree.visits[node] > 0 or node == 0)
+                    and not self._is_terminal(sim)):
+                node = self._expand_array(tree, node, sim)
+
+            # simulation
+            reward, playouts = self._rollout(sim)
+
+            # backpropagation
+            tree.backprop(node, reward)
+
+            iterations += 1
+            simulations += playouts
+
+        self.last_iterations = iterations
+        self.last_simulations = simulations
+        self.last_nodes = tree.size
+        self.last_tree_bytes = tree.nbytes()
+        self.last_root_visits = {a: tree.visits[c] for a, c in tree.children(0)}
+
+        if self.reuse_tree:
+            self._root = tree
+            self._root_position = position.copy()
+
+        if tree.num_children[0]:
+            return tree.best_action(0)
+        return valid[len(valid) // 2]
+
+    def _mcts_dag(self, position, valid, time_limit):
+        """Execute MCTS search on a PositionGraph."""
+        start = time.time()
+        graph = self._graph
+        if not self.reuse_tree or graph is None or len(graph) >= graph.max_nodes:
+            graph = PositionGraph(self.max_graph_nodes)
+        root = graph.get(position)
+        self.last_reused_visits = root.visits
+        iterations = 0
+        simulations = 0
+
+        while time.time() - start < time_limit and iterations < self.max_iter:
+            sim = position.copy()
+
+            # selection
+            path = self._select_dag(root, sim)
+
+            # expansion, unless the graph is full: then roll out from the leaf
+            node = path[-1][0]
+            if not self._is_terminal(sim) and node.untried:
+                action = node.untried[-1]
+                sim.play(action)
+                child = graph.get(sim)
+                if child is None:
+                    sim.undo()
+                else:
+                    node.untried.pop()
+                    node.children[action] = child
+                    node.edge_visits[action] = 0
+                    path[-1] = (node, action)
+                    path.append((child, None))
+
+            # simulation
+            reward, playouts = self._rollout(sim)
+
+            # backpropagation
+            self._backprop_dag(path, reward)
+
+            iterations += 1
+            simulations += playouts
+
+        self.last_iterations = iterations
+        self.last_simulations = simulations
+        self.last_nodes = len(graph)
+        self.last_root_visits = dict(root.edge_visits)
+        self._graph = graph if self.reuse_tree else None
+
+        if root.edge_visits:
+            return root.best_action()
+        return valid[len(valid) // 2]
+
+    def _select_dag(self, node, position):
+        """Selection on a PositionGraph. Returns the path as (node, action) pairs."""
+        path = []
+        while not node.untried and node.children:
+            action, child = node.best_child()
+            path.append((node, action))
+            position.play(action)
+            node = child
+            if self._is_terminal(position):
+                break
+        path.append((node, None))
+        return path
+
+    def _backprop_dag(self, path, reward):
+        """Update the nodes and edges of the path actually followed."""
+        for node, action in path:
+            node.visits += 1
+            if node.player == 1:
+                node.wins += reward
+            else:
+                node.wins += 1.0 - reward
+            if action is not None:
+                node.edge_visits[action] += 1
+
+    def _select_array(self, tree, position):
+        """Selection on an ArrayTree: descend from the root by UCB1."""
+        node = 0
+        while tree.num_children[node]:
+            node = tree.best_child(node)
+            position.play(tree.action[node])
+            if tree.visits[node] == 0 or self._is_terminal(position):
+                break
+        return node
+
+    def _expand_array(self, tree, node, position):
+        """Expansion on an ArrayTree: create all children, step into the first."""
+        first = tree.expand(node, position.legal_moves(), 1 - position.player)
+        if first == -1:
+            # tree is full, sample the leaf itself
+            return node
+        position.play(tree.action[first])
+        return first
+
+    def _reuse_root(self, position):
+        """Find position in the tree of the previous search and make it the root.
+
+        Returns None when there is no previous tree or the position cannot
+        be reached from its root.
+        """
+        old_root = self._root
+        old = self._root_position
+        self._root = None
+        self._root_position = None
+        if not self.reuse_tree or old_root is None:
+            return None
+
+        plies = position.moves - old.moves
+        if plies <= 0:
+            return None
+        for p in (0, 1):
+            if old.bits[p] & ~position.bits[p]:
+                return None
+
+        node = self._descend(old_root, old, position, plies, lambda n: n.children.items())
+        if node is not None:
+            # drop the link so the rest of the old tree can be freed
+            node.parent = None
+            node.action = None
+        return node
+
+    def _reuse_array_tree(self, position):
+        """ArrayTree version of _reuse_root. Returns the re-rooted tree or None."""
+        tree = self._root
+        old = self._root_position
+        self._root = None
+        self._root_position = None
+        if not self.reuse_tree or not isinstance(tree, ArrayTree):
+            return None
+
+        plies = position.moves - old.moves
+        if plies <= 0:
+            return None
+        for p in (0, 1):
+            if old.bits[p] & ~position.bits[p]:
+                return None
+
+        node = self._descend(0, old, position, plies, tree.children)
+        if node is None:
+            return None
+        # compact in place so the old tree is never held twice
+        return tree.reroot(node)
+
+    def _descend(self, node, current, target, plies, children):
+        """Follow the tree moves that lead from current to target.
+
+        `children(node)` lists the (action, child) pairs of a node.
+        """
+        if plies == 0:
+            return node if current.key() == target.key() else None
+        for action, child in children(node):
+            # only moves whose stone is in the target position
+            if target.bits[current.player] & current.move_bit(action):
+                current.play(action)
+                found = self._descend(child, current, target, plies - 1, children)
+                current.undo()
+                if found is not None:
+                    return found
+        return None
+
+    def _select(self, node, position):
         """Selection: descend through the tree."""
         while node.is_fully_expanded() and node.children:
             node = node.best_child()
-            row = self._get_next_row(board, node.action)
-            if row != -1:
-                board[row, node.action] = 3 - node.player
-            if self._is_terminal(board):
+            position.play(node.action)
+            if self._is_terminal(position):
                 break
         return node
 
-    def _expand(self, node, board):
+    def _expand(self, node, position):
         """Expansion: add a child node."""
         action = node.untried.pop()
-        row = self._get_next_row(board, action)
-        if row != -1:
-            board[row, action] = node.player
+        position.play(action)
 
-        valid = [c for c in range(7) if board[0, c] == 0]
-        child = MCTSNode(parent=node, action=action, player=3 - node.player, valid_actions=valid)
+        valid = position.legal_moves()
+        child = MCTSNode(parent=node, action=action, player=position.player, valid_actions=valid)
         node.children[action] = child
         return child
 
-    def _simulate(self, board, player):
-        """Simulation: random playout."""
-        while True:
-            winner = self._check_winner(board)
-            if winner == 1:
-                return 1
-            if winner == 2:
-                return -1
+    def _rollout(self, position):
+        """Play out position. Returns (result for player 0, number of playouts).
+
+        The result is 1 for a win of player 0, 0 for a loss and 0.5 for a
+        draw, averaged over the playouts.
+        """
+        if self.rollout_batch > 1 and not self._is_terminal(position):
+            winners = batch_rollouts(position, self.rollout_batch, self._np_rng)
+            reward = np.count_nonzero(winners == 0) + 0.5 * np.count_nonzero(winners == -1)
+            return float(reward) / self.rollout_batch, self.rollout_batch
+
+        winner = self._simulate(position)
+        if winner == -1:
+            return 0.5, 1
+        return (1.0 if winner == 0 else 0.0), 1
+
+    def _simulate(self, position):
+        """Simulation: random playout. Returns the winner index or -1 for a draw."""
+        winner = position.winner()
+        if winner != -1:
+            return winner
 
-            valid = [c for c in range(7) if board[0, c] == 0]
+        while True:
+            valid = position.legal_moves()
             if not valid:
-                return 0
+                return -1
 
             # play smart move
-            action = self._smart_action(board, valid, player)
-            row = self._get_next_row(board, action)
-            if row == -1:
-                break
-            board[row, action] = player
-            player = 3 - player
-
-        return 0
+            action = self._smart_action(position, valid)
+            if position.is_winning_move(action):
+                return position.player
+            position.play(action)
 
-    def _smart_action(self, board, valid, player):
+    def _smart_action(self, position, valid):
         """Choose a smart action."""
         # can we win?
         for col in valid:
-            row = self._get_next_row(board, col)
-            if row != -1:
-                board[row, col] = player
-                if self._check_win_pos(board, row, col, player):
-                    board[row, col] = 0
-                    return col
-                board[row, col] = 0
+            if position.is_winning_move(col):
+                return col
 
         # block opponent?
-        opp = 3 - player
+        opp = 1 - position.player
         for col in valid:
-            row = self._get_next_row(board, col)
-            if row != -1:
-                board[row, col] = opp
-                if self._check_win_pos(board, row, col, opp):
-                    board[row, col] = 0
-                    return col
-                board[row, col] = 0
-
-        return random.choice(valid)
-
-    def _backprop(self, node, result):
-        """Backpropagation: update node statistics."""
+            if position.is_winning_move(col, opp):
+                return col
+
+        return self._rng.choice(valid)
+
+    def _backprop(self, node, reward):
+        """Backpropagation: update node statistics.
+
+        `reward` is the playout result for player 0. A node's wins are
+        counted for the player who moved into it, since its parent picks
+        among children by that player's win rate.
+        """
         while node is not None:
             node.visits += 1
             if node.player == 1:
-                if result == 1:
-                    node.wins += 1.0
-                elif result == 0:
-                    node.wins += 0.5
+                node.wins += reward
             else:
-                if result == -1:
-                    node.wins += 1.0
-                elif result == 0:
-                    node.wins += 0.5
+                node.wins += 1.0 - reward
             node = node.parent
 
-    def _check_winner(self, board):
-        """Check for a winner."""
-        for row in range(6):
-            for col in range(4):
-                p = board[row, col]
-                if p != 0 and all(board[row, col + i] == p for i in range(4)):
-                    return p
-
-        for row in range(3):
-            for col in range(7):
-                p = board[row, col]
-                if p != 0 and all(board[row + i, col] == p for i in range(4)):
-                    return p
-
-        for row in range(3):
-            for col in range(4):
-                p = board[row, col]
-                if p != 0 and all(board[row + i, col + i] == p for i in range(4)):
-                    return p
-
-        for row in range(3):
-            for col in range(3, 7):
-                p = board[row, col]
-                if p != 0 and all(board[row + i, col - i] == p for i in range(4)):
-                    return p
-
-        return 0
-
-    def _check_win_pos(self, board, row, col, player):
-        """Check for win from a position."""
-        dirs = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for dr, dc in dirs:
-            count = 1
-            r, c = row + dr, col + dc
-            while 0 <= r < 6 and 0 <= c < 7 and board[r, c] == player:
-                count += 1
-                r += dr
-                c += dc
-            r, c = row - dr, col - dc
-            while 0 <= r < 6 and 0 <= c < 7 and board[r, c] == player:
-                count += 1
-                r -= dr
-                c -= dc
-            if count >= 4:
-                return True
-        return False
-
-    def _is_terminal(self, board):
+    def _is_terminal(self, position):
         """Check if terminal state."""
-        if self._check_winner(board) != 0:
-            return True
-        return np.all(board[0, :] != 0)
+        return position.winner() != -1 or position.is_full()
+
+    def search_metrics(self):
+        """Iterations, playouts and positions proved by the last move."""
+        return {
+            "iterations": self.last_iterations,
+            "simulations": self.last_simulations,
+            "proved": self.last_proved,
+        }
 
     def reset(self):
         """Reset the agent."""
-        pass
+        self._graph = None
+        self.solver.tt.clear()
+        self._root = None
+        self._root_position = None
+        if self.seed is not None:
+            self._rng = random.Random(self.seed)
+            self._np_rng = np.random.default_rng(self.seed)
+        if self._pool is not None:
+            self._pool.reset()
+
+    def set_seed(self, seed):
+        """Change the random seed and restart from it."""
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._np_rng = np.random.default_rng(seed)
+
+    def close(self):
+        """Stop the worker processes, if any."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
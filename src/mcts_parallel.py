@@ -0,0 +1,86 @@
+import multiprocessing as mp
+
+
+def _worker(conn, options):
+    """Search loop of a worker process: one MCTSAgent for the whole game.
+
+    Commands are ("search", position, valid, time_limit), answered with the
+    root child visits and the iteration counts, ("reset",) and ("close",).
+    """
+    from .mcts_agent import MCTSAgent
+
+    agent = MCTSAgent(**options)
+    while True:
+        command = conn.recv()
+        if command[0] == "search":
+            _, position, valid, time_limit = command
+            agent._mcts(position, valid, time_limit)
+            conn.send((agent.last_root_visits, agent.last_iterations, agent.last_simulations))
+        elif command[0] == "reset":
+            agent.reset()
+        else:
+            break
+    conn.close()
+
+
+class RootParallelPool:
+    """Worker processes searching the same root with their own seeds.
+
+    Each worker keeps its MCTSAgent (and its tree, when reused) from one
+    move to the next, so the processes are started once per game rather
+    than per move. `options` are the MCTSAgent arguments shared by every
+    worker; `seeds` gives one seed per worker.
+    """
+
+    def __init__(self, options, seeds):
+        self.processes = []
+        self.connections = []
+        for seed in seeds:
+            parent, child = mp.Pipe()
+            process = mp.Process(target=_worker, args=(child, dict(options, seed=seed)),
+                                 daemon=True)
+            process.start()
+            child.close()
+            self.processes.append(process)
+            self.connections.append(parent)
+
+    def __len__(self):
+        return len(self.processes)
+
+    def start_search(self, position, valid, time_limit):
+        """Send the root and the search time to every worker without waiting."""
+        for conn in self.connections:
+            conn.send(("search", position, valid, time_limit))
+
+    def results(self):
+        """Wait for the workers: list of (root visits, iterations, simulations)."""
+        return [conn.recv() for conn in self.connections]
+
+    def reset(self):
+        """Clear the workers' trees."""
+        for conn in self.connections:
+            conn.send(("reset",))
+
+    def close(self):
+        """Stop the workers."""
+        for conn in self.connections:
+            try:
+                conn.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in self.processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+        self.connections = []
+
+
+def merge_visits(root_visits):
+    """Sum the root child visits of several searches by action."""
+    merged = {}
+    for visits in root_visits:
+        for action, n in visits.items():
+            merged[action] = merged.get(action, 0) + n
+    return merged
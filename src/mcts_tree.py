@@ -0,0 +1,260 @@
+import math
+from array import array
+
+# visits (4) + wins (8) + parent (4) + first child (4) + children, action, player (1 each)
+NODE_BYTES = 23
+
+# generous estimate for a DagNode with its dicts and table entry
+DAG_NODE_BYTES = 1024
+
+# tree memory budget, well under the 384 MB arena limit
+MAX_TREE_BYTES = 256 * 1024 * 1024
+
+
+class ArrayTree:
+    """MCTS tree stored as parallel typed arrays.
+
+    Node i is described by visits[i], wins[i], parent[i], action[i] (the
+    move that led to it), player[i] (the player to move in it) and its
+    children, which are allocated together at first_child[i] to
+    first_child[i] + num_children[i] - 1. The arrays grow by `chunk` nodes
+    and never beyond `max_nodes`; once full, nodes are no longer expanded.
+    """
+
+    def __init__(self, max_nodes=MAX_TREE_BYTES // NODE_BYTES, chunk=4096):
+        self.max_nodes = max_nodes
+        self.chunk = chunk
+        self.visits = array("i")
+        self.wins = array("d")
+        self.parent = array("i")
+        self.first_child = array("i")
+        self.num_children = array("b")
+        self.action = array("b")
+        self.player = array("b")
+        self.size = 0
+
+    def capacity(self):
+        """Number of allocated node slots."""
+        return len(self.visits)
+
+    def nbytes(self):
+        """Memory used by the node arrays, in bytes."""
+        return sum(a.buffer_info()[1] * a.itemsize for a in (
+            self.visits, self.wins, self.parent, self.first_child,
+            self.num_children, self.action, self.player))
+
+    def _allocate(self, count):
+        """Reserve count consecutive nodes. Returns the first index or -1 if full."""
+        if self.size + count > self.max_nodes:
+            return -1
+        while self.size + count > len(self.visits):
+            grow = min(self.chunk, self.max_nodes - len(self.visits))
+            self.visits.extend(array("i", bytes(4 * grow)))
+            self.wins.extend(array("d", bytes(8 * grow)))
+            self.parent.extend(array("i", bytes(4 * grow)))
+            self.first_child.extend(array("i", bytes(4 * grow)))
+            self.num_children.extend(array("b", bytes(grow)))
+            self.action.extend(array("b", bytes(grow)))
+            self.player.extend(array("b", bytes(grow)))
+        first = self.size
+        self.size += count
+        return first
+
+    def add_root(self, player):
+        """Add a root node. Returns its index."""
+        node = self._allocate(1)
+        self.visits[node] = 0
+        self.wins[node] = 0.0
+        self.parent[node] = -1
+        self.first_child[node] = -1
+        self.num_children[node] = 0
+        self.action[node] = -1
+        self.player[node] = player
+        return node
+
+    def expand(self, node, actions, player):
+        """Create the children of node, one per action, with player to move.
+
+        Returns the index of the first child, or -1 if the tree is full.
+        """
+        first = self._allocate(len(actions))
+        if first == -1:
+            return -1
+        for i, action in enumerate(actions):
+            child = first + i
+            self.visits[child] = 0
+            self.wins[child] = 0.0
+            self.parent[child] = node
+            self.first_child[child] = -1
+            self.num_children[child] = 0
+            self.action[child] = action
+            self.player[child] = player
+        self.first_child[node] = first
+        self.num_children[node] = len(actions)
+        return first
+
+    def children(self, node):
+        """List of (action, child index) of node."""
+        first = self.first_child[node]
+        return [(self.action[c], c) for c in range(first, first + self.num_children[node])]
+
+    def child(self, node, action):
+        """Index of the child of node reached by action, or -1."""
+        first = self.first_child[node]
+        for child in range(first, first + self.num_children[node]):
+            if self.action[child] == action:
+                return child
+        return -1
+
+    def best_child(self, node, c=1.414):
+        """Child with the best UCB1 value; unvisited children come first."""
+        visits = self.visits
+        wins = self.wins
+        first = self.first_child[node]
+        log_n = math.log(visits[node]) if visits[node] > 0 else 0.0
+        best = first
+        best_value = -1.0
+        for child in range(first, first + self.num_children[node]):
+            v = visits[child]
+            if v == 0:
+                return child
+            value = wins[child] / v + c * math.sqrt(log_n / v)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def best_action(self, node):
+        """Action of the most visited child."""
+        first = self.first_child[node]
+        best = max(range(first, first + self.num_children[node]), key=self.visits.__getitem__)
+        return self.action[best]
+
+    def backprop(self, node, reward):
+        """Add a playout result for player 0 from node up to the root.
+
+        A node's wins are counted for the player who moved into it.
+        """
+        visits = self.visits
+        wins = self.wins
+        parent = self.parent
+        player = self.player
+        while node != -1:
+            visits[node] += 1
+            if player[node] == 1:
+                wins[node] += reward
+            else:
+                wins[node] += 1.0 - reward
+            node = parent[node]
+
+    def reroot(self, root):
+        """Keep only the subtree under root, moved in place to the front (root at 0).
+
+        Works within the existing arrays so reusing a tree never needs a
+        second copy in memory. Children are always allocated after their
+        parent, so kept nodes are moved down in index order: a node's
+        parent has already been moved when it is reached, and its children
+        have not.
+        """
+        visits = self.visits
+        wins = self.wins
+        parent = self.parent
+        first_child = self.first_child
+        num_children = self.num_children
+        action = self.action
+        player = self.player
+
+        kept = bytearray(self.size)
+        kept[root] = 1
+        new = 0
+        for old in range(root, self.size):
+            if not kept[old]:
+                continue
+            count = num_children[old]
+            first = first_child[old]
+            visits[new] = visits[old]
+            wins[new] = wins[old]
+            num_children[new] = count
+            first_child[new] = first
+            action[new] = action[old] if old != root else -1
+            player[new] = player[old]
+            if old == root:
+                parent[new] = -1
+            else:
+                # the parent has moved and rewrote our link to its new index
+                p = parent[old]
+                parent[new] = p
+                if first_child[p] == old:
+                    first_child[p] = new
+            for child in range(first, first + count):
+                kept[child] = 1
+                parent[child] = new
+            new += 1
+        self.size = new
+        return self
+
+class DagNode:
+    """Statistics of one position, shared by every move order reaching it.
+
+    `wins` are counted for the player who moved into the position, which
+    only depends on the position. `edge_visits[action]` counts the
+    iterations that went through each outgoing move and drives the UCB1
+    exploration term, while the value of a move is read from the shared
+    statistics of the position it leads to.
+    """
+
+    __slots__ = ("visits", "wins", "player", "untried", "children", "edge_visits")
+
+    def __init__(self, player, valid_actions):
+        self.visits = 0
+        self.wins = 0.0
+        self.player = player
+        self.untried = list(valid_actions)
+        self.children = {}
+        self.edge_visits = {}
+
+    def best_child(self, c=1.414):
+        """Return (action, child) with the best UCB1 value."""
+        log_n = math.log(self.visits) if self.visits > 0 else 0.0
+        best = None
+        best_value = -1.0
+        for action, child in self.children.items():
+            n = self.edge_visits[action]
+            if n == 0 or child.visits == 0:
+                return action, child
+            value = child.wins / child.visits + c * math.sqrt(log_n / n)
+            if value > best_value:
+                best_value = value
+                best = (action, child)
+        return best
+
+    def best_action(self):
+        """Return the action most often taken from this node."""
+        return max(self.edge_visits, key=self.edge_visits.__getitem__)
+
+
+class PositionGraph:
+    """MCTS nodes keyed by position, bounded to max_nodes entries.
+
+    Every node of the search lives in the table, so once it is full the
+    search stops growing: `get` returns None for new positions.
+    """
+
+    def __init__(self, max_nodes=MAX_TREE_BYTES // DAG_NODE_BYTES):
+        self.max_nodes = max_nodes
+        self.nodes = {}
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def get(self, position):
+        """Return the node of position, creating it if there is room.
+
+        Returns None when position is new and the table is full.
+        """
+        key = position.key()
+        node = self.nodes.get(key)
+        if node is None and len(self.nodes) < self.max_nodes:
+            node = DagNode(position.player, position.legal_moves())
+            self.nodes[key] = node
+        return node
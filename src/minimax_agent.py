@@ -1,20 +1,97 @@
 import time
+from operator import itemgetter
 import numpy as np
 from .base_agent import BaseAgent
+from .bitboard import CENTER_ORDER, H1, HEIGHT, WIDTH, winning_cells
+from .endgame import EndgameSolver, EndgameTimeout
+from .evaluation import MINIMAX_COLUMN_WEIGHTS, MINIMAX_WINDOW_WEIGHTS, Evaluator
+from .opening_book import OpeningBook
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable
 
 
-class MinimaxAgent(BaseAgent):
-    """Agent using Minimax algorithm with alpha-beta pruning."""
+# search modes
+ALPHABETA = "alphabeta"
+PVS = "pvs"
+MTDF = "mtdf"
+SEARCH_MODES = (ALPHABETA, PVS, MTDF)
+
+# half width of the first aspiration window, in evaluation points
+ASPIRATION = 10
+
+# move ordering priorities, above any history score
+KILLER_PRIORITY = 1 << 40
+BLOCK_PRIORITY = 1 << 41
+WIN_PRIORITY = 1 << 42
+TT_PRIORITY = 1 << 43
+PV_PRIORITY = 1 << 44
+
 
-    def __init__(self, name="MinimaxAgent", player_id=None, max_depth=4, time_limit=2.5):
+class SearchTimeout(Exception):
+    """Raised inside the search when the time limit is reached."""
+
+
+class MinimaxAgent(BaseAgent):
+    """Agent using Minimax algorithm with alpha-beta pruning.
+
+    The search deepens one ply at a time until `time_limit` or `max_depth`
+    is reached and plays the best move of the last completed depth.
+
+    With `batch_depth` > 0, nodes that many plies above the horizon collect
+    all their leaves and score them in one vectorized evaluation instead of
+    searching them one by one.
+
+    `book` is an OpeningBook or the path of one; positions found in it are
+    played from the book without searching.
+
+    Once at most `endgame_cells` cells are empty, the move is chosen by the
+    exact EndgameSolver instead, within half the time limit; if it runs
+    out of time the heuristic search takes over.
+
+    With `dynamic_ordering`, moves inside the tree are tried in the order:
+    table and principal variation move, immediate wins, blocks, the two
+    killer moves of the ply, then by history score. Otherwise they follow
+    the center columns after the table move.
+
+    `search_mode` picks how each depth is searched: "alphabeta" with a
+    full window, "pvs" with null windows after the first move of each node
+    and an aspiration window of +/- `aspiration_window` at the root, or
+    "mtdf" with null-window root searches converging on the score. Both
+    start from the score found two plies shallower.
+    """
+
+    def __init__(self, name="MinimaxAgent", player_id=None, max_depth=42, time_limit=2.5,
+                 tt_size=1 << 20, window_weights=MINIMAX_WINDOW_WEIGHTS,
+                 column_weights=MINIMAX_COLUMN_WEIGHTS, batch_depth=0, book=None,
+                 endgame_cells=18, dynamic_ordering=True, search_mode=PVS,
+                 aspiration_window=ASPIRATION):
         super().__init__(name=name, player_id=player_id)
+        if search_mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode {search_mode!r}, expected one of {SEARCH_MODES}")
         self.max_depth = max_depth
         self.time_limit = time_limit
+        self.tt = TranspositionTable(tt_size)
+        self.evaluator = Evaluator(window_weights, column_weights)
+        self.batch_depth = batch_depth
+        self.book = OpeningBook(book) if isinstance(book, str) else book
+        self.endgame_cells = endgame_cells
+        self.dynamic_ordering = dynamic_ordering
+        self.search_mode = search_mode
+        self.aspiration_window = aspiration_window
+        self.solver = EndgameSolver()
+        # two killer moves per ply, history score per player and cell
+        self.killers = [[-1, -1] for _ in range(WIDTH * HEIGHT + 1)]
+        self.history = [[0] * (WIDTH * H1) for _ in range(2)]
+        self.last_proved = 0
+        self.last_depth = 0
+        self.last_score = 0
+        self.nodes = 0
         self._start_time = 0
+        self._pv = {}
 
     def select_action(self, observation, action_mask):
         """Select the best action using minimax."""
         valid = self._get_valid_actions(action_mask)
+        self.reset_metrics()
 
         if not valid:
             raise ValueError("No valid action available")
@@ -22,174 +99,396 @@ class MinimaxAgent(BaseAgent):
         if len(valid) == 1:
             return valid[0]
 
-        board = self._observation_to_board(observation)
+        position = self._observation_to_position(observation)
 
         # check for immediate win
-        win = self._find_winning_move(board, action_mask, player=1)
+        win = self._find_winning_move(position, action_mask, player=1)
         if win != -1:
             return win
 
         # block opponent
-        block = self._find_winning_move(board, action_mask, player=2)
+        block = self._find_winning_move(position, action_mask, player=2)
         if block != -1:
             return block
 
+        # opening book
+        if self.book is not None:
+            move = self.book.lookup(position)
+            if move in valid:
+                return move
+
         # minimax search
-        self._start_time = time.time()
-        return self._search(board, valid)
+        return self.search(position, valid)
+
+    def search(self, position, valid, start_time=None):
+        """Best of the valid moves of a Position, by iterative deepening.
+
+        The time limit counts from `start_time` (a time.time() value, now
+        by default). The position is left as it was found.
+        """
+        self._start_time = time.time() if start_time is None else start_time
+        self.tt.new_search()
+        return self._search(position, valid)
+
+    def reset_metrics(self):
+        """Zero the counters reported by search_metrics before a move."""
+        self.nodes = 0
+        self.last_depth = 0
+        self.last_proved = 0
+        self.tt.reset_stats()
+
+    def _search(self, position, valid):
+        """Iterative deepening search for the best move."""
+        # order: prefer center columns
+        moves = [c for c in CENTER_ORDER if c in valid]
+
+        best = moves[0]
+        self.last_depth = 0
+        self.last_score = 0
+        self.last_proved = 0
+        self._pv = {}
+        self._age_ordering()
+
+        # exact solve near the end of the game
+        empty = WIDTH * HEIGHT - position.moves
+        if empty <= self.endgame_cells:
+            deadline = self._start_time + self.time_limit / 2
+            try:
+                move, value = self.solver.best_move(position, moves, deadline)
+            except EndgameTimeout:
+                pass
+            else:
+                self.last_depth = empty
+                self.last_score = 10000 * value
+                self.last_proved = self.solver.positions
+                return move
+            self.last_proved = self.solver.positions
+
+        self.evaluator.reset(position)
+        root_moves = position.moves
+        max_depth = min(self.max_depth, 42 - position.moves)
+        scores = []
+
+        for depth in range(1, max_depth + 1):
+            try:
+                # scores alternate with the parity of the depth, so the
+                # guess comes from two plies shallower when there is one
+                guess = scores[-2] if len(scores) > 1 else self.last_score
+                if self.search_mode == MTDF:
+                    score, move = self._mtdf(position, moves, depth, guess)
+                elif self.search_mode == PVS and scores:
+                    score, move = self._aspiration(position, moves, depth, guess)
+                else:
+                    score, move = self._search_root(position, moves, depth)
+            except SearchTimeout:
+                # discard the unfinished iteration
+                while position.moves > root_moves:
+                    self.evaluator.undo(position)
+                break
 
-    def _search(self, board, valid):
-        """Search for the best move."""
-        best = valid[0]
-        best_score = -99999
+            best = move
+            self.last_depth = depth
+            self.last_score = score
+            scores.append(score)
 
-        # order: prefer center columns
-        order = [3, 2, 4, 1, 5, 0, 6]
-        sorted_valid = sorted(valid, key=lambda x: order.index(x) if x in order else 7)
+            # search the previous best line first in the next iteration;
+            # the root is not stored by _minimax, so the line starts here
+            moves.remove(move)
+            moves.insert(0, move)
+            self.tt.store(position.key(), depth, score, EXACT, move)
+            self._pv = self._principal_variation(position, depth)
 
-        for col in sorted_valid:
-            if time.time() - self._start_time > self.time_limit:
+            # forced win or loss found, deeper search cannot change it
+            if abs(score) >= 10000:
                 break
 
-            row = self._get_next_row(board, col)
-            if row == -1:
-                continue
+        return best
+
+    def _search_root(self, position, moves, depth, alpha=-99999, beta=99999):
+        """Search all root moves to a fixed depth.
 
-            board[row, col] = 1
-            score = -self._minimax(board, self.max_depth - 1, -99999, 99999, 2)
-            board[row, col] = 0
+        Returns the best score and move; a score at most alpha is an upper
+        bound and one at least beta a lower bound.
+        """
+        best = moves[0]
+        best_score = -99999
+        pvs = self.search_mode != ALPHABETA
+
+        for i, col in enumerate(moves):
+            self.evaluator.play(position, col)
+            if i == 0 or not pvs:
+                score = -self._minimax(position, depth - 1, -beta, -alpha)
+            else:
+                score = -self._minimax(position, depth - 1, -alpha - 1, -alpha)
+                if alpha < score < beta:
+                    score = -self._minimax(position, depth - 1, -beta, -alpha)
+            self.evaluator.undo(position)
 
             if score > best_score:
                 best_score = score
                 best = col
+            alpha = max(alpha, score)
 
-        return best
+            if alpha >= beta:
+                break
 
-    def _minimax(self, board, depth, alpha, beta, player):
-        """Minimax with alpha-beta pruning."""
+        return best_score, best
+
+    def _aspiration(self, position, moves, depth, guess):
+        """Root search in a window around guess, widened on failure."""
+        delta = self.aspiration_window
+        alpha = guess - delta
+        beta = guess + delta
+        while True:
+            score, move = self._search_root(position, moves, depth, alpha, beta)
+            if alpha < score < beta:
+                return score, move
+            delta *= 4
+            if score <= alpha:
+                alpha = max(score - delta, -99999)
+            else:
+                beta = min(score + delta, 99999)
+
+    def _mtdf(self, position, moves, depth, guess):
+        """MTD(f): null-window root searches from guess until the score bounds meet."""
+        lower = -99999
+        upper = 99999
+        best = moves[0]
+        while lower < upper:
+            beta = guess + 1 if guess == lower else guess
+            guess, move = self._search_root(position, moves, depth, beta - 1, beta)
+            if guess < beta:
+                upper = guess
+            else:
+                lower = guess
+                # only a search failing high proves its move reaches the score
+                best = move
+        return guess, best
+
+    def _principal_variation(self, position, depth):
+        """Follow the table moves from the root. Returns {key: move}."""
+        pv = {}
+        played = 0
+        for _ in range(depth):
+            move = self.tt.best_move(position.key())
+            if move < 0 or not position.can_play(move):
+                break
+            pv[position.key()] = move
+            if position.is_winning_move(move):
+                break
+            position.play(move)
+            played += 1
+        for _ in range(played):
+            position.undo()
+        return pv
+
+    def _minimax(self, position, depth, alpha, beta):
+        """Minimax with alpha-beta pruning, scored for the player to move."""
+        self.nodes += 1
         if time.time() - self._start_time > self.time_limit:
-            return 0
+            raise SearchTimeout()
 
-        # check for winner
-        if self._has_won(board, 1):
-            return 10000 + depth
-        if self._has_won(board, 2):
+        # only the player who just moved can have won
+        if position.has_won(1 - position.player):
             return -10000 - depth
 
-        valid = [c for c in range(7) if board[0, c] == 0]
+        valid = position.legal_moves()
 
         if not valid or depth <= 0:
-            return self._evaluate(board)
+            return self._evaluate(position)
+
+        # transposition table
+        key = position.key()
+        alpha_orig = alpha
+        tt_move = -1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            value, tt_depth, flag, tt_move = entry
+            if tt_depth >= depth:
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                elif flag == UPPER:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        # score the whole frontier below this node at once
+        if depth <= self.batch_depth:
+            best, best_move = self._minimax_batch(position, depth)
+            self.tt.store(key, depth, best, EXACT, best_move)
+            return best
+
+        if self.dynamic_ordering:
+            ordered = self._order_moves(position, tt_move, self._pv.get(key, -1))
+        else:
+            # previous principal variation, table move, then center columns
+            ordered = [c for c in CENTER_ORDER if c in valid]
+            for first in (tt_move, self._pv.get(key, -1)):
+                if first in valid:
+                    ordered.remove(first)
+                    ordered.insert(0, first)
 
         best = -99999
-        for col in valid:
-            row = self._get_next_row(board, col)
-            if row == -1:
-                continue
-
-            board[row, col] = player
-            score = -self._minimax(board, depth - 1, -beta, -alpha, 3 - player)
-            board[row, col] = 0
-
-            best = max(best, score)
+        best_move = ordered[0]
+        pvs = self.search_mode != ALPHABETA
+        for i, col in enumerate(ordered):
+            self.evaluator.play(position, col)
+            if i == 0 or not pvs:
+                score = -self._minimax(position, depth - 1, -beta, -alpha)
+            else:
+                # prove the move is no better than the first with a null window
+                score = -self._minimax(position, depth - 1, -alpha - 1, -alpha)
+                if alpha < score < beta:
+                    score = -self._minimax(position, depth - 1, -beta, -alpha)
+            self.evaluator.undo(position)
+
+            if score > best:
+                best = score
+                best_move = col
             alpha = max(alpha, score)
 
             if alpha >= beta:
+                if self.dynamic_ordering and not position.is_winning_move(col):
+                    self._record_cutoff(position, col, depth)
                 break
 
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, best, flag, best_move)
+
         return best
 
-    def _evaluate(self, board):
-        """Evaluate the board position."""
-        score = 0
-
-        # center bonus
-        for row in range(6):
-            if board[row, 3] == 1:
-                score += 3
-            elif board[row, 3] == 2:
-                score -= 3
-
-        # count alignments
-        score += self._count_score(board, 1)
-        score -= self._count_score(board, 2)
-
-        return score
-
-    def _count_score(self, board, player):
-        """Count alignment scores."""
-        score = 0
-        opp = 3 - player
-
-        # horizontal
-        for row in range(6):
-            for col in range(4):
-                mine = sum(board[row, col + i] == player for i in range(4))
-                theirs = sum(board[row, col + i] == opp for i in range(4))
-                if theirs == 0:
-                    if mine == 3:
-                        score += 5
-                    elif mine == 2:
-                        score += 2
-
-        # vertical
-        for row in range(3):
-            for col in range(7):
-                mine = sum(board[row + i, col] == player for i in range(4))
-                theirs = sum(board[row + i, col] == opp for i in range(4))
-                if theirs == 0:
-                    if mine == 3:
-                        score += 5
-                    elif mine == 2:
-                        score += 2
-
-        # diagonal
-        for row in range(3):
-            for col in range(4):
-                mine = sum(board[row + i, col + i] == player for i in range(4))
-                theirs = sum(board[row + i, col + i] == opp for i in range(4))
-                if theirs == 0:
-                    if mine == 3:
-                        score += 5
-                    elif mine == 2:
-                        score += 2
-
-        # anti-diagonal
-        for row in range(3):
-            for col in range(3, 7):
-                mine = sum(board[row + i, col - i] == player for i in range(4))
-                theirs = sum(board[row + i, col - i] == opp for i in range(4))
-                if theirs == 0:
-                    if mine == 3:
-                        score += 5
-                    elif mine == 2:
-                        score += 2
-
-        return score
-
-    def _has_won(self, board, player):
-        """Check if player has won."""
-        # horizontal
-        for row in range(6):
-            for col in range(4):
-                if all(board[row, col + i] == player for i in range(4)):
-                    return True
-        # vertical
-        for row in range(3):
-            for col in range(7):
-                if all(board[row + i, col] == player for i in range(4)):
-                    return True
-        # diagonals
-        for row in range(3):
-            for col in range(4):
-                if all(board[row + i, col + i] == player for i in range(4)):
-                    return True
-        for row in range(3):
-            for col in range(3, 7):
-                if all(board[row + i, col - i] == player for i in range(4)):
-                    return True
-        return False
+    def _order_moves(self, position, tt_move, pv_move):
+        """Moves of an inner node, the most promising first."""
+        player = position.player
+        mask = position.mask
+        heights = position.heights
+        playable = position.legal_mask()
+        wins = winning_cells(position.bits[player], mask) & playable
+        blocks = winning_cells(position.bits[1 - player], mask) & playable
+        killer1, killer2 = self.killers[position.moves]
+        history = self.history[player]
+
+        scored = []
+        for col in CENTER_ORDER:
+            if heights[col] >= HEIGHT:
+                continue
+            cell = col * H1 + heights[col]
+            if col == pv_move:
+                priority = PV_PRIORITY
+            elif col == tt_move:
+                priority = TT_PRIORITY
+            elif wins >> cell & 1:
+                priority = WIN_PRIORITY
+            elif blocks >> cell & 1:
+                priority = BLOCK_PRIORITY
+            elif col == killer1:
+                priority = KILLER_PRIORITY + 1
+            elif col == killer2:
+                priority = KILLER_PRIORITY
+            else:
+                priority = history[cell]
+            scored.append((priority, col))
+        # the sort is stable, so ties keep the center order
+        scored.sort(key=itemgetter(0), reverse=True)
+        return [col for _, col in scored]
+
+    def _record_cutoff(self, position, col, depth):
+        """Remember a quiet move that caused a beta cutoff."""
+        killers = self.killers[position.moves]
+        if killers[0] != col:
+            killers[1] = killers[0]
+            killers[0] = col
+        self.history[position.player][col * H1 + position.heights[col]] += depth * depth
+
+    def _age_ordering(self):
+        """Forget the killers and halve the history scores before a search."""
+        for killers in self.killers:
+            killers[0] = killers[1] = -1
+        for history in self.history:
+            for i, score in enumerate(history):
+                history[i] = score >> 1
+
+    def _minimax_batch(self, position, depth):
+        """Exact minimax value of a shallow subtree with batched leaf evaluation."""
+        mine = []
+        theirs = []
+        fixed = {}
+        tree = self._collect_leaves(position, depth, mine, theirs, fixed)
+        self.nodes += len(mine)
+
+        values = self.evaluator.evaluate_bits(
+            np.array(mine, dtype=np.uint64), np.array(theirs, dtype=np.uint64)
+        ).tolist()
+        for i, value in fixed.items():
+            values[i] = value
+
+        return self._backup(tree, values)
+
+    def _collect_leaves(self, position, depth, mine, theirs, fixed):
+        """Gather the leaves below position.
+
+        Returns a list of (col, child), child being the index of a leaf in
+        mine/theirs or the list of its own children. Leaves whose value is
+        known without evaluation (wins) are recorded in fixed.
+        """
+        children = []
+        for col in position.legal_moves():
+            if position.is_winning_move(col):
+                # same score _minimax gives a lost position
+                fixed[len(mine)] = -10000 - (depth - 1)
+                children.append((col, len(mine)))
+                mine.append(0)
+                theirs.append(0)
+                continue
+
+            position.play(col)
+            if depth <= 1 or position.is_full():
+                children.append((col, len(mine)))
+                mine.append(position.bits[position.player])
+                theirs.append(position.bits[1 - position.player])
+            else:
+                children.append((col, self._collect_leaves(position, depth - 1, mine, theirs, fixed)))
+            position.undo()
+        return children
+
+    def _backup(self, children, values):
+        """Negamax over a collected subtree. Returns (value, best move)."""
+        best = -99999
+        best_move = children[0][0]
+        for col, child in children:
+            if isinstance(child, int):
+                score = -values[child]
+            else:
+                score = -self._backup(child, values)[0]
+            if score > best:
+                best = score
+                best_move = col
+        return best, best_move
+
+    def _evaluate(self, position):
+        """Evaluate the position for the player to move."""
+        return self.evaluator.score(position.player)
+
+    def search_metrics(self):
+        """Nodes searched, depth reached, positions proved and table use of the last move."""
+        return {
+            "nodes": self.nodes,
+            "depth": self.last_depth,
+            "proved": self.last_proved,
+            "tt_hit_rate": self.tt.hit_rate(),
+            "tt_megabytes": self.tt.nbytes() / (1024 * 1024),
+        }
 
     def reset(self):
         """Reset the agent."""
-        pass
+        self.tt.clear()
+        self.solver.tt.clear()
+        for history in self.history:
+            history[:] = [0] * len(history)
@@ -0,0 +1,77 @@
+import os
+import struct
+import numpy as np
+from .bitboard import WIDTH
+
+# magic, number of positions, deepest ply, then the builder settings:
+# search depth, solver seconds per position, positions solved exactly
+HEADER = struct.Struct("<8sIIIfI")
+MAGIC = b"C4BOOK2\0"
+
+DEFAULT_BOOK = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            "data", "opening_book.bin")
+
+
+def write_book(path, moves, max_ply, depth=0, solve_time=0.0, solved=0):
+    """Write a book from a {canonical key: move} dict.
+
+    The file is the header followed by the sorted keys (uint64) and their
+    moves (uint8), 9 bytes per position. depth, solve_time and solved
+    record how the moves were found (see scripts/build_opening_book.py).
+    """
+    keys = np.array(sorted(moves), dtype="<u8")
+    values = np.array([moves[int(k)] for k in keys], dtype=np.uint8)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(keys), max_ply, depth, solve_time, solved))
+        f.write(keys.tobytes())
+        f.write(values.tobytes())
+
+
+class OpeningBook:
+    """Read-only opening book mapped in memory.
+
+    Nothing is parsed at load time: the key and move arrays are views of
+    the file, and a lookup is a binary search touching a few pages.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, count, max_ply, depth, solve_time, solved = HEADER.unpack(
+                f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"Not an opening book: {path}")
+        self.path = path
+        self.max_ply = max_ply
+        self.count = count
+        self.depth = depth
+        self.solve_time = solve_time
+        self.solved = solved
+        if count:
+            self.keys = np.memmap(path, dtype="<u8", mode="r", offset=HEADER.size,
+                                  shape=(count,))
+            self.moves = np.memmap(path, dtype=np.uint8, mode="r",
+                                   offset=HEADER.size + 8 * count, shape=(count,))
+        else:
+            self.keys = np.zeros(0, dtype="<u8")
+            self.moves = np.zeros(0, dtype=np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, position):
+        """Book move of a position, or -1 if it is not in the book."""
+        if position.moves > self.max_ply or not self.count:
+            return -1
+        key, mirrored = position.canonical_key()
+        i = int(np.searchsorted(self.keys, np.uint64(key)))
+        if i == self.count or int(self.keys[i]) != key:
+            return -1
+        move = int(self.moves[i])
+        return WIDTH - 1 - move if mirrored else move
+
+
+def load_book(path=DEFAULT_BOOK):
+    """Open a book, or return None when the file does not exist."""
+    if path is None or not os.path.exists(path):
+        return None
+    return OpeningBook(path)
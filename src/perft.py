@@ -0,0 +1,106 @@
+import sys
+import time
+import argparse
+from .bitboard import WIDTH
+from .random_agent import RandomAgent
+from .solver import position_from_text
+
+# number of games lasting at least n plies from the empty board, for
+# n = 0, 1, 2... (OEIS A090224)
+REFERENCE_COUNTS = [
+    1, 7, 49, 343, 2401, 16807, 117649, 823536, 5673234, 39394572, 268031646,
+]
+
+
+def perft(position, depth):
+    """Number of move sequences of depth plies from position.
+
+    A sequence stops at a won position: a win is counted as a leaf when
+    it happens on the last ply and not expanded before. Leaves are
+    counted without being played.
+    """
+    if depth == 0:
+        return 1
+    moves = position.legal_moves()
+    if depth == 1:
+        return len(moves)
+    count = 0
+    for col in moves:
+        if position.is_winning_move(col):
+            continue
+        position.play(col)
+        count += perft(position, depth - 1)
+        position.undo()
+    return count
+
+
+def perft_board(board, depth, player=1, agent=None):
+    """Same count on a 6x7 NumPy board (0 empty, 1 or 2), player to move.
+
+    Uses the BaseAgent helpers _get_next_row and _check_win_from_position
+    of `agent` (a RandomAgent by default), to compare their speed with
+    the bitboard.
+    """
+    if agent is None:
+        agent = RandomAgent()
+    if depth == 0:
+        return 1
+    count = 0
+    for col in range(WIDTH):
+        row = agent._get_next_row(board, col)
+        if row < 0:
+            continue
+        if depth == 1:
+            count += 1
+            continue
+        board[row, col] = player
+        if not agent._check_win_from_position(board, row, col, player):
+            count += perft_board(board, depth - 1, 3 - player, agent)
+        board[row, col] = 0
+    return count
+
+
+def timed(function, *args):
+    """Result of function(*args) and the seconds it took."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    """Count and time perft from a position: python -m src.perft --depth 7 [moves]"""
+    parser = argparse.ArgumentParser(description="Connect Four perft")
+    parser.add_argument("moves", nargs="*", help="columns (0-6) played from the empty board")
+    parser.add_argument("--depth", type=int, default=7)
+    parser.add_argument("--numpy-depth", type=int, default=None,
+                        help="depth for the NumPy board helpers (the same by default)")
+    args = parser.parse_args(argv)
+
+    try:
+        position = position_from_text(" ".join(args.moves))
+    except ValueError as error:
+        parser.error(str(error))
+    moves = list(position.history)
+    print(f"Moves: {''.join(map(str, moves)) or '-'}")
+
+    count, seconds = timed(perft, position, args.depth)
+    print(f"bitboard  depth {args.depth}: {count} in {seconds:.2f}s "
+          f"({count / seconds:,.0f} leaves/s)")
+    status = 0
+    if not moves and args.depth < len(REFERENCE_COUNTS):
+        expected = REFERENCE_COUNTS[args.depth]
+        ok = count == expected
+        print(f"reference: {expected} {'ok' if ok else 'MISMATCH'}")
+        status = 0 if ok else 1
+
+    depth = args.depth if args.numpy_depth is None else args.numpy_depth
+    # stones of player 0 are 1, those of player 1 are 2
+    board = position.to_board(player=0)
+    count, seconds = timed(perft_board, board, depth, position.player + 1)
+    print(f"numpy     depth {depth}: {count} in {seconds:.2f}s "
+          f"({count / seconds:,.0f} leaves/s)")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import math
+import numpy as np
+
+# two-sided 95% normal quantile
+Z95 = 1.959964
+
+ELO_SCALE = 400 / math.log(10)
+
+
+def expected_score(elo):
+    """Expected score of a player rated elo points above its opponent."""
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def score_to_elo(score):
+    """Elo difference giving an expected score (clamped away from 0 and 1)."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+
+def _score_stats(wins, losses, draws):
+    """Mean score and per-game variance of a match result."""
+    n = wins + losses + draws
+    mean = (wins + 0.5 * draws) / n
+    var = (wins * (1 - mean) ** 2 + losses * mean ** 2 + draws * (0.5 - mean) ** 2) / n
+    return mean, var
+
+
+def pairing_elo(wins, losses, draws, z=Z95, prior=1.0):
+    """Elo difference of a match result with its confidence interval.
+
+    Returns (elo, low, high), the interval coming from the normal
+    approximation of the mean score. As in elo_ratings, `prior` virtual
+    draws keep perfect scores finite.
+    """
+    if wins + losses + draws == 0:
+        return 0.0, -math.inf, math.inf
+    draws += prior
+    n = wins + losses + draws
+    mean, var = _score_stats(wins, losses, draws)
+    margin = z * math.sqrt(var / n)
+    return score_to_elo(mean), score_to_elo(mean - margin), score_to_elo(mean + margin)
+
+
+def elo_ratings(results, z=Z95, prior=1.0, iterations=1000):
+    """Ratings of every agent from pairing results, with their error margins.
+
+    `results` is {(name1, name2): {"agent1", "agent2", "draw"}} as returned
+    by the tournament. Ratings are the maximum likelihood Bradley-Terry
+    fit (a draw counts as half a win each) averaging 0, with `prior`
+    virtual draws per pairing so that perfect scores stay finite. The
+    margin is z standard errors from the inverse Fisher information.
+
+    Returns {name: (elo, margin)}.
+    """
+    names = sorted({name for pair in results for name in pair})
+    index = {name: i for i, name in enumerate(names)}
+    n = len(names)
+    games = np.zeros((n, n))
+    wins = np.zeros(n)
+    for (name1, name2), stats in results.items():
+        i, j = index[name1], index[name2]
+        total = stats["agent1"] + stats["agent2"] + stats["draw"] + prior
+        games[i, j] += total
+        games[j, i] += total
+        wins[i] += stats["agent1"] + 0.5 * (stats["draw"] + prior)
+        wins[j] += stats["agent2"] + 0.5 * (stats["draw"] + prior)
+
+    # minorization-maximization updates of the strengths
+    strength = np.ones(n)
+    for _ in range(iterations):
+        denom = (games / (strength[:, None] + strength[None, :])).sum(axis=1)
+        updated = np.where(denom > 0, wins / np.maximum(denom, 1e-300), strength)
+        updated /= np.exp(np.log(updated).mean())
+        done = np.allclose(updated, strength, rtol=1e-10)
+        strength = updated
+        if done:
+            break
+
+    theta = np.log(strength)
+    p = 1 / (1 + np.exp(theta[None, :] - theta[:, None]))
+    info = games * p * (1 - p)
+    fisher = np.diag(info.sum(axis=1)) - info
+    cov = np.linalg.pinv(fisher)
+    elo = ELO_SCALE * (theta - theta.mean())
+    margin = z * ELO_SCALE * np.sqrt(np.maximum(np.diag(cov), 0))
+    return {name: (float(elo[i]), float(margin[i])) for name, i in index.items()}
+
+
+class SPRT:
+    """Sequential probability ratio test between two agents.
+
+    Tests H0: "the first agent is `elo` points weaker" against H1: "it is
+    `elo` points stronger" with error rates alpha and beta, using the
+    normal approximation of the log-likelihood ratio of the mean score.
+    Accepting either hypothesis decides which agent is stronger, up to
+    the `elo` indifference margin. Results are only tested once
+    `min_games` are played and after an even number of games, so both
+    agents had each seat equally often.
+    """
+
+    def __init__(self, elo=50, alpha=0.05, beta=0.05, min_games=10):
+        self.elo = elo
+        self.alpha = alpha
+        self.beta = beta
+        self.min_games = min_games
+        self.score0 = expected_score(-elo)
+        self.score1 = expected_score(elo)
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+
+    def llr(self, wins, losses, draws):
+        """Log-likelihood ratio of H1 against H0 for a match result."""
+        n = wins + losses + draws
+        if n == 0:
+            return 0.0
+        mean, var = _score_stats(wins, losses, draws)
+        # one virtual game of each kind keeps the variance of one-sided results positive
+        _, var_floor = _score_stats(1, 1, 1)
+        var = max(var, var_floor / n)
+        s0, s1 = self.score0, self.score1
+        return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * var)
+
+    def status(self, wins, losses, draws):
+        """Decision on a match result: "H1" (first agent stronger), "H0" or None."""
+        n = wins + losses + draws
+        if n < self.min_games or n % 2:
+            return None
+        llr = self.llr(wins, losses, draws)
+        if llr >= self.upper:
+            return "H1"
+        if llr <= self.lower:
+            return "H0"
+        return None
+
+    def cutoff(self, scores):
+        """Number of games after which a sequence of scores (1, 0.5, 0) is decided.
+
+        Returns None when the test does not stop within the sequence.
+        """
+        wins = losses = draws = 0
+        for n, score in enumerate(scores, 1):
+            if score == 1:
+                wins += 1
+            elif score == 0:
+                losses += 1
+            else:
+                draws += 1
+            if self.status(wins, losses, draws) is not None:
+                return n
+        return None
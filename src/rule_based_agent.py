@@ -23,15 +23,15 @@ class RuleBasedAgent(BaseAgent):
         if not valid:
             raise ValueError("No valid action available")
 
-        board = self._observation_to_board(observation)
+        position = self._observation_to_position(observation)
 
         # 1. Look for a winning move
-        win_move = self._find_winning_move(board, action_mask, player=1)
+        win_move = self._find_winning_move(position, action_mask, player=1)
         if win_move != -1:
             return win_move
 
         # 2. Block opponent
-        block_move = self._find_winning_move(board, action_mask, player=2)
+        block_move = self._find_winning_move(position, action_mask, player=2)
         if block_move != -1:
             return block_move
 
@@ -0,0 +1,99 @@
+import numpy as np
+from .bitboard import (
+    BOARD_MASK, BOTTOM_MASK, CENTER_ORDER, HEIGHT, WIDTH, has_alignment_batch, winning_cells,
+)
+from .rollout import COLUMN_MASKS
+
+# rank of each column in the center-first order
+CENTER_RANK = np.array([CENTER_ORDER.index(col) for col in range(WIDTH)])
+
+
+def random_policy(mine, theirs, legal, rng):
+    """Uniformly random legal column in each game."""
+    noise = rng.random(legal.shape)
+    noise[~legal] = -1.0
+    return noise.argmax(axis=1)
+
+
+def rule_policy(mine, theirs, legal, rng):
+    """RuleBasedAgent in batch: win, else block, else the most central column."""
+    mask = mine | theirs
+    playable = (mask + np.uint64(BOTTOM_MASK)) & np.uint64(BOARD_MASK)
+    win, block = winning_cells(np.stack([mine, theirs]), mask) & playable
+    win = (win[:, None] & COLUMN_MASKS) != 0
+    block = (block[:, None] & COLUMN_MASKS) != 0
+
+    # first winning column, else first blocking column, else center-first
+    center = np.where(legal, CENTER_RANK, WIDTH).argmin(axis=1)
+    move = np.where(block.any(axis=1), block.argmax(axis=1), center)
+    return np.where(win.any(axis=1), win.argmax(axis=1), move)
+
+
+class BatchResult:
+    """Outcome of a batch of games.
+
+    `winners` holds 0 or 1 for the winning player and -1 for draws,
+    `lengths` the number of moves of each game and, when recorded,
+    `moves[i, :lengths[i]]` the columns played in game i.
+    """
+
+    def __init__(self, winners, lengths, moves=None):
+        self.winners = winners
+        self.lengths = lengths
+        self.moves = moves
+
+    def __len__(self):
+        return len(self.winners)
+
+    def counts(self):
+        """Wins of each player and draws: {"player_0", "player_1", "draw"}."""
+        return {
+            "player_0": int(np.count_nonzero(self.winners == 0)),
+            "player_1": int(np.count_nonzero(self.winners == 1)),
+            "draw": int(np.count_nonzero(self.winners == -1)),
+        }
+
+
+def simulate(count, policies=(random_policy, random_policy), rng=None, record=False):
+    """Play count games at once, without PettingZoo.
+
+    The games are kept as uint64 bitboard arrays and advance together one
+    ply at a time; finished games drop out of the batch. `policies` gives
+    the batched policy of each player: a function of (mine, theirs, legal,
+    rng), the stones of the player to move and of its opponent for each
+    active game and their (n, 7) legal columns, returning a column per
+    game. `rng` is a NumPy Generator or a seed.
+    """
+    rng = np.random.default_rng(rng)
+    bits = np.zeros((2, count), dtype=np.uint64)
+    winners = np.full(count, -1, dtype=np.int8)
+    lengths = np.zeros(count, dtype=np.int8)
+    moves = np.full((count, WIDTH * HEIGHT), -1, dtype=np.int8) if record else None
+    active = np.arange(count)
+    bottom = np.uint64(BOTTOM_MASK)
+    board = np.uint64(BOARD_MASK)
+
+    for ply in range(WIDTH * HEIGHT):
+        if active.size == 0:
+            break
+        player = ply & 1
+
+        mine = bits[player, active]
+        theirs = bits[1 - player, active]
+        playable = ((mine | theirs) + bottom) & board
+        legal = (playable[:, None] & COLUMN_MASKS) != 0
+
+        cols = policies[player](mine, theirs, legal, rng)
+        if not legal[np.arange(active.size), cols].all():
+            raise ValueError("Policy played an illegal column")
+        mine |= playable & COLUMN_MASKS[cols]
+        bits[player, active] = mine
+        lengths[active] = ply + 1
+        if record:
+            moves[active, ply] = cols
+
+        won = has_alignment_batch(mine)
+        winners[active[won]] = player
+        active = active[~won]
+
+    return BatchResult(winners, lengths, moves)
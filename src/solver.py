@@ -0,0 +1,293 @@
+import sys
+import time
+import argparse
+from .bitboard import (
+    BOARD_MASK, BOTTOM_MASK, CENTER_ORDER, HEIGHT, WIDTH, Position, column_mask, popcount,
+    winning_cells,
+)
+from .transposition import LOWER, UPPER, TranspositionTable
+
+CELLS = WIDTH * HEIGHT
+
+COLUMN_MASKS = [column_mask(col) for col in range(WIDTH)]
+
+
+class SolverTimeout(Exception):
+    """Raised when a solve runs past its deadline."""
+
+
+def non_losing_moves(current, mask):
+    """Playable cells that do not lose at once for the owner of current.
+
+    Returns 0 when every move loses: the opponent has two immediate wins,
+    or every answer to its one threat plays under another threat. The
+    caller must have checked that current cannot win right away.
+    """
+    playable = (mask + BOTTOM_MASK) & BOARD_MASK
+    threats = winning_cells(current ^ mask, mask)
+    forced = threats & playable
+    if forced:
+        if forced & (forced - 1):
+            return 0
+        playable = forced
+    # never play directly under an opponent threat
+    return playable & ~(threats >> 1)
+
+
+def move_score(current, mask, move):
+    """Number of winning cells the owner of current has after move."""
+    mask |= move
+    return popcount(winning_cells(current | move, mask) & ~mask)
+
+
+class Solver:
+    """Exact solver scoring positions the usual way.
+
+    A won position is worth 22 minus the number of stones the winner has
+    played (so faster wins score higher), a lost one the negative of the
+    opponent's, and a draw 0; scores are for the player to move. The score is narrowed by null-window
+    searches, each halving the range [min, max] and starting around 0 so
+    the win/draw/loss question is answered first. The negamax plays only
+    non-losing moves, tries the moves creating the most threats first
+    (center columns on ties) and keeps score bounds in a
+    TranspositionTable.
+
+    `positions`, `elapsed` and the table counters describe the last solve.
+    A solve given a `deadline` (a time.time() value) raises SolverTimeout
+    once it passes.
+    """
+
+    def __init__(self, tt_size=1 << 22):
+        self.tt = TranspositionTable(tt_size)
+        self.positions = 0
+        self.elapsed = 0.0
+        self.deadline = None
+
+    def solve(self, position, deadline=None):
+        """Exact score of a position for the player to move."""
+        self.positions = 0
+        self.deadline = deadline
+        self.tt.reset_stats()
+        start = time.time()
+        current = position.bits[position.player]
+        score = self._solve(current, position.mask, position.moves)
+        self.elapsed = time.time() - start
+        return score
+
+    def analyze(self, position, deadline=None):
+        """Score of each column for the player to move, None for full columns."""
+        self.positions = 0
+        self.deadline = deadline
+        self.tt.reset_stats()
+        start = time.time()
+        current = position.bits[position.player]
+        mask = position.mask
+        scores = [None] * WIDTH
+        for col in position.legal_moves():
+            move = (mask + BOTTOM_MASK) & COLUMN_MASKS[col]
+            if winning_cells(current, mask) & move:
+                scores[col] = (CELLS + 1 - position.moves) // 2
+            else:
+                scores[col] = -self._solve(current ^ mask, mask | move, position.moves + 1)
+        self.elapsed = time.time() - start
+        return scores
+
+    def best_moves(self, position, deadline=None):
+        """Columns with the best score, and that score.
+
+        Cheaper than analyze: once the score is known, one null-window
+        search per column tells whether it reaches it.
+        """
+        best = self.solve(position, deadline)
+        start = time.time() - self.elapsed
+        current = position.bits[position.player]
+        mask = position.mask
+        playable = (mask + BOTTOM_MASK) & BOARD_MASK
+        opponent = current ^ mask
+        moves = []
+        for col in position.legal_moves():
+            move = playable & COLUMN_MASKS[col]
+            if winning_cells(current, mask) & move:
+                reaches = best == (CELLS + 1 - position.moves) // 2
+            else:
+                child = mask | move
+                if winning_cells(opponent, child) & (child + BOTTOM_MASK) & BOARD_MASK:
+                    # the opponent wins with its next stone
+                    reaches = best == -((CELLS - position.moves) // 2)
+                else:
+                    # the column reaches best if the opponent scores at most -best
+                    bound = self._negamax(opponent, child, position.moves + 1, -best, -best + 1)
+                    reaches = bound <= -best
+            if reaches:
+                moves.append(col)
+        self.elapsed = time.time() - start
+        return moves, best
+
+    def positions_per_second(self):
+        """Search speed of the last solve."""
+        return self.positions / self.elapsed if self.elapsed > 0 else 0.0
+
+    def stats(self):
+        """Counters of the last solve."""
+        return {
+            "positions": self.positions,
+            "seconds": self.elapsed,
+            "positions_per_second": self.positions_per_second(),
+            "tt_probes": self.tt.probes,
+            "tt_hits": self.tt.hits,
+            "tt_hit_rate": self.tt.hit_rate(),
+        }
+
+    def _solve(self, current, mask, moves):
+        """Iterative null-window narrowing of the score."""
+        if winning_cells(current, mask) & (mask + BOTTOM_MASK) & BOARD_MASK:
+            return (CELLS + 1 - moves) // 2
+        if moves >= CELLS:
+            return 0
+
+        low = -((CELLS - moves) // 2)
+        high = (CELLS + 1 - moves) // 2
+        while low < high:
+            mid = low + (high - low) // 2
+            # probe around 0 first: the sign is the cheapest to establish
+            if mid <= 0 and low // 2 < mid:
+                mid = low // 2
+            elif mid >= 0 and high // 2 > mid:
+                mid = high // 2
+            score = self._negamax(current, mask, moves, mid, mid + 1)
+            if score <= mid:
+                high = score
+            else:
+                low = score
+        return low
+
+    def _negamax(self, current, mask, moves, alpha, beta):
+        """Score bound for the owner of current, who cannot win at once."""
+        self.positions += 1
+        if (self.deadline is not None and self.positions & 1023 == 0
+                and time.time() > self.deadline):
+            raise SolverTimeout()
+
+        candidates = non_losing_moves(current, mask)
+        if not candidates:
+            return -((CELLS - moves) // 2)
+        if moves >= CELLS - 2:
+            return 0
+
+        # the opponent cannot win with its next stone
+        low = -((CELLS - 2 - moves) // 2)
+        if alpha < low:
+            alpha = low
+            if alpha >= beta:
+                return alpha
+
+        # we cannot win with our next stone either
+        high = (CELLS - 1 - moves) // 2
+        key = current + mask
+        entry = self.tt.probe(key)
+        tt_move = -1
+        if entry is not None:
+            value, _, flag, tt_move = entry
+            if flag == LOWER:
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        return alpha
+            elif value < high:
+                high = value
+        if beta > high:
+            beta = high
+            if alpha >= beta:
+                return beta
+
+        order = []
+        for i, col in enumerate(CENTER_ORDER):
+            move = candidates & COLUMN_MASKS[col]
+            if move:
+                score = move_score(current, mask, move)
+                if col == tt_move:
+                    score += 100
+                order.append((-score, i, col, move))
+        order.sort()
+
+        opponent = current ^ mask
+        for _, _, col, move in order:
+            score = -self._negamax(opponent, mask | move, moves + 1, -beta, -alpha)
+            if score >= beta:
+                self.tt.store(key, 0, score, LOWER, col)
+                return score
+            if score > alpha:
+                alpha = score
+        self.tt.store(key, 0, alpha, UPPER, order[0][2])
+        return alpha
+
+
+def parse_moves(text):
+    """Columns (0-6) from a string like "3342", "3 3 4 2" or "3,3,4,2".
+
+    Raises ValueError on any other character.
+    """
+    moves = []
+    for c in text:
+        if c in " ,":
+            continue
+        if not c.isdigit() or int(c) >= WIDTH:
+            raise ValueError(f"invalid move {c!r}: columns are 0 to {WIDTH - 1}")
+        moves.append(int(c))
+    return moves
+
+
+def position_from_text(text):
+    """Position after the moves of a string, checked to be playable.
+
+    Raises ValueError for invalid characters, a move in a full column or
+    a move after the end of the game.
+    """
+    position = Position()
+    for i, col in enumerate(parse_moves(text), 1):
+        if position.winner() != -1:
+            raise ValueError(f"move {i}: the game is already won")
+        if not position.can_play(col):
+            raise ValueError(f"move {i}: column {col} is full")
+        position.play(col)
+    return position
+
+
+def main(argv=None):
+    """Solve the position after a move sequence: python -m src.solver 3342"""
+    parser = argparse.ArgumentParser(description="Connect Four solver")
+    parser.add_argument("moves", nargs="*", help="columns (0-6) played from the empty board")
+    parser.add_argument("--analyze", action="store_true",
+                        help="also print the exact score of every column (much slower)")
+    args = parser.parse_args(argv)
+    try:
+        position = position_from_text(" ".join(args.moves))
+    except ValueError as error:
+        parser.error(str(error))
+    moves = position.history
+    if position.winner() != -1 or position.is_full():
+        print("Game over")
+        return 1
+
+    solver = Solver()
+    if args.analyze:
+        scores = solver.analyze(position)
+        best = max(s for s in scores if s is not None)
+        best_moves = [col for col, s in enumerate(scores) if s == best]
+    else:
+        best_moves, best = solver.best_moves(position)
+    stats = solver.stats()
+
+    print(f"Moves: {''.join(map(str, moves)) or '-'}")
+    print(f"Score: {best:+d}")
+    print(f"Best moves: {best_moves}")
+    if args.analyze:
+        print("Columns: " + " ".join("  ." if s is None else f"{s:+3d}" for s in scores))
+    print(f"{stats['positions']} positions in {stats['seconds']:.2f}s "
+          f"({stats['positions_per_second']:.0f}/s), "
+          f"TT hits {stats['tt_hits']}/{stats['tt_probes']} ({stats['tt_hit_rate']:.1%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,410 @@
+import os
+import json
+import time
+import queue
+import collections
+import multiprocessing as mp
+import numpy as np
+from pettingzoo.classic import connect_four_v3
+from .instrumentation import AgentStats
+
+
+def game_seed(seed, pairing, game):
+    """Seed of one game, independent of when and where it is played."""
+    return int(np.random.SeedSequence([seed, pairing, game]).generate_state(1)[0])
+
+
+def build_agents(specs, stats=False):
+    """Create the agents from {name: (class, kwargs)}, recording stats if asked."""
+    agents = {name: cls(name=name, **kwargs) for name, (cls, kwargs) in specs.items()}
+    if stats:
+        for agent in agents.values():
+            agent.enable_stats()
+    return agents
+
+
+def prepare(agent, seed):
+    """Seed an agent and clear what it kept from previous games."""
+    if hasattr(agent, "set_seed"):
+        agent.set_seed(seed)
+    agent.reset()
+
+
+def run_game(agent1, agent2):
+    """Run a game. Returns (winner, moves, times, metrics).
+
+    The winner is "player_0", "player_1" or "draw"; `times` holds the
+    seconds each move took to choose and `metrics` the last_metrics of
+    each move of agents recording stats (None otherwise).
+    """
+    env = connect_four_v3.env()
+    env.reset()
+
+    agents = {"player_0": agent1, "player_1": agent2}
+    moves = []
+    times = []
+    metrics = []
+
+    for name in env.agent_iter():
+        obs, reward, done, trunc, _ = env.last()
+
+        if done or trunc:
+            if reward == 1:
+                winner = name
+            elif reward == -1:
+                winner = "player_1" if name == "player_0" else "player_0"
+            else:
+                winner = "draw"
+            env.step(None)
+            break
+
+        agent = agents[name]
+        start = time.perf_counter()
+        action = agent.select_action(obs["observation"], obs["action_mask"])
+        times.append(round(time.perf_counter() - start, 6))
+        moves.append(int(action))
+        metrics.append(agent.last_metrics if agent.stats is not None else None)
+        env.step(action)
+
+    env.close()
+    return winner, moves, times, metrics
+
+
+def play(agents, pairings, task, seed):
+    """Play one game of a pairing. Returns its log record.
+
+    The first agent of the pairing moves first in even games.
+    """
+    pairing, game = task
+    name1, name2 = pairings[pairing]
+    base = game_seed(seed, pairing, game)
+    prepare(agents[name1], base)
+    prepare(agents[name2], base + 1)
+
+    first, second = (name1, name2) if game % 2 == 0 else (name2, name1)
+    winner, moves, times, metrics = run_game(agents[first], agents[second])
+    if winner == "player_0":
+        winner = first
+    elif winner == "player_1":
+        winner = second
+    record = {
+        "pairing": [name1, name2],
+        "game": game,
+        "player_0": first,
+        "player_1": second,
+        "seed": base,
+        "winner": winner,
+        "moves": moves,
+        "times": times,
+    }
+    if any(m is not None for m in metrics):
+        record["metrics"] = metrics
+    return record
+
+
+def tournament_header(specs, games, seed):
+    """First record of a game log: what its games were played with.
+
+    Agent classes and arguments (time or fixed budgets included), games
+    per pairing and seed; a log is only resumed by the same tournament.
+    """
+    header = {
+        "tournament": {
+            "agents": {name: {"class": cls.__name__, "kwargs": kwargs}
+                       for name, (cls, kwargs) in specs.items()},
+            "games": games,
+            "seed": seed,
+        }
+    }
+    # as read back from the log
+    return json.loads(json.dumps(header, sort_keys=True, default=repr))
+
+
+def _read_records(path):
+    """Yield every record of a log, one per line, the header included.
+
+    A line cut short by a crash is skipped.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def read_log(path):
+    """Yield the game records of a log."""
+    for record in _read_records(path):
+        if "tournament" not in record:
+            yield record
+
+
+def read_header(path):
+    """The header record of a log, or None for a missing or empty log."""
+    for record in _read_records(path):
+        return record if "tournament" in record else {}
+    return None
+
+
+def game_score(record):
+    """Score of the first agent of the pairing in a game: 1, 0.5 or 0."""
+    name1, name2 = record["pairing"]
+    if record["winner"] == name1:
+        return 1.0
+    if record["winner"] == name2:
+        return 0.0
+    return 0.5
+
+
+def _prefix(scores):
+    """Scores of games 0, 1, 2... up to the first one missing."""
+    prefix = []
+    while len(prefix) in scores:
+        prefix.append(scores[len(prefix)])
+    return prefix
+
+
+def standings(records, sprt=None):
+    """Results per pairing from records, in one pass.
+
+    With an SPRT, a pairing only counts the games up to the point where
+    the test decided it; games played past it are ignored.
+
+    Returns {(name1, name2): {"agent1": wins, "agent2": wins, "draw": draws}}.
+    """
+    results = {}
+    scores = {}
+    for record in records:
+        pair = tuple(record["pairing"])
+        if sprt is not None:
+            scores.setdefault(pair, {})[record["game"]] = game_score(record)
+            continue
+        stats = results.setdefault(pair, {"agent1": 0, "agent2": 0, "draw": 0})
+        score = game_score(record)
+        if score == 1:
+            stats["agent1"] += 1
+        elif score == 0:
+            stats["agent2"] += 1
+        else:
+            stats["draw"] += 1
+
+    for pair, games in scores.items():
+        prefix = _prefix(games)
+        cut = sprt.cutoff(prefix)
+        counted = prefix[:cut] if cut is not None else list(games.values())
+        results[pair] = {
+            "agent1": counted.count(1.0),
+            "agent2": counted.count(0.0),
+            "draw": counted.count(0.5),
+        }
+    return results
+
+
+def move_stats(records):
+    """Per-agent histograms of the moves in records, in one pass.
+
+    Moves recorded with metrics count all of them, the others only their
+    time. Returns {name: AgentStats}.
+    """
+    stats = {}
+    for record in records:
+        metrics = record.get("metrics") or [None] * len(record["times"])
+        for ply, (seconds, move_metrics) in enumerate(zip(record["times"], metrics)):
+            name = record["player_0"] if ply % 2 == 0 else record["player_1"]
+            agent_stats = stats.get(name)
+            if agent_stats is None:
+                agent_stats = stats[name] = AgentStats()
+            agent_stats.record(move_metrics or {"seconds": seconds})
+    return stats
+
+
+def _open_log(path):
+    """Open a log for appending, ending a line cut short by a crash."""
+    f = open(path, "a+")
+    if f.tell() > 0:
+        f.seek(f.tell() - 1)
+        if f.read(1) != "\n":
+            f.write("\n")
+    return f
+
+
+# agents of a worker process, built once by _init_worker
+_worker_agents = None
+
+
+def _init_worker(specs, stats):
+    """Build the agents of a worker process."""
+    global _worker_agents
+    _worker_agents = build_agents(specs, stats)
+
+
+def _play_task(args):
+    """Play one game in a worker process."""
+    return play(_worker_agents, *args)
+
+
+def schedule(pairings, games, cost=None):
+    """Games as (pairing, game) tasks, the most expensive pairings first.
+
+    `cost` maps an agent name to its relative time per move (1 by default).
+    """
+    cost = cost or {}
+    order = sorted(range(len(pairings)),
+                   key=lambda p: -sum(cost.get(name, 1.0) for name in pairings[p]))
+    return [(p, game) for p in order for game in range(games)]
+
+
+class _SerialRunner:
+    """Plays the submitted games one at a time in this process."""
+
+    def __init__(self, specs, pairings, seed, workers, stats):
+        self.agents = build_agents(specs, stats)
+        self.pairings = pairings
+        self.seed = seed
+        self.slots = 1
+        self.queue = []
+
+    def pending(self):
+        return len(self.queue)
+
+    def submit(self, task):
+        self.queue.append(task)
+
+    def wait(self):
+        """Play the oldest submitted game and return its record."""
+        return play(self.agents, self.pairings, self.queue.pop(0), self.seed)
+
+    def close(self):
+        pass
+
+
+class _PoolRunner:
+    """Plays the submitted games on a pool of worker processes."""
+
+    def __init__(self, specs, pairings, seed, workers, stats):
+        self.specs = specs
+        self.stats = stats
+        self.pairings = pairings
+        self.seed = seed
+        self.workers = workers
+        # keep every worker busy while a result is being handled
+        self.slots = 2 * workers
+        self.pool = None
+        self.results = queue.Queue()
+        self.count = 0
+
+    def pending(self):
+        return self.count
+
+    def submit(self, task):
+        if self.pool is None:
+            self.pool = mp.Pool(self.workers, initializer=_init_worker,
+                                initargs=(self.specs, self.stats))
+        self.count += 1
+        self.pool.apply_async(_play_task, ((self.pairings, task, self.seed),),
+                              callback=self.results.put, error_callback=self.results.put)
+
+    def wait(self):
+        """Return the record of the next game to finish."""
+        result = self.results.get()
+        self.count -= 1
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+
+
+def run_tournament(specs, games=50, workers=1, seed=0, cost=None, log=None, sprt=None,
+                   stats=False):
+    """Round robin between the agents of specs ({name: (class, kwargs)}).
+
+    Games are spread over `workers` processes, each building its agents
+    once. Every game is seeded from (seed, pairing, game) and agents are
+    reset before it, so the results do not depend on the number of
+    workers for agents whose play only depends on their seed.
+
+    With `log`, each game is appended to that JSONL file as soon as it
+    ends, games already in it are not played again, and the standings
+    are read back from it. The log starts with a tournament_header and
+    a log written with other agents, arguments, games or seed is refused.
+
+    With `sprt` (an SPRT), a pairing stops as soon as the test decides
+    it, `games` becoming the cap. The test runs on games in order, so it
+    stops at the same game whatever the number of workers.
+
+    With `stats`, agents record the metrics of their moves (see
+    BaseAgent.enable_stats) and each game record keeps them.
+
+    Returns {(name1, name2): {"agent1": wins, "agent2": wins, "draw": draws}}.
+    """
+    names = list(specs)
+    pairings = [(a, b) for i, a in enumerate(names) for b in names[i + 1:]]
+    index = {pair: p for p, pair in enumerate(pairings)}
+    scores = [{} for _ in pairings]
+    decided = [False] * len(pairings)
+    records = []
+
+    def played(record):
+        """Take a finished game into account for the SPRT."""
+        pairing = index[tuple(record["pairing"])]
+        scores[pairing][record["game"]] = game_score(record)
+        if sprt is not None and not decided[pairing]:
+            decided[pairing] = sprt.cutoff(_prefix(scores[pairing])) is not None
+
+    def relevant(record):
+        return tuple(record["pairing"]) in index and record["game"] < games
+
+    if log is None:
+        store = records.append
+    else:
+        header = tournament_header(specs, games, seed)
+        found = read_header(log)
+        if found is not None and found != header:
+            raise ValueError(f"{log} was written by another tournament "
+                             f"(agents, arguments, games or seed differ)")
+        for record in read_log(log):
+            if not relevant(record):
+                continue
+            pairing = index[tuple(record["pairing"])]
+            if record["seed"] != game_seed(seed, pairing, record["game"]):
+                raise ValueError(f"{log} was written with another seed or agent list")
+            played(record)
+        log_file = _open_log(log)
+        if found is None:
+            log_file.write(json.dumps(header, sort_keys=True) + "\n")
+
+        def store(record):
+            log_file.write(json.dumps(record) + "\n")
+            log_file.flush()
+
+    tasks = collections.deque(task for task in schedule(pairings, games, cost)
+                              if task[1] not in scores[task[0]])
+    runner_class = _SerialRunner if workers <= 1 else _PoolRunner
+    runner = runner_class(specs, pairings, seed, workers, stats)
+    try:
+        while True:
+            while tasks and runner.pending() < runner.slots:
+                task = tasks.popleft()
+                if not decided[task[0]]:
+                    runner.submit(task)
+            if not runner.pending():
+                break
+            record = runner.wait()
+            store(record)
+            played(record)
+    finally:
+        runner.close()
+        if log is not None:
+            log_file.close()
+
+    if log is not None:
+        records = filter(relevant, read_log(log))
+    results = standings(records, sprt)
+    return {pair: results.get(pair, {"agent1": 0, "agent2": 0, "draw": 0}) for pair in pairings}
@@ -0,0 +1,108 @@
+import numpy as np
+
+# bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+EMPTY = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+# key (8) + value (4) + depth, flag, move, generation (1 each)
+ENTRY_BYTES = 16
+
+
+def entries_for(megabytes):
+    """Number of entries that fit in a memory budget."""
+    return int(megabytes * 1024 * 1024) // ENTRY_BYTES
+
+
+class TranspositionTable:
+    """Fixed-size transposition table with depth-preferred replacement.
+
+    Entries live in preallocated NumPy arrays indexed by `key % size`, so the
+    memory use is fixed at creation (16 bytes per entry). A slot is replaced
+    when it is empty, holds the same position, comes from an older search,
+    or was searched less deep than the new entry.
+    """
+
+    def __init__(self, size=1 << 20):
+        self.size = size
+        self.keys = np.full(size, EMPTY, dtype=np.uint64)
+        self.values = np.zeros(size, dtype=np.int32)
+        self.depths = np.zeros(size, dtype=np.int8)
+        self.flags = np.zeros(size, dtype=np.int8)
+        self.moves = np.zeros(size, dtype=np.int8)
+        self.ages = np.zeros(size, dtype=np.uint8)
+        self.generation = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the probe counters."""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Mark existing entries as coming from an older search.
+
+        The probe counters restart, so they describe one search.
+        """
+        self.generation = (self.generation + 1) & 0xFF
+        self.reset_stats()
+
+    def clear(self):
+        """Empty the table."""
+        self.keys.fill(EMPTY)
+        self.generation = 0
+        self.reset_stats()
+
+    def probe(self, key):
+        """Return (value, depth, flag, move) for a position, or None."""
+        self.probes += 1
+        i = key % self.size
+        if self.keys[i] != key:
+            return None
+        self.hits += 1
+        return int(self.values[i]), int(self.depths[i]), int(self.flags[i]), int(self.moves[i])
+
+    def best_move(self, key):
+        """Return the stored move of a position, or -1. Not counted as a probe."""
+        i = key % self.size
+        if self.keys[i] != key:
+            return -1
+        return int(self.moves[i])
+
+    def store(self, key, depth, value, flag, move):
+        """Store a search result, keeping the deeper entry on collision."""
+        i = key % self.size
+        old = self.keys[i]
+        if (old != EMPTY and old != key and self.ages[i] == self.generation
+                and self.depths[i] > depth):
+            return
+        self.keys[i] = key
+        self.values[i] = value
+        self.depths[i] = depth
+        self.flags[i] = flag
+        self.moves[i] = move
+        self.ages[i] = self.generation
+        self.stores += 1
+
+    def hit_rate(self):
+        """Fraction of probes that found their position."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def nbytes(self):
+        """Memory used by the table arrays, in bytes."""
+        return sum(a.nbytes for a in (self.keys, self.values, self.depths,
+                                      self.flags, self.moves, self.ages))
+
+    def stats(self):
+        """Usage summary."""
+        return {
+            "entries": self.size,
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "stores": self.stores,
+            "megabytes": self.nbytes() / (1024 * 1024),
+        }
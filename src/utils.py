@@ -1,4 +1,8 @@
 import numpy as np
+from .bitboard import boards_to_bits, has_alignment, has_alignment_batch
+from .evaluation import CENTER_COLUMN_WEIGHTS, CENTER_WINDOW_WEIGHTS, Evaluator
+
+_CENTER_EVALUATOR = Evaluator(CENTER_WINDOW_WEIGHTS, CENTER_COLUMN_WEIGHTS)
 
 
 def print_board(observation, player_names=("Player1", "Player2")):
@@ -53,41 +57,22 @@ def get_next_row(board, col):
 
 def check_winner(board):
     """Check if there is a winner. Returns 1, 2, or 0."""
-    # horizontal
-    for row in range(6):
-        for col in range(4):
-            player = board[row, col]
-            if player != 0:
-                if all(board[row, col + i] == player for i in range(4)):
-                    return player
-
-    # vertical
-    for row in range(3):
-        for col in range(7):
-            player = board[row, col]
-            if player != 0:
-                if all(board[row + i, col] == player for i in range(4)):
-                    return player
-
-    # diagonal
-    for row in range(3):
-        for col in range(4):
-            player = board[row, col]
-            if player != 0:
-                if all(board[row + i, col + i] == player for i in range(4)):
-                    return player
-
-    # anti-diagonal
-    for row in range(3):
-        for col in range(3, 7):
-            player = board[row, col]
-            if player != 0:
-                if all(board[row + i, col - i] == player for i in range(4)):
-                    return player
-
+    if has_alignment(int(boards_to_bits(board, 1))):
+        return 1
+    if has_alignment(int(boards_to_bits(board, 2))):
+        return 2
     return 0
 
 
+def check_winner_batch(boards):
+    """Check an array of N boards (N, 6, 7) at once. Returns an array of 1, 2, or 0."""
+    boards = np.asarray(boards)
+    winners = np.zeros(boards.shape[0], dtype=np.int8)
+    winners[has_alignment_batch(boards_to_bits(boards, 2))] = 2
+    winners[has_alignment_batch(boards_to_bits(boards, 1))] = 1
+    return winners
+
+
 def is_board_full(board):
     """Check if the board is full."""
     return np.all(board[0, :] != 0)
@@ -121,13 +106,4 @@ def evaluate_position(board, player):
     if winner == opponent:
         return -100000
 
-    score = 0
-
-    # center bonus
-    for row in range(6):
-        if board[row, 3] == player:
-            score += 3
-        elif board[row, 3] == opponent:
-            score -= 3
-
-    return score
+    return int(_CENTER_EVALUATOR.evaluate_boards(board, player))
@@ -0,0 +1,45 @@
+"""Tests for the ML-Arena agent wrapper"""
+
+import pytest
+import numpy as np
+from src.arena_agent import ArenaAgent
+from src.bitboard import Position
+
+
+def observe(moves):
+    """Observation and action mask after a sequence of moves."""
+    pos = Position.from_moves(moves)
+    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+    return pos.to_observation(), mask
+
+
+class TestArenaAgent:
+    """Tests for ArenaAgent"""
+
+    def test_blocks_opponent(self):
+        """Test the wrapped agent plays its tactics"""
+        agent = ArenaAgent(time_limit=0.2)
+        assert agent.select_action(*observe([0, 6, 1, 6, 2])) == 3
+
+    def test_stats(self):
+        """Test a searched move records its time, nodes and table use"""
+        agent = ArenaAgent(time_limit=0.2)
+        agent.enable_stats()
+        agent.select_action(*observe([3, 2, 4, 4, 1, 5, 0]))
+        metrics = agent.last_metrics
+        assert metrics["nodes"] > 0
+        assert metrics["depth"] > 0
+        assert "tt_hit_rate" in metrics
+        assert metrics["seconds"] < 0.5
+
+    def test_tactical_move_counts_no_nodes(self):
+        """Test a move found without searching reports no search work"""
+        agent = ArenaAgent(time_limit=0.2)
+        agent.enable_stats()
+        agent.select_action(*observe([3, 2, 4, 4, 1, 5, 0]))
+        agent.select_action(*observe([0, 6, 1, 6, 2]))
+        assert agent.last_metrics["nodes"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
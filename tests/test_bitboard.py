@@ -0,0 +1,145 @@
+"""Tests for the bitboard position"""
+
+import pytest
+import numpy as np
+from src.bitboard import (
+    Position, WINDOWS, boards_to_bits, has_alignment, has_alignment_batch, winning_cells,
+)
+from src.utils import check_winner, check_winner_batch, observation_to_board
+
+
+def random_positions(n, seed=0):
+    """Play n random games and keep a random position of each."""
+    rng = np.random.default_rng(seed)
+    positions = []
+    for _ in range(n):
+        pos = Position()
+        stop = rng.integers(0, 42)
+        while pos.moves < stop and pos.winner() == -1:
+            pos.play(int(rng.choice(pos.legal_moves())))
+        positions.append(pos)
+    return positions
+
+
+class TestPosition:
+    """Tests for Position"""
+
+    def test_empty(self):
+        """Test empty position"""
+        pos = Position()
+        assert pos.moves == 0
+        assert pos.player == 0
+        assert pos.legal_moves() == [0, 1, 2, 3, 4, 5, 6]
+
+    def test_play_undo(self):
+        """Test make/unmake restores the position"""
+        pos = Position.from_moves([3, 3, 4])
+        key = pos.key()
+        pos.play(2)
+        assert pos.moves == 4
+        assert pos.heights[2] == 1
+        pos.undo()
+        assert pos.key() == key
+        assert pos.heights == [0, 0, 0, 2, 1, 0, 0]
+
+    def test_full_column(self):
+        """Test full column is not legal"""
+        pos = Position.from_moves([0] * 6)
+        assert not pos.can_play(0)
+        assert 0 not in pos.legal_moves()
+        with pytest.raises(ValueError):
+            Position.from_moves([0] * 7)
+
+    def test_legal_mask(self):
+        """Test legal mask has one cell per open column"""
+        pos = Position.from_moves([0] * 6 + [3])
+        mask = pos.legal_mask()
+        assert bin(mask).count("1") == 6
+        assert mask & pos.move_bit(3)
+
+    def test_observation_roundtrip(self):
+        """Test conversion from and to observations"""
+        pos = Position.from_moves([3, 3, 4, 2, 0])
+        obs = pos.to_observation()
+        assert obs[5, 3, 1] == 1  # first player's stone, seen by the second
+        other = Position.from_observation(obs)
+        assert other.key() == pos.key()
+        assert other.player == 1
+        assert other.heights == pos.heights
+
+    def test_board_roundtrip(self):
+        """Test conversion from a 6x7 board"""
+        pos = Position.from_moves([3, 4, 3, 4])
+        board = observation_to_board(pos.to_observation(), 1)
+        assert Position.from_board(board, player=1).key() == pos.key()
+
+    def test_keys_differ(self):
+        """Test transposed move orders share a key, others do not"""
+        assert Position.from_moves([3, 4, 2]).key() == Position.from_moves([2, 4, 3]).key()
+        assert Position.from_moves([3, 4]).key() != Position.from_moves([4, 3]).key()
+
+    def test_copy_is_independent(self):
+        """Test copy"""
+        pos = Position.from_moves([3])
+        other = pos.copy()
+        other.play(3)
+        assert pos.moves == 1
+        assert other.moves == 2
+
+
+class TestWinDetection:
+    """Tests for bitboard win detection"""
+
+    def test_horizontal(self):
+        """Horizontal win"""
+        pos = Position.from_moves([0, 0, 1, 1, 2, 2])
+        assert pos.is_winning_move(3)
+        assert not pos.is_winning_move(4)
+        pos.play(3)
+        assert pos.has_won(0)
+        assert pos.winner() == 0
+
+    def test_vertical(self):
+        """Vertical win"""
+        pos = Position.from_moves([0, 1, 0, 1, 0, 1])
+        assert pos.is_winning_move(0)
+        assert pos.is_winning_move(1, player=1)
+
+    def test_diagonal(self):
+        """Diagonal win"""
+        pos = Position.from_moves([0, 1, 1, 2, 2, 3, 2, 3, 3, 6])
+        assert pos.is_winning_move(3)
+
+    def test_no_wrap_around(self):
+        """Stones split across columns do not align"""
+        pos = Position.from_moves([6, 0, 6, 0, 6, 1])
+        assert pos.winner() == -1
+        assert len(WINDOWS) == 69
+
+    def test_batch_matches_scalar(self):
+        """Batch detection agrees with the scalar primitive"""
+        positions = random_positions(200)
+        bits = np.array([p.bits[p.player ^ 1] for p in positions], dtype=np.uint64)
+        expected = [has_alignment(p.bits[p.player ^ 1]) for p in positions]
+        assert has_alignment_batch(bits).tolist() == expected
+        assert any(expected)
+
+    def test_winning_cells(self):
+        """Winning cells match is_winning_move for every column"""
+        for pos in random_positions(100, seed=1):
+            if pos.winner() != -1:
+                continue
+            cells = winning_cells(pos.bits[pos.player], pos.mask) & pos.legal_mask()
+            for col in pos.legal_moves():
+                assert bool(cells & pos.move_bit(col)) == pos.is_winning_move(col)
+
+    def test_check_winner_batch(self):
+        """Board-level batch detection matches check_winner"""
+        positions = random_positions(100, seed=2)
+        boards = np.array([p.to_board(0) for p in positions])
+        assert check_winner_batch(boards).tolist() == [check_winner(b) for b in boards]
+        assert boards_to_bits(boards[0], 1) == positions[0].bits[0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
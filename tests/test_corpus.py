@@ -0,0 +1,106 @@
+"""Tests for the reference position corpus"""
+
+import pytest
+from src.bitboard import Position
+from src.corpus import (
+    DEFAULT_CORPUS, PHASES, CorpusEntry, as_bitboards, as_moves, as_observations, load_corpus,
+    phase_of, write_corpus,
+)
+from src.solver import Solver
+
+
+@pytest.fixture
+def corpus_path(tmp_path):
+    """Two-position corpus."""
+    entries = [
+        CorpusEntry("opening", [3, 3, 2, 4, 3, 1, 2, 2], 2, [1, 5]),
+        CorpusEntry("endgame", [0, 1, 2, 3, 4, 5, 6] * 4 + [0, 1], -4, [6]),
+    ]
+    path = str(tmp_path / "corpus.txt")
+    write_corpus(path, entries)
+    return path
+
+
+@pytest.fixture(scope="module")
+def shipped():
+    """The shipped corpus."""
+    return load_corpus(DEFAULT_CORPUS)
+
+
+class TestCorpusFile:
+    """Tests for reading and writing corpora"""
+
+    def test_round_trip(self, corpus_path):
+        """Test entries are read back as written"""
+        entries = load_corpus(corpus_path)
+        assert [e.to_line() for e in entries] == [
+            "opening 33243122 +2 15",
+            "endgame " + "0123456" * 4 + "01 -4 6",
+        ]
+        assert entries[0].value == 1
+        assert entries[1].value == -1
+
+    def test_phase_filter(self, corpus_path):
+        """Test loading one phase"""
+        entries = load_corpus(corpus_path, ["endgame"])
+        assert [e.phase for e in entries] == ["endgame"]
+
+    def test_format_check(self, tmp_path):
+        """Test a file of another format is refused"""
+        path = tmp_path / "other.txt"
+        path.write_text("# c4corpus 0\n")
+        with pytest.raises(ValueError):
+            load_corpus(str(path))
+
+    def test_forms(self, corpus_path):
+        """Test moves, observations and bitboards describe the same positions"""
+        entries = load_corpus(corpus_path)
+        moves = as_moves(entries)
+        observations, masks = as_observations(entries)
+        mine, theirs = as_bitboards(entries)
+        assert observations.shape == (2, 6, 7, 2)
+        assert masks.shape == (2, 7)
+        for i, seq in enumerate(moves):
+            pos = Position.from_moves(seq)
+            assert Position.from_observation(observations[i]).key() == pos.key()
+            assert int(mine[i]) == pos.bits[pos.player]
+            assert int(theirs[i]) == pos.bits[1 - pos.player]
+
+    def test_phase_of(self):
+        """Test phases cover their stone counts"""
+        for phase, (low, high) in PHASES.items():
+            assert phase_of(low) == phase
+            assert phase_of(high) == phase
+        assert phase_of(0) is None
+
+
+class TestDefaultCorpus:
+    """Tests for the shipped corpus"""
+
+    def test_phases(self, shipped):
+        """Test every phase holds positions of its own stone counts"""
+        counts = {}
+        for entry in shipped:
+            counts[entry.phase] = counts.get(entry.phase, 0) + 1
+            assert phase_of(len(entry.moves)) == entry.phase
+        assert set(counts) == set(PHASES)
+        assert len(shipped) >= 3000
+
+    def test_positions_are_open(self, shipped):
+        """Test no position is won or has an immediate win"""
+        for entry in shipped[::50]:
+            pos = entry.position()
+            assert pos.winner() == -1
+            assert not any(pos.is_winning_move(c) for c in pos.legal_moves())
+            assert set(entry.best) <= set(pos.legal_moves())
+
+    def test_labels(self, shipped):
+        """Test a sample of endgame labels against the solver"""
+        solver = Solver(tt_size=1 << 18)
+        endgame = [e for e in shipped if e.phase == "endgame"]
+        for entry in endgame[::100]:
+            assert solver.best_moves(entry.position()) == (entry.best, entry.score)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,105 @@
+"""Tests for the endgame solver"""
+
+import time
+import random
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.endgame import DRAW, LOSS, WIN, EndgameSolver, EndgameTimeout
+from src.mcts_agent import MCTSAgent
+from src.minimax_agent import MinimaxAgent
+
+
+def observe(pos):
+    """Observation and action mask of a position."""
+    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+    return pos.to_observation(), mask
+
+
+def brute_force(pos):
+    """Exact value of a position by full minimax."""
+    if pos.has_won(1 - pos.player):
+        return LOSS
+    if pos.is_full():
+        return DRAW
+    best = LOSS
+    for col in pos.legal_moves():
+        pos.play(col)
+        best = max(best, -brute_force(pos))
+        pos.undo()
+    return best
+
+
+def random_endgame(rng, empty):
+    """Random game position with empty cells left and no immediate win for either side."""
+    while True:
+        pos = Position()
+        while pos.moves < 42 - empty and pos.winner() == -1:
+            pos.play(rng.choice(pos.legal_moves()))
+        if pos.winner() != -1 or pos.moves != 42 - empty:
+            continue
+        if not any(pos.is_winning_move(c, p) for c in pos.legal_moves() for p in (0, 1)):
+            return pos
+
+
+class TestEndgameSolver:
+    """Tests for EndgameSolver"""
+
+    def test_matches_brute_force(self):
+        """Test solved values against full minimax"""
+        rng = random.Random(0)
+        solver = EndgameSolver()
+        for _ in range(20):
+            pos = random_endgame(rng, 7)
+            assert solver.solve(pos) == brute_force(pos)
+            assert solver.positions > 0
+
+    def test_best_move_value(self):
+        """Test the best move leads to the position value"""
+        rng = random.Random(1)
+        solver = EndgameSolver()
+        for _ in range(10):
+            pos = random_endgame(rng, 7)
+            move, value = solver.best_move(pos)
+            assert value == brute_force(pos)
+            pos.play(move)
+            assert -brute_force(pos) == value
+
+    def test_immediate_win(self):
+        """Test a winning move is found at once"""
+        pos = Position.from_moves([0, 1, 0, 1, 0, 1])
+        assert EndgameSolver().best_move(pos) == (0, WIN)
+
+    def test_deadline(self):
+        """Test the solver stops at its deadline"""
+        with pytest.raises(EndgameTimeout):
+            EndgameSolver().solve(Position(), deadline=time.time())
+
+
+class TestAgentsUseSolver:
+    """Tests for the endgame switch in the agents"""
+
+    def test_minimax(self):
+        """Test MinimaxAgent solves below the threshold only"""
+        pos = random_endgame(random.Random(2), 12)
+        agent = MinimaxAgent(time_limit=1.0, endgame_cells=12)
+        action = agent.select_action(*observe(pos))
+        assert pos.can_play(action)
+        assert agent.last_proved > 0
+        assert agent.last_depth == 12
+
+        agent = MinimaxAgent(time_limit=0.2, endgame_cells=11)
+        agent.select_action(*observe(pos))
+        assert agent.last_proved == 0
+
+    def test_mcts(self):
+        """Test MCTSAgent solves instead of sampling"""
+        pos = random_endgame(random.Random(3), 12)
+        agent = MCTSAgent(time_limit=1.0, seed=0)
+        action = agent.select_action(*observe(pos))
+        assert pos.can_play(action)
+        assert agent.last_proved > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
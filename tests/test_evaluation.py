@@ -0,0 +1,136 @@
+"""Tests for the window evaluation"""
+
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.evaluation import (
+    ARENA_COLUMN_WEIGHTS, ARENA_WINDOW_WEIGHTS, MINIMAX_COLUMN_WEIGHTS,
+    MINIMAX_WINDOW_WEIGHTS, Evaluator,
+)
+from src.utils import evaluate_position
+
+
+def window_scan(board, window_weights, column_weights):
+    """Reference evaluation on a 6x7 board (1 = player to move, 2 = opponent)."""
+    weights = (0,) + tuple(window_weights) + (0,)
+    score = 0
+    for row in range(6):
+        for col in range(7):
+            if board[row, col] == 1:
+                score += column_weights[col]
+            elif board[row, col] == 2:
+                score -= column_weights[col]
+    lines = []
+    for row in range(6):
+        for col in range(4):
+            lines.append([board[row, col + i] for i in range(4)])
+    for row in range(3):
+        for col in range(7):
+            lines.append([board[row + i, col] for i in range(4)])
+    for row in range(3):
+        for col in range(4):
+            lines.append([board[row + i, col + i] for i in range(4)])
+    for row in range(3):
+        for col in range(3, 7):
+            lines.append([board[row + i, col - i] for i in range(4)])
+    for window in lines:
+        mine = sum(v == 1 for v in window)
+        theirs = sum(v == 2 for v in window)
+        if theirs == 0:
+            score += weights[mine]
+        if mine == 0:
+            score -= weights[theirs]
+    return score
+
+
+def random_game(seed):
+    """Moves of a random game that stops before any win."""
+    rng = np.random.default_rng(seed)
+    pos = Position()
+    while not pos.is_full():
+        col = int(rng.choice(pos.legal_moves()))
+        if pos.is_winning_move(col):
+            break
+        pos.play(col)
+    return pos.history
+
+
+class TestEvaluator:
+    """Tests for Evaluator"""
+
+    @pytest.mark.parametrize("weights", [
+        (MINIMAX_WINDOW_WEIGHTS, MINIMAX_COLUMN_WEIGHTS),
+        (ARENA_WINDOW_WEIGHTS, ARENA_COLUMN_WEIGHTS),
+    ])
+    def test_matches_window_scan(self, weights):
+        """Test the evaluation reproduces the original window scan"""
+        evaluator = Evaluator(*weights)
+        for seed in range(10):
+            pos = Position.from_moves(random_game(seed))
+            board = pos.to_board()
+            expected = window_scan(board, *weights)
+            assert evaluator.evaluate(pos) == expected
+            assert evaluator.evaluate_boards(board) == expected
+
+    def test_incremental_matches_full(self):
+        """Test make/unmake keeps the running score exact"""
+        evaluator = Evaluator(ARENA_WINDOW_WEIGHTS, ARENA_COLUMN_WEIGHTS)
+        for seed in range(10):
+            moves = random_game(seed)
+            pos = Position()
+            evaluator.reset(pos)
+            for col in moves:
+                evaluator.play(pos, col)
+                assert evaluator.score(pos.player) == evaluator.evaluate(pos)
+            for _ in moves:
+                evaluator.undo(pos)
+                assert evaluator.score(pos.player) == evaluator.evaluate(pos)
+            assert evaluator.total == 0
+
+    def test_reset(self):
+        """Test reset from an existing position"""
+        evaluator = Evaluator()
+        pos = Position.from_moves(random_game(3))
+        evaluator.reset(pos)
+        assert evaluator.score(pos.player) == evaluator.evaluate(pos)
+
+    def test_batch(self):
+        """Test evaluating arrays of positions at once"""
+        evaluator = Evaluator(ARENA_WINDOW_WEIGHTS, ARENA_COLUMN_WEIGHTS)
+        positions = [Position.from_moves(random_game(seed)) for seed in range(20)]
+        expected = [evaluator.evaluate(p) for p in positions]
+
+        mine = np.array([p.bits[p.player] for p in positions], dtype=np.uint64)
+        theirs = np.array([p.bits[1 - p.player] for p in positions], dtype=np.uint64)
+        assert evaluator.evaluate_bits(mine, theirs).tolist() == expected
+
+        boards = np.array([p.to_board() for p in positions])
+        assert evaluator.evaluate_boards(boards).tolist() == expected
+
+    def test_pattern_table(self):
+        """Test the 3^4 pattern table"""
+        evaluator = Evaluator(ARENA_WINDOW_WEIGHTS, ARENA_COLUMN_WEIGHTS)
+        assert evaluator.pattern_values[1 + 3 + 9] == 50  # three of mine
+        assert evaluator.pattern_values[2 * 27] == -1  # one of theirs
+        assert evaluator.pattern_values[1 + 2 * 3] == 0  # blocked
+
+    def test_evaluate_position(self):
+        """Test utils.evaluate_position keeps its center bonus"""
+        board = np.zeros((6, 7), dtype=np.int8)
+        board[5, 3] = 1
+        board[4, 3] = 2
+        board[5, 2] = 1
+        assert evaluate_position(board, 1) == 0
+        board[3, 3] = 1
+        assert evaluate_position(board, 1) == 3
+        assert evaluate_position(board, 2) == -3
+        board[5, 0:4] = 2
+        assert evaluate_position(board, 2) == 100000
+
+    def test_empty_board(self):
+        """Test empty board scores zero"""
+        assert Evaluator().evaluate(Position()) == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,100 @@
+"""Tests for the move instrumentation"""
+
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.instrumentation import AgentStats, Histogram, format_summary
+from src.mcts_agent import MCTSAgent
+from src.minimax_agent import MinimaxAgent
+from src.random_agent import RandomAgent
+
+
+def observe(pos):
+    """Observation and action mask of a position."""
+    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+    return pos.to_observation(), mask
+
+
+class TestHistogram:
+    """Tests for Histogram"""
+
+    def test_percentiles(self):
+        """Test percentiles are within the bucket width"""
+        h = Histogram()
+        values = np.random.default_rng(0).exponential(0.1, 10000)
+        for v in values:
+            h.add(v)
+        for q in (50, 95, 99):
+            assert h.percentile(q) == pytest.approx(np.percentile(values, q), rel=0.03)
+        assert h.max == values.max()
+        assert h.count == 10000
+
+    def test_zeros(self):
+        """Test zero values report 0"""
+        h = Histogram()
+        for v in (0, 0, 0, 5):
+            h.add(v)
+        assert h.percentile(50) == 0.0
+        assert h.percentile(100) == 5
+
+    def test_merge(self):
+        """Test merged histograms count both sides"""
+        a, b = Histogram(), Histogram()
+        a.add(1.0)
+        b.add(3.0)
+        a.merge(b)
+        assert a.count == 2
+        assert a.max == 3.0
+        assert a.mean() == 2.0
+
+
+class TestAgentStats:
+    """Tests for the BaseAgent instrumentation"""
+
+    def test_off_by_default(self):
+        """Test agents do not record unless enabled"""
+        agent = RandomAgent(seed=0)
+        agent.select_action(*observe(Position()))
+        assert agent.stats is None
+        assert "select_action" not in agent.__dict__
+
+    def test_minimax_metrics(self):
+        """Test minimax moves record time, nodes and depth"""
+        agent = MinimaxAgent(time_limit=0.2)
+        agent.enable_stats()
+        pos = Position.from_moves([3, 3])
+        for _ in range(2):
+            agent.select_action(*observe(pos))
+        metrics = agent.last_metrics
+        assert metrics["nodes"] > 0
+        assert metrics["depth"] > 0
+        assert 0 < metrics["tt_hit_rate"] < 1
+        assert metrics["tt_megabytes"] == agent.tt.nbytes() / (1024 * 1024)
+        assert metrics["nodes_per_second"] == pytest.approx(metrics["nodes"] / metrics["seconds"])
+        summary = agent.stats.summary()
+        assert summary["seconds"]["count"] == 2
+        assert "nodes" in format_summary("minimax", agent.stats)
+
+        agent.disable_stats()
+        agent.select_action(*observe(pos))
+        assert agent.stats is None
+
+    def test_mcts_metrics(self):
+        """Test MCTS moves record iterations"""
+        agent = MCTSAgent(max_iter=100, time_limit=60, seed=0)
+        agent.enable_stats()
+        agent.select_action(*observe(Position.from_moves([3, 3])))
+        assert agent.last_metrics["iterations"] == 100
+        assert "iterations_per_second" in agent.last_metrics
+
+    def test_record(self):
+        """Test AgentStats keeps one histogram per metric"""
+        stats = AgentStats()
+        stats.record({"seconds": 0.5, "nodes": 10})
+        stats.record({"seconds": 1.5})
+        assert stats.summary()["seconds"]["count"] == 2
+        assert stats.summary()["nodes"]["count"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,165 @@
+"""Tests for MCTS agent"""
+
+import time
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.mcts_agent import MCTSAgent
+from src.mcts_parallel import merge_visits
+
+
+def observe(pos):
+    """Observation and action mask of a position."""
+    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+    return pos.to_observation(), mask
+
+
+class TestMCTSAgent:
+    """Tests for MCTSAgent"""
+
+    def test_select_valid_action(self):
+        """Test MCTS plays a legal move"""
+        agent = MCTSAgent(time_limit=0.2, seed=0)
+        pos = Position.from_moves([3, 3, 3, 3, 3, 3])
+        action = agent.select_action(*observe(pos))
+        assert action != 3
+        assert agent.last_iterations > 0
+
+    def test_reuses_subtree(self):
+        """Test the next search starts from the explored grandchild"""
+        agent = MCTSAgent(time_limit=0.3, seed=0)
+        pos = Position.from_moves([3, 3])
+        action = agent.select_action(*observe(pos))
+        assert agent.last_reused_visits == 0
+
+        # opponent answers with its most visited reply in our tree
+        child = agent._root.children[action]
+        reply = child.best_action()
+        expected = child.children[reply].visits
+        pos.play(action)
+        pos.play(reply)
+
+        agent.select_action(*observe(pos))
+        assert agent.last_reused_visits == expected > 0
+        assert agent._root.parent is None
+
+    def test_fresh_tree_when_unmatched(self):
+        """Test an unrelated position starts a new tree"""
+        agent = MCTSAgent(time_limit=0.1, seed=0)
+        agent.select_action(*observe(Position.from_moves([3, 3])))
+        agent.select_action(*observe(Position.from_moves([0, 6, 1, 5])))
+        assert agent.last_reused_visits == 0
+
+    def test_reuse_disabled(self):
+        """Test the switch"""
+        agent = MCTSAgent(time_limit=0.1, seed=0, reuse_tree=False)
+        agent.select_action(*observe(Position.from_moves([3, 3])))
+        assert agent._root is None
+
+
+class TestTranspositions:
+    """Tests for MCTS on the position graph"""
+
+    def test_select_valid_action(self):
+        """Test graph MCTS plays a legal move"""
+        agent = MCTSAgent(time_limit=0.2, seed=0, transpositions=True)
+        pos = Position.from_moves([3, 3, 3, 3, 3, 3])
+        action = agent.select_action(*observe(pos))
+        assert action != 3
+        assert agent.last_nodes > 1
+
+    def test_transpositions_share_node(self):
+        """Test two move orders reach the same node"""
+        agent = MCTSAgent(max_iter=3000, time_limit=60, seed=0, transpositions=True)
+        pos = Position()
+        agent._mcts(pos, pos.legal_moves())
+
+        root = agent._graph.get(pos)
+        shared = 0
+        for a, child in root.children.items():
+            for b, grandchild in child.children.items():
+                for c, node in grandchild.children.items():
+                    other = root.children.get(c)
+                    if other is not None and a in other.children.get(b, root).children:
+                        shared += other.children[b].children[a] is node
+        assert shared > 0
+
+    def test_visits_are_consistent(self):
+        """Test every iteration goes through one root edge"""
+        agent = MCTSAgent(max_iter=500, time_limit=60, seed=0, transpositions=True)
+        pos = Position.from_moves([3, 3])
+        agent._mcts(pos, pos.legal_moves())
+        root = agent._graph.get(pos)
+        assert root.visits == 500
+        assert sum(root.edge_visits.values()) == 500
+
+    def test_graph_bound(self):
+        """Test the table never exceeds its size"""
+        agent = MCTSAgent(max_iter=300, time_limit=60, seed=0, transpositions=True,
+                          max_graph_nodes=100)
+        pos = Position()
+        action = agent._mcts(pos, pos.legal_moves())
+        assert 0 <= action <= 6
+        root = agent._graph.get(pos)
+        reachable = {id(root)}
+        stack = [root]
+        while stack:
+            for child in stack.pop().children.values():
+                if id(child) not in reachable:
+                    reachable.add(id(child))
+                    stack.append(child)
+        assert len(reachable) <= 100
+        assert len(agent._graph) <= 100
+
+    def test_reuses_graph(self):
+        """Test the graph is kept for the next move"""
+        agent = MCTSAgent(time_limit=0.2, seed=0, transpositions=True)
+        pos = Position.from_moves([3, 3])
+        action = agent.select_action(*observe(pos))
+        pos.play(action)
+        pos.play(3)
+        agent.select_action(*observe(pos))
+        assert agent.last_reused_visits > 0
+
+
+class TestRootParallel:
+    """Tests for root-parallel MCTS"""
+
+    def test_merge_visits(self):
+        """Test root visits are summed by action"""
+        assert merge_visits([{0: 2, 3: 5}, {3: 1, 4: 7}]) == {0: 2, 3: 6, 4: 7}
+
+    def test_workers_persist(self):
+        """Test workers play legal moves and are reused between moves"""
+        agent = MCTSAgent(max_iter=200, time_limit=60, seed=0, workers=2)
+        try:
+            pos = Position.from_moves([3, 3])
+            action = agent.select_action(*observe(pos))
+            assert 0 <= action <= 6
+            assert agent.last_iterations == 400
+            assert sum(agent.last_root_visits.values()) == 400
+            pids = [p.pid for p in agent._pool.processes]
+
+            pos.play(action)
+            pos.play(3)
+            agent.select_action(*observe(pos))
+            assert [p.pid for p in agent._pool.processes] == pids
+        finally:
+            agent.close()
+        assert agent._pool is None
+
+    def test_workers_use_search_time(self):
+        """Test workers search for the time of each search, not the one they started with"""
+        agent = MCTSAgent(time_limit=60, seed=0, workers=2)
+        try:
+            pos = Position.from_moves([3, 3])
+            start = time.time()
+            agent._mcts(pos, pos.legal_moves(), 0.2)
+            assert time.time() - start < 2
+            assert agent.time_limit == 60
+        finally:
+            agent.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,116 @@
+"""Tests for the array MCTS tree"""
+
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.mcts_agent import MCTSAgent
+from src.mcts_tree import NODE_BYTES, ArrayTree
+
+
+class TestArrayTree:
+    """Tests for ArrayTree"""
+
+    def test_grows_in_chunks(self):
+        """Test arrays grow by whole chunks"""
+        tree = ArrayTree(chunk=16)
+        root = tree.add_root(0)
+        assert tree.capacity() == 16
+        tree.expand(root, list(range(7)), 1)
+        tree.expand(1, list(range(7)), 0)
+        tree.expand(2, list(range(7)), 0)
+        assert tree.size == 22
+        assert tree.capacity() == 32
+        assert tree.nbytes() == 32 * NODE_BYTES
+
+    def test_node_cap(self):
+        """Test expansion stops at max_nodes"""
+        tree = ArrayTree(max_nodes=10, chunk=4)
+        root = tree.add_root(0)
+        assert tree.expand(root, list(range(7)), 1) == 1
+        assert tree.expand(1, list(range(7)), 0) == -1
+        assert tree.size == 8
+        assert tree.capacity() <= 10
+
+    def test_backprop(self):
+        """Test results are credited to the player who moved"""
+        tree = ArrayTree()
+        root = tree.add_root(0)
+        first = tree.expand(root, [3, 4], 1)
+        tree.backprop(first, 1.0)
+        assert tree.visits[root] == 1
+        assert tree.visits[first] == 1
+        assert tree.wins[first] == 1.0  # player 0 moved into it and won
+        assert tree.wins[root] == 0.0
+        assert tree.best_action(root) == 3
+
+    def test_reroot(self):
+        """Test re-rooting keeps the subtree statistics in the same arrays"""
+        tree = ArrayTree()
+        root = tree.add_root(0)
+        first = tree.expand(root, [3, 4], 1)
+        tree.expand(first, [5, 6], 0)
+        grand = tree.expand(first + 1, [0, 1, 2], 0)
+        tree.expand(grand + 2, [3], 1)
+        tree.backprop(grand + 2, 0.0)
+        tree.backprop(grand + 3, 1.0)
+        capacity = tree.capacity()
+
+        sub = tree.reroot(first + 1)
+        assert sub is tree
+        assert sub.capacity() == capacity
+        assert sub.size == 5
+        assert sub.visits[0] == 2
+        assert sub.parent[0] == -1
+        child = sub.child(0, 2)
+        assert sub.visits[child] == 2
+        assert sub.parent[child] == 0
+        assert sub.parent[sub.child(child, 3)] == child
+        assert [a for a, _ in sub.children(0)] == [0, 1, 2]
+
+
+class TestMCTSArrayBackend:
+    """Tests for MCTSAgent on the array tree"""
+
+    def test_select_valid_action(self):
+        """Test array MCTS plays a legal move and reports its size"""
+        agent = MCTSAgent(time_limit=0.2, seed=0, tree="array")
+        pos = Position.from_moves([3, 3, 3, 3, 3, 3])
+        mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+        action = agent.select_action(pos.to_observation(), mask)
+        assert mask[action] == 1
+        assert agent.last_nodes > 1
+        assert agent.last_tree_bytes >= agent.last_nodes * NODE_BYTES
+
+    def test_reuses_subtree(self):
+        """Test the array tree is re-rooted between moves"""
+        agent = MCTSAgent(time_limit=0.3, seed=0, tree="array")
+        pos = Position.from_moves([3, 3])
+        mask = np.ones(7, dtype=np.int8)
+        action = agent.select_action(pos.to_observation(), mask)
+
+        tree = agent._root
+        child = tree.child(0, action)
+        reply = tree.best_action(child)
+        expected = tree.visits[tree.child(child, reply)]
+        pos.play(action)
+        pos.play(reply)
+
+        agent.select_action(pos.to_observation(), mask)
+        assert agent.last_reused_visits == expected > 0
+
+    def test_small_cap(self):
+        """Test the search still works when the tree is full"""
+        agent = MCTSAgent(time_limit=0.1, seed=0, tree="array", max_nodes=50)
+        pos = Position()
+        action = agent.select_action(pos.to_observation(), np.ones(7, dtype=np.int8))
+        assert 0 <= action <= 6
+        assert agent.last_nodes <= 50
+
+    def test_unknown_tree(self):
+        """Test invalid storage name"""
+        with pytest.raises(ValueError):
+            MCTSAgent(tree="dict")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
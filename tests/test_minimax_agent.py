@@ -0,0 +1,168 @@
+"""Tests for minimax agent"""
+
+import time
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.minimax_agent import MinimaxAgent
+
+
+def observe(moves):
+    """Observation and action mask after a sequence of moves."""
+    pos = Position.from_moves(moves)
+    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+    return pos.to_observation(), mask
+
+
+class TestMinimaxAgent:
+    """Tests for MinimaxAgent"""
+
+    def test_wins_when_possible(self):
+        """Test immediate win"""
+        agent = MinimaxAgent(time_limit=0.5)
+        obs, mask = observe([0, 6, 1, 6, 2, 5])
+        assert agent.select_action(obs, mask) == 3
+
+    def test_blocks_opponent(self):
+        """Test blocking"""
+        agent = MinimaxAgent(time_limit=0.5)
+        obs, mask = observe([0, 6, 1, 6, 2])
+        assert agent.select_action(obs, mask) == 3
+
+    def test_respects_time_limit(self):
+        """Test the search stops at the deadline with a completed depth"""
+        agent = MinimaxAgent(time_limit=0.5)
+        obs, mask = observe([])
+
+        start = time.time()
+        action = agent.select_action(obs, mask)
+        elapsed = time.time() - start
+
+        assert mask[action] == 1
+        assert elapsed < 0.7
+        assert agent.last_depth >= 4
+
+    def test_stops_on_forced_win(self):
+        """Test deepening stops once a forced win is found"""
+        agent = MinimaxAgent(time_limit=10)
+        # open three on the bottom row: either end wins next turn
+        obs, mask = observe([2, 2, 3, 3])
+
+        start = time.time()
+        action = agent.select_action(obs, mask)
+
+        assert action in (1, 4)
+        assert agent.last_score >= 10000
+        assert time.time() - start < 5
+
+    def test_max_depth(self):
+        """Test the depth cap"""
+        agent = MinimaxAgent(max_depth=3, time_limit=10)
+        obs, mask = observe([3])
+        agent.select_action(obs, mask)
+        assert agent.last_depth == 3
+
+    @pytest.mark.parametrize("batch_depth", [1, 2, 3])
+    def test_batched_leaves_same_value(self, batch_depth):
+        """Test batched frontier evaluation gives the same search value"""
+        for moves in ([3, 3, 2], [3, 2, 4, 4, 1, 5, 0]):
+            values = []
+            for depth_setting in (0, batch_depth):
+                agent = MinimaxAgent(max_depth=5, time_limit=60, batch_depth=depth_setting)
+                pos = Position.from_moves(moves)
+                agent._start_time = time.time()
+                agent._search(pos, pos.legal_moves())
+                values.append(agent.last_score)
+                assert pos.history == moves
+            assert values[0] == values[1]
+
+    def test_principal_variation(self):
+        """Test the principal variation starts at the root and follows legal moves"""
+        agent = MinimaxAgent(max_depth=6, time_limit=60, endgame_cells=0)
+        pos = Position.from_moves([3, 3, 2])
+        agent._start_time = time.time()
+        best = agent._search(pos, pos.legal_moves())
+        assert agent._pv[pos.key()] == best
+        line = Position.from_moves([3, 3, 2])
+        for _ in range(len(agent._pv)):
+            move = agent._pv[line.key()]
+            assert line.can_play(move)
+            line.play(move)
+        assert len(agent._pv) > 1
+
+    def test_dynamic_ordering_same_value(self):
+        """Test killer and history ordering gives the same values with fewer nodes in all"""
+        nodes = [0, 0]
+        for moves in ([3, 3, 2], [3, 2, 4, 4, 1, 5, 0]):
+            scores = []
+            for dynamic in (False, True):
+                agent = MinimaxAgent(max_depth=7, time_limit=60, endgame_cells=0,
+                                     dynamic_ordering=dynamic)
+                pos = Position.from_moves(moves)
+                agent._start_time = time.time()
+                agent._search(pos, pos.legal_moves())
+                scores.append(agent.last_score)
+                nodes[dynamic] += agent.nodes
+            assert scores[0] == scores[1]
+        assert nodes[1] < nodes[0]
+
+    def test_order_moves(self):
+        """Test table move, wins, blocks and killers come before the history order"""
+        agent = MinimaxAgent()
+        # the player to move wins in 6 and must block in 0
+        pos = Position.from_moves([0, 6, 0, 6, 0, 6, 2])
+        agent.killers[pos.moves] = [5, 1]
+        assert agent._order_moves(pos, 4, -1) == [4, 6, 0, 5, 1, 3, 2]
+
+    def test_history_decays(self):
+        """Test history scores are halved and killers cleared between searches"""
+        agent = MinimaxAgent()
+        pos = Position.from_moves([3])
+        agent._record_cutoff(pos, 2, 4)
+        assert agent.killers[1] == [2, -1]
+        assert agent.history[1][2 * 7] == 16
+        agent._age_ordering()
+        assert agent.killers[1] == [-1, -1]
+        assert agent.history[1][2 * 7] == 8
+
+    @pytest.mark.parametrize("mode", ["pvs", "mtdf"])
+    def test_search_modes_same_value(self, mode):
+        """Test null-window searches find the full-window value and a move reaching it"""
+        for moves in ([3, 3, 2], [3, 2, 4, 4, 1, 5, 0]):
+            results = []
+            for search_mode in ("alphabeta", mode):
+                agent = MinimaxAgent(max_depth=6, time_limit=60, endgame_cells=0,
+                                     search_mode=search_mode)
+                pos = Position.from_moves(moves)
+                agent._start_time = time.time()
+                move = agent._search(pos, pos.legal_moves())
+                results.append(agent.last_score)
+            assert results[0] == results[1]
+            # the move played scores the search value
+            check = MinimaxAgent(max_depth=5, time_limit=60, endgame_cells=0,
+                                 search_mode="alphabeta")
+            pos.play(move)
+            check._start_time = time.time()
+            check._search(pos, pos.legal_moves())
+            assert -check.last_score == results[0]
+
+    def test_aspiration_failures(self):
+        """Test a window missing the score on either side is widened"""
+        agent = MinimaxAgent(max_depth=4, time_limit=60, endgame_cells=0)
+        pos = Position.from_moves([3, 3, 2])
+        agent._start_time = time.time()
+        agent._search(pos, pos.legal_moves())
+        expected = agent.last_score
+        for guess in (expected - 500, expected + 500):
+            agent.tt.clear()
+            agent.evaluator.reset(pos)
+            assert agent._aspiration(pos, pos.legal_moves(), 4, guess)[0] == expected
+
+    def test_unknown_search_mode(self):
+        """Test an unknown search mode is refused"""
+        with pytest.raises(ValueError):
+            MinimaxAgent(search_mode="negascout")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
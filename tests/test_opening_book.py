@@ -0,0 +1,79 @@
+"""Tests for the opening book"""
+
+import os
+import pytest
+import numpy as np
+from src.bitboard import Position, mirror
+from src.minimax_agent import MinimaxAgent
+from src.opening_book import HEADER, OpeningBook, load_book, write_book
+
+
+def observe(pos):
+    """Observation and action mask of a position."""
+    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+    return pos.to_observation(), mask
+
+
+@pytest.fixture
+def book_path(tmp_path):
+    """Small book: column 2 from the empty board, 1 after a stone in column 0."""
+    moves = {
+        Position().canonical_key()[0]: 2,
+        Position.from_moves([0]).canonical_key()[0]: 1,
+    }
+    path = str(tmp_path / "book.bin")
+    write_book(path, moves, max_ply=1)
+    return path
+
+
+class TestOpeningBook:
+    """Tests for OpeningBook"""
+
+    def test_mirror(self):
+        """Test mirrored positions share a canonical key"""
+        a = Position.from_moves([0, 1, 0])
+        b = Position.from_moves([6, 5, 6])
+        assert mirror(a.key()) == b.key()
+        assert a.canonical_key()[0] == b.canonical_key()[0]
+        assert a.canonical_key()[1] != b.canonical_key()[1]
+
+    def test_lookup(self, book_path):
+        """Test lookup, including mirrored positions"""
+        book = OpeningBook(book_path)
+        assert len(book) == 2
+        assert book.lookup(Position()) == 2
+        assert book.lookup(Position.from_moves([0])) == 1
+        assert book.lookup(Position.from_moves([6])) == 5
+        assert book.lookup(Position.from_moves([3])) == -1
+        assert book.lookup(Position.from_moves([0, 1])) == -1
+
+    def test_file_size(self, book_path):
+        """Test the file holds 9 bytes per position after the header"""
+        assert os.path.getsize(book_path) == HEADER.size + 2 * 9
+
+    def test_builder_settings(self, tmp_path):
+        """Test the header records how the book was built"""
+        path = str(tmp_path / "book.bin")
+        write_book(path, {Position().canonical_key()[0]: 3}, max_ply=0,
+                   depth=11, solve_time=1.0, solved=1)
+        book = OpeningBook(path)
+        assert (book.depth, book.solve_time, book.solved) == (11, 1.0, 1)
+
+    def test_bad_file(self, tmp_path):
+        """Test a file without the magic is rejected"""
+        path = tmp_path / "bad.bin"
+        path.write_bytes(b"\0" * 32)
+        with pytest.raises(ValueError):
+            OpeningBook(str(path))
+        assert load_book(str(tmp_path / "missing.bin")) is None
+
+    def test_minimax_plays_book_move(self, book_path):
+        """Test MinimaxAgent plays the book move without searching"""
+        agent = MinimaxAgent(time_limit=0.5, book=book_path)
+        action = agent.select_action(*observe(Position.from_moves([6])))
+        assert action == 5
+        assert agent.last_depth == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""Tests for the perft node counter"""
+
+import random
+import pytest
+from src.bitboard import Position
+from src.perft import REFERENCE_COUNTS, main, perft, perft_board
+
+
+def brute_force(pos, depth):
+    """Leaves counted by playing every move, leaves included."""
+    if depth == 0:
+        return 1
+    count = 0
+    for col in pos.legal_moves():
+        won = pos.is_winning_move(col)
+        pos.play(col)
+        count += 1 if depth == 1 else 0 if won else brute_force(pos, depth - 1)
+        pos.undo()
+    return count
+
+
+class TestPerft:
+    """Tests for perft"""
+
+    @pytest.mark.parametrize("depth", range(8))
+    def test_reference_counts(self, depth):
+        """Test the counts from the empty board"""
+        assert perft(Position(), depth) == REFERENCE_COUNTS[depth]
+
+    def test_terminal_cutoff(self):
+        """Test won positions are leaves"""
+        # the first player wins with column 0, which ends the game
+        pos = Position.from_moves([0, 1, 0, 1, 0, 1])
+        assert perft(pos, 1) == 7
+        assert perft(pos, 2) == 6 * 7
+
+    def test_full_columns(self):
+        """Test full columns are not played"""
+        pos = Position.from_moves([0, 0, 0, 0, 0, 0])
+        assert perft(pos, 1) == 6
+
+    def test_matches_brute_force(self):
+        """Test random middle game positions"""
+        rng = random.Random(0)
+        for _ in range(5):
+            pos = Position()
+            while pos.moves < 16:
+                moves = [c for c in pos.legal_moves() if not pos.is_winning_move(c)]
+                pos.play(rng.choice(moves))
+            assert perft(pos, 4) == brute_force(pos, 4)
+
+
+class TestPerftBoard:
+    """Tests for the NumPy board version"""
+
+    @pytest.mark.parametrize("depth", range(6))
+    def test_reference_counts(self, depth):
+        """Test the counts from the empty board"""
+        assert perft_board(Position().to_board(player=0), depth) == REFERENCE_COUNTS[depth]
+
+    def test_matches_bitboard(self):
+        """Test the same counts as the bitboard after an opening"""
+        pos = Position.from_moves([3, 3, 2, 4, 4, 2, 1])
+        board = pos.to_board(player=0)
+        assert perft_board(board, 4, pos.player + 1) == perft(pos, 4)
+        # the board is restored
+        assert (board == pos.to_board(player=0)).all()
+
+
+class TestCli:
+    """Tests for the command line"""
+
+    def test_main(self, capsys):
+        """Test the report checks the reference count"""
+        assert main(["--depth", "5"]) == 0
+        out = capsys.readouterr().out
+        assert "16807 ok" in out
+        assert "numpy" in out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
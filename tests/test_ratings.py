@@ -0,0 +1,86 @@
+"""Tests for Elo ratings and the SPRT"""
+
+import random
+import pytest
+from src.ratings import SPRT, elo_ratings, expected_score, pairing_elo, score_to_elo
+from src.random_agent import RandomAgent
+from src.rule_based_agent import RuleBasedAgent
+from src.tournament import run_tournament
+
+
+def simulated_scores(elo, count, seed=0):
+    """Game scores of a player elo points stronger, without draws."""
+    rng = random.Random(seed)
+    p = expected_score(elo)
+    return [1.0 if rng.random() < p else 0.0 for _ in range(count)]
+
+
+class TestElo:
+    """Tests for Elo estimates"""
+
+    def test_score_to_elo(self):
+        """Test the conversion both ways"""
+        assert score_to_elo(0.5) == pytest.approx(0)
+        assert score_to_elo(expected_score(200)) == pytest.approx(200)
+
+    def test_pairing_interval(self):
+        """Test the interval contains the estimate and narrows with games"""
+        elo, low, high = pairing_elo(60, 40, 0)
+        assert low < elo < high
+        assert elo == pytest.approx(score_to_elo(60.5 / 101))
+        _, low2, high2 = pairing_elo(600, 400, 0)
+        assert high2 - low2 < high - low
+        assert pairing_elo(10, 0, 0)[0] < 1000
+
+    def test_ratings(self):
+        """Test ratings recover the order and average zero"""
+        results = {
+            ("A", "B"): {"agent1": 70, "agent2": 30, "draw": 0},
+            ("B", "C"): {"agent1": 70, "agent2": 30, "draw": 0},
+            ("A", "C"): {"agent1": 85, "agent2": 15, "draw": 0},
+        }
+        ratings = elo_ratings(results)
+        assert ratings["A"][0] > ratings["B"][0] > ratings["C"][0]
+        assert sum(elo for elo, _ in ratings.values()) == pytest.approx(0, abs=1e-6)
+        assert ratings["A"][0] - ratings["B"][0] == pytest.approx(145, abs=30)
+        assert all(margin > 0 for _, margin in ratings.values())
+
+
+class TestSPRT:
+    """Tests for the SPRT"""
+
+    def test_decides_lopsided_match(self):
+        """Test a crushing result stops at the minimum number of games"""
+        sprt = SPRT(min_games=10)
+        assert sprt.cutoff([1.0] * 50) == 10
+        assert sprt.status(10, 0, 0) == "H1"
+        assert sprt.status(0, 10, 0) == "H0"
+
+    def test_waits_on_close_match(self):
+        """Test an even match is not decided early"""
+        sprt = SPRT()
+        assert sprt.status(6, 6, 0) is None
+        assert sprt.status(11, 10, 0) is None
+
+    def test_finds_stronger_player(self):
+        """Test simulated matches are decided the right way"""
+        sprt = SPRT(elo=50)
+        for seed in range(10):
+            scores = simulated_scores(200, 1000, seed)
+            cut = sprt.cutoff(scores)
+            assert cut is not None
+            wins = sum(scores[:cut])
+            assert sprt.status(wins, cut - wins, 0) == "H1"
+
+    def test_tournament_stops_early(self):
+        """Test the tournament plays fewer games under the SPRT, same for any worker count"""
+        specs = {"Random": (RandomAgent, {}), "Rule": (RuleBasedAgent, {})}
+        sprt = SPRT(min_games=10)
+        results = run_tournament(specs, games=100, seed=1, sprt=sprt)
+        stats = results[("Random", "Rule")]
+        assert sum(stats.values()) < 100
+        assert run_tournament(specs, games=100, workers=2, seed=1, sprt=sprt) == results
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
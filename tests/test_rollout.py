@@ -0,0 +1,60 @@
+"""Tests for batched rollouts"""
+
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.mcts_agent import MCTSAgent
+from src.rollout import batch_rollouts
+
+
+class TestBatchRollouts:
+    """Tests for batch_rollouts"""
+
+    def test_results_are_valid(self):
+        """Test every playout ends with a winner or a draw"""
+        rng = np.random.default_rng(0)
+        winners = batch_rollouts(Position(), 500, rng)
+        assert winners.shape == (500,)
+        assert set(winners.tolist()) <= {-1, 0, 1}
+        # the first player wins more often with win/block playouts
+        assert np.count_nonzero(winners == 0) > np.count_nonzero(winners == 1)
+
+    def test_takes_immediate_win(self):
+        """Test the player to move always wins when it can"""
+        rng = np.random.default_rng(1)
+        pos = Position.from_moves([0, 6, 1, 6, 2, 5])
+        winners = batch_rollouts(pos, 100, rng)
+        assert np.all(winners == 0)
+
+    def test_blocks_immediate_loss(self):
+        """Test the opponent's three is always blocked"""
+        rng = np.random.default_rng(2)
+        # player 1 to move, player 0 threatens column 3 on the bottom row
+        pos = Position.from_moves([0, 6, 1, 6, 2])
+        winners = batch_rollouts(pos, 200, rng)
+        # without the block player 0 would win every playout
+        assert np.count_nonzero(winners != 0) > 0
+
+    def test_position_unchanged(self):
+        """Test the start position is not modified"""
+        pos = Position.from_moves([3, 3])
+        key = pos.key()
+        batch_rollouts(pos, 10, np.random.default_rng(3))
+        assert pos.key() == key
+
+
+class TestMCTSBatched:
+    """Tests for MCTSAgent with batched rollouts"""
+
+    def test_select_valid_action(self):
+        """Test batched MCTS plays a legal move"""
+        agent = MCTSAgent(time_limit=0.2, rollout_batch=32, seed=0)
+        pos = Position.from_moves([3, 3, 3, 3, 3, 3])
+        mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+        action = agent.select_action(pos.to_observation(), mask)
+        assert mask[action] == 1
+        assert agent.last_simulations == 32 * agent.last_iterations
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,65 @@
+"""Tests for the batch game simulator"""
+
+import pytest
+import numpy as np
+from src.bitboard import Position
+from src.rule_based_agent import RuleBasedAgent
+from src.simulator import random_policy, rule_policy, simulate
+
+
+def replay(moves):
+    """Replay recorded columns; returns the final position."""
+    pos = Position()
+    for col in moves[moves >= 0]:
+        assert pos.winner() == -1
+        pos.play(int(col))
+    return pos
+
+
+class TestSimulator:
+    """Tests for simulate"""
+
+    def test_games_are_legal(self):
+        """Test recorded games replay with the same result"""
+        result = simulate(200, rng=0, record=True)
+        for i in range(len(result)):
+            pos = replay(result.moves[i])
+            assert pos.moves == result.lengths[i]
+            assert pos.winner() == result.winners[i]
+            if result.winners[i] == -1:
+                assert pos.is_full()
+
+    def test_counts(self):
+        """Test counts add up and the first player is favored"""
+        result = simulate(20000, rng=1)
+        counts = result.counts()
+        assert sum(counts.values()) == 20000
+        assert counts["player_0"] > counts["player_1"]
+        assert result.lengths.min() >= 7
+
+    def test_seeded(self):
+        """Test the same seed gives the same games"""
+        a = simulate(100, rng=2, record=True)
+        b = simulate(100, rng=2, record=True)
+        assert np.array_equal(a.moves, b.moves)
+
+    def test_rule_policy_matches_agent(self):
+        """Test the batched rules play like RuleBasedAgent"""
+        result = simulate(100, (rule_policy, random_policy), rng=3, record=True)
+        agent = RuleBasedAgent()
+        for i in range(len(result)):
+            pos = Position()
+            for col in result.moves[i, :result.lengths[i]]:
+                if pos.player == 0:
+                    mask = np.array([1 if pos.can_play(c) else 0 for c in range(7)])
+                    assert agent.select_action(pos.to_observation(), mask) == col
+                pos.play(int(col))
+
+    def test_illegal_policy(self):
+        """Test a policy playing a full column is rejected"""
+        with pytest.raises(ValueError):
+            simulate(10, (lambda m, t, legal, rng: np.zeros(len(m), dtype=int),) * 2)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+"""Tests for the perfect-play solver"""
+
+import time
+import random
+import pytest
+from src.bitboard import Position
+from src.endgame import EndgameSolver
+from src.solver import Solver, SolverTimeout, main, parse_moves
+from tests.test_endgame import random_endgame
+
+
+def exact_score(pos):
+    """Score of a position by full minimax."""
+    for col in pos.legal_moves():
+        if pos.is_winning_move(col):
+            return (43 - pos.moves) // 2
+    if pos.moves >= 41:
+        return 0
+    best = -99
+    for col in pos.legal_moves():
+        pos.play(col)
+        best = max(best, -exact_score(pos))
+        pos.undo()
+    return best
+
+
+class TestSolver:
+    """Tests for Solver"""
+
+    def test_matches_brute_force(self):
+        """Test exact scores against full minimax"""
+        rng = random.Random(0)
+        solver = Solver(tt_size=1 << 16)
+        for _ in range(20):
+            pos = random_endgame(rng, 8)
+            assert solver.solve(pos) == exact_score(pos)
+
+    def test_sign_matches_endgame_solver(self):
+        """Test the score sign is the win/draw/loss value"""
+        rng = random.Random(1)
+        solver = Solver(tt_size=1 << 16)
+        endgame = EndgameSolver()
+        for _ in range(10):
+            pos = random_endgame(rng, 16)
+            score = solver.solve(pos)
+            assert (score > 0) - (score < 0) == endgame.solve(pos)
+
+    def test_best_moves(self):
+        """Test the best moves reach the position score"""
+        pos = random_endgame(random.Random(2), 14)
+        solver = Solver(tt_size=1 << 16)
+        moves, score = solver.best_moves(pos)
+        assert score == solver.solve(pos)
+        for col in moves:
+            pos.play(col)
+            assert -solver.solve(pos) == score
+            pos.undo()
+
+    def test_best_moves_match_analyze(self):
+        """Test the null-window best moves against the score of every column"""
+        rng = random.Random(5)
+        solver = Solver(tt_size=1 << 16)
+        for _ in range(20):
+            pos = random_endgame(rng, rng.randint(6, 14))
+            scores = solver.analyze(pos)
+            best = max(s for s in scores if s is not None)
+            assert solver.best_moves(pos) == ([c for c, s in enumerate(scores) if s == best], best)
+
+    def test_deadline(self):
+        """Test a past deadline stops a long solve"""
+        with pytest.raises(SolverTimeout):
+            Solver(tt_size=1 << 16).solve(Position.from_moves([3, 3]), time.time() - 1)
+
+    def test_immediate_win_score(self):
+        """Test winning with the 4th stone scores 18"""
+        pos = Position.from_moves([0, 1, 0, 1, 0, 1])
+        assert Solver(tt_size=1 << 16).solve(pos) == 18
+
+    def test_counters(self):
+        """Test throughput counters"""
+        solver = Solver(tt_size=1 << 16)
+        solver.solve(random_endgame(random.Random(3), 16))
+        stats = solver.stats()
+        assert stats["positions"] > 0
+        assert stats["tt_hits"] <= stats["tt_probes"]
+        assert solver.positions_per_second() >= 0
+
+
+class TestCli:
+    """Tests for the command line"""
+
+    def test_parse_moves(self):
+        """Test move sequence formats"""
+        assert parse_moves("3342") == [3, 3, 4, 2]
+        assert parse_moves("3 3 4,2") == [3, 3, 4, 2]
+        for text in ("9", "3a"):
+            with pytest.raises(ValueError):
+                parse_moves(text)
+
+    @pytest.mark.parametrize("moves", ["9", "0000000", "01010101"])
+    def test_main_refuses_invalid_moves(self, moves, capsys):
+        """Test a bad column, a full column or a move after a win is a usage error"""
+        with pytest.raises(SystemExit) as exit_info:
+            main([moves])
+        assert exit_info.value.code == 2
+        assert "error:" in capsys.readouterr().err
+
+    def test_main(self, capsys):
+        """Test the printed score and best moves"""
+        pos = random_endgame(random.Random(4), 12)
+        assert main(["".join(map(str, pos.history))]) == 0
+        out = capsys.readouterr().out
+        moves, score = Solver(tt_size=1 << 16).best_moves(pos)
+        assert f"Score: {score:+d}" in out
+        assert f"Best moves: {moves}" in out
+        assert "Columns:" not in out
+
+    def test_main_analyze(self, capsys):
+        """Test the column scores are printed on request"""
+        pos = random_endgame(random.Random(4), 12)
+        assert main(["--analyze", "".join(map(str, pos.history))]) == 0
+        scores = Solver(tt_size=1 << 16).analyze(pos)
+        columns = " ".join("  ." if s is None else f"{s:+3d}" for s in scores)
+        assert f"Columns: {columns}" in capsys.readouterr().out
+
+    def test_main_forced_win_is_fast(self, capsys):
+        """Test an early position with an immediate win is answered at once"""
+        start = time.time()
+        assert main(["4 4 4 4 3 3 3 2 2 2 5 5"]) == 0
+        assert time.time() - start < 5
+        out = capsys.readouterr().out
+        assert "Score: +15" in out
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
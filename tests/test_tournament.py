@@ -0,0 +1,108 @@
+"""Tests for the tournament runner"""
+
+import json
+import pytest
+from src.mcts_agent import MCTSAgent
+from src.random_agent import RandomAgent
+from src.rule_based_agent import RuleBasedAgent
+from src.tournament import (
+    game_seed, move_stats, read_log, run_tournament, schedule, standings, tournament_header,
+)
+
+SPECS = {
+    "Random1": (RandomAgent, {}),
+    "Random2": (RandomAgent, {}),
+    "Rule": (RuleBasedAgent, {}),
+}
+
+
+class TestTournament:
+    """Tests for run_tournament"""
+
+    def test_game_seed(self):
+        """Test seeds are stable and differ between games"""
+        assert game_seed(0, 1, 2) == game_seed(0, 1, 2)
+        assert game_seed(0, 1, 2) != game_seed(0, 1, 3)
+        assert game_seed(0, 1, 2) != game_seed(1, 1, 2)
+
+    def test_schedule(self):
+        """Test the most expensive pairings come first"""
+        pairings = [("Random1", "Rule"), ("Random1", "MCTS"), ("Rule", "MCTS")]
+        tasks = schedule(pairings, 2, cost={"Random1": 0.1, "Rule": 0.1, "MCTS": 1.0})
+        assert [p for p, _ in tasks] == [1, 1, 2, 2, 0, 0]
+
+    def test_counts(self):
+        """Test every game is counted once"""
+        results = run_tournament(SPECS, games=10, seed=1)
+        assert len(results) == 3
+        for stats in results.values():
+            assert sum(stats.values()) == 10
+        assert results[("Random1", "Rule")]["agent2"] > 5
+
+    def test_same_results_with_workers(self):
+        """Test results do not depend on the number of workers"""
+        specs = dict(SPECS, MCTS=(MCTSAgent, {"max_iter": 50, "time_limit": float("inf")}))
+        serial = run_tournament(specs, games=4, workers=1, seed=2)
+        parallel = run_tournament(specs, games=4, workers=3, seed=2)
+        assert serial == parallel
+
+
+class TestGameLog:
+    """Tests for the JSONL game log"""
+
+    def test_records(self, tmp_path):
+        """Test each game is logged with its moves and timings"""
+        log = str(tmp_path / "games.jsonl")
+        results = run_tournament(SPECS, games=4, seed=3, log=log)
+        records = list(read_log(log))
+        assert len(records) == 12
+        for record in records:
+            assert len(record["moves"]) == len(record["times"])
+            assert record["player_0"] in record["pairing"]
+            assert record["winner"] in record["pairing"] + ["draw"]
+        assert standings(records) == results
+
+    def test_resume(self, tmp_path):
+        """Test a resumed run only plays the missing games"""
+        log = tmp_path / "games.jsonl"
+        expected = run_tournament(SPECS, games=4, seed=4)
+
+        run_tournament(SPECS, games=4, seed=4, log=str(log))
+        lines = log.read_text().splitlines()
+        # keep 5 games and a line cut short by a crash
+        log.write_text("\n".join(lines[:5]) + "\n" + lines[5][:20])
+
+        assert run_tournament(SPECS, games=4, seed=4, log=str(log)) == expected
+        assert len(list(read_log(str(log)))) == 12
+
+    def test_move_stats(self, tmp_path):
+        """Test per-agent statistics from the logged metrics"""
+        log = str(tmp_path / "games.jsonl")
+        run_tournament(SPECS, games=2, seed=7, log=log, stats=True)
+        records = list(read_log(log))
+        assert all(len(r["metrics"]) == len(r["moves"]) for r in records)
+        stats = move_stats(records)
+        moves = sum(len(r["moves"]) for r in records)
+        assert sum(s.summary()["seconds"]["count"] for s in stats.values()) == moves
+
+    def test_resume_other_seed(self, tmp_path):
+        """Test a log from another seed is refused"""
+        log = str(tmp_path / "games.jsonl")
+        run_tournament(SPECS, games=2, seed=5, log=log)
+        with pytest.raises(ValueError):
+            run_tournament(SPECS, games=2, seed=6, log=log)
+
+    def test_resume_other_tournament(self, tmp_path):
+        """Test a log from other agent arguments or games is refused"""
+        log = tmp_path / "games.jsonl"
+        run_tournament(SPECS, games=2, seed=5, log=str(log))
+        assert json.loads(log.read_text().splitlines()[0]) == tournament_header(SPECS, 2, 5)
+        other = dict(SPECS, Random1=(RandomAgent, {"seed": 1}))
+        with pytest.raises(ValueError):
+            run_tournament(other, games=2, seed=5, log=str(log))
+        with pytest.raises(ValueError):
+            run_tournament(SPECS, games=4, seed=5, log=str(log))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+"""Tests for the transposition table"""
+
+import time
+import pytest
+from src.bitboard import Position
+from src.minimax_agent import MinimaxAgent
+from src.transposition import EXACT, LOWER, TranspositionTable, entries_for
+
+
+class TestTranspositionTable:
+    """Tests for TranspositionTable"""
+
+    def test_store_probe(self):
+        """Test a stored entry is found again"""
+        tt = TranspositionTable(1024)
+        assert tt.probe(12345) is None
+        tt.store(12345, 3, 42, EXACT, 2)
+        assert tt.probe(12345) == (42, 3, EXACT, 2)
+        assert tt.hit_rate() == 0.5
+
+    def test_empty_position_key(self):
+        """Test key 0 (empty board) is a valid key"""
+        tt = TranspositionTable(16)
+        assert tt.probe(0) is None
+        tt.store(0, 1, 5, LOWER, 3)
+        assert tt.probe(0) == (5, 1, LOWER, 3)
+
+    def test_depth_preferred(self):
+        """Test a deeper entry is not replaced by a shallower one"""
+        tt = TranspositionTable(16)
+        tt.store(1, 5, 10, EXACT, 0)
+        tt.store(17, 2, 20, EXACT, 1)
+        assert tt.probe(1) == (10, 5, EXACT, 0)
+        assert tt.probe(17) is None
+
+        # entries from an older search are always replaced
+        tt.new_search()
+        tt.store(17, 2, 20, EXACT, 1)
+        assert tt.probe(17) == (20, 2, EXACT, 1)
+
+    def test_counters_per_search(self):
+        """Test a new search restarts the probe counters"""
+        tt = TranspositionTable(16)
+        tt.store(1, 5, 10, EXACT, 0)
+        tt.probe(1)
+        tt.new_search()
+        assert (tt.probes, tt.hits) == (0, 0)
+        tt.probe(2)
+        assert tt.hit_rate() == 0.0
+
+    def test_memory(self):
+        """Test memory use follows the entry budget"""
+        tt = TranspositionTable(entries_for(1))
+        assert tt.nbytes() == 1024 * 1024
+        assert tt.stats()["megabytes"] == 1.0
+
+
+class TestMinimaxWithTable:
+    """Tests for the table inside the minimax search"""
+
+    def _plain(self, agent, position, depth, alpha, beta):
+        """Alpha-beta without the table, as a reference."""
+        if position.has_won(1 - position.player):
+            return -10000 - depth
+        valid = position.legal_moves()
+        if not valid or depth <= 0:
+            return agent.evaluator.evaluate(position)
+        best = -99999
+        for col in valid:
+            position.play(col)
+            score = -self._plain(agent, position, depth - 1, -beta, -alpha)
+            position.undo()
+            best = max(best, score)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return best
+
+    @pytest.mark.parametrize("moves", [[], [3, 3, 2], [3, 2, 4, 4, 1, 5]])
+    def test_same_value(self, moves):
+        """Test the table does not change the search value"""
+        agent = MinimaxAgent(time_limit=60, tt_size=4096)
+        position = Position.from_moves(moves)
+        agent._start_time = time.time()
+        agent.evaluator.reset(position)
+        value = agent._minimax(position, 4, -99999, 99999)
+        assert value == self._plain(agent, position, 4, -99999, 99999)
+        assert agent.tt.hits > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])